@@ -9,7 +9,7 @@ from alembic import context
 
 from app.core.config import settings
 from app.db.base import Base
-from app.models import location, tenancy, memory_submission
+from app.models import location, tenancy, memory_submission, dataset_version
 
 config = context.config
 
@@ -0,0 +1,39 @@
+"""add dataset version
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-11-10 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dataset_version",
+        sa.Column("id", sa.SmallInteger(), nullable=False, server_default="1"),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("id = 1", name="ck_dataset_version_singleton"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO dataset_version (id, version) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    op.drop_table("dataset_version")
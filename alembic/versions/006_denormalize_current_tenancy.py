@@ -0,0 +1,39 @@
+"""denormalize current tenancy onto locations
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-11-12 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("locations", sa.Column("current_business", sa.String(length=255), nullable=True))
+    op.add_column("locations", sa.Column("current_category", sa.String(length=100), nullable=True))
+
+    # Backfill from the same DISTINCT ON ordering the bbox query used to compute per request.
+    op.execute(
+        """
+        UPDATE locations l
+        SET current_business = v.business_name,
+            current_category = v.category
+        FROM v_latest_tenancy v
+        WHERE v.location_id = l.id
+    """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("locations", "current_category")
+    op.drop_column("locations", "current_business")
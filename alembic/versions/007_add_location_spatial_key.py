@@ -0,0 +1,71 @@
+"""add morton spatial key to locations
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-11-14 19:00:00.000000
+
+"""
+
+import math
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Frozen copy of the key as of this revision (24 bits per axis, longitude on even
+# bits). Migrations must not import app code, which keeps changing after them.
+_AXIS_CELLS = 1 << 24
+
+
+def _quantize(value: float, minimum: float, span: float) -> int:
+    cell = math.floor((value - minimum) / span * _AXIS_CELLS)
+    return min(max(cell, 0), _AXIS_CELLS - 1)
+
+
+def _morton_key(lat: float, lon: float) -> int:
+    x, y = _quantize(lon, -180.0, 360.0), _quantize(lat, -90.0, 180.0)
+    key = 0
+    for bit in range(24):
+        key |= ((x >> bit) & 1) << (2 * bit) | ((y >> bit) & 1) << (2 * bit + 1)
+    return key
+
+
+def upgrade() -> None:
+    op.add_column("locations", sa.Column("spatial_key", sa.BigInteger(), nullable=True))
+
+    # Backfill in batches so each statement stays short on a large table.
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, lat, lon FROM locations WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE locations SET spatial_key = :spatial_key WHERE id = :id"),
+            [{"id": row.id, "spatial_key": _morton_key(row.lat, row.lon)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.create_index("idx_locations_spatial_key", "locations", ["spatial_key"], unique=False)
+
+    # Clustering the heap by this key is left to `make db-cluster-locations`, a separate
+    # maintenance step: CLUSTER holds an ACCESS EXCLUSIVE lock for the whole rewrite.
+    op.execute("ANALYZE locations")
+
+
+def downgrade() -> None:
+    op.drop_index("idx_locations_spatial_key", table_name="locations")
+    op.drop_column("locations", "spatial_key")
@@ -0,0 +1,28 @@
+"""add gist index on location points
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-11-15 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built-in geometric point type, so no PostGIS extension is needed. The indexed
+    # expression must match the `point(l.lon, l.lat) <@ box(...)` predicate exactly.
+    op.execute("CREATE INDEX idx_locations_point_gist ON locations USING gist (point(lon, lat))")
+    op.execute("ANALYZE locations")
+
+
+def downgrade() -> None:
+    op.drop_index("idx_locations_point_gist", table_name="locations")
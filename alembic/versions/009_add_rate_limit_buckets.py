@@ -0,0 +1,33 @@
+"""add rate limit buckets
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-11-19 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # UNLOGGED: losing buckets in a crash only resets limits, so skip the WAL.
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column("tat", sa.Float(precision=53), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,81 @@
+"""maintain locations.spatial_key in the database
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-11-21 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same arithmetic as app.core.spatial.morton_key (24 bits per axis, longitude on
+    # even bits), in double precision so both encoders produce identical keys.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION location_spatial_key(lat double precision, lon double precision)
+        RETURNS bigint
+        LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE AS $$
+        DECLARE
+            x bigint := least(greatest(
+                floor((lon - (-180.0)::double precision) / 360.0::double precision * 16777216), 0
+            ), 16777215)::bigint;
+            y bigint := least(greatest(
+                floor((lat - (-90.0)::double precision) / 180.0::double precision * 16777216), 0
+            ), 16777215)::bigint;
+            key bigint := 0;
+        BEGIN
+            FOR i IN 0..23 LOOP
+                key := key | (((x >> i) & 1) << (2 * i)) | (((y >> i) & 1) << (2 * i + 1));
+            END LOOP;
+            RETURN key;
+        END
+        $$
+    """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION locations_set_spatial_key() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.spatial_key := location_spatial_key(NEW.lat, NEW.lon);
+            RETURN NEW;
+        END
+        $$
+    """
+    )
+    # Covers ORM writes, raw Core inserts, COPY and ad-hoc UPDATEs of the coordinates.
+    op.execute(
+        """
+        CREATE TRIGGER trg_locations_spatial_key
+        BEFORE INSERT OR UPDATE OF lat, lon, spatial_key ON locations
+        FOR EACH ROW EXECUTE FUNCTION locations_set_spatial_key()
+    """
+    )
+
+    # Repair keys written before the trigger existed, then forbid NULLs.
+    op.execute(
+        """
+        UPDATE locations
+        SET spatial_key = location_spatial_key(lat, lon)
+        WHERE spatial_key IS DISTINCT FROM location_spatial_key(lat, lon)
+    """
+    )
+    op.alter_column("locations", "spatial_key", existing_type=sa.BigInteger(), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column("locations", "spatial_key", existing_type=sa.BigInteger(), nullable=True)
+    op.execute("DROP TRIGGER IF EXISTS trg_locations_spatial_key ON locations")
+    op.execute("DROP FUNCTION IF EXISTS locations_set_spatial_key()")
+    op.execute("DROP FUNCTION IF EXISTS location_spatial_key(double precision, double precision)")
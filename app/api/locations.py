@@ -1,11 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from prometheus_client import Counter
+from pydantic import BaseModel
 
-from app.db.postgres import get_db
+from app.core.compression import negotiate_encoding
+from app.core.config import settings
+from app.core.http_cache import cache_headers, etag_matches, not_modified, weak_etag
+from app.core.pagination import MAX_ID, decode_cursor, encode_cursor
+from app.core.request_context import span
+from app.core.serialization import (
+    PINS_MEDIA_TYPE,
+    encode_binary_pins,
+    encode_columnar_response,
+    encode_locations_response,
+)
+from app.core.spatial import snap_bbox
+from app.db.postgres import get_read_db
 from app.services.location_service import LocationService
+from app.services.dataset_version import dataset_version_tracker
+from app.services.location_index import location_index
+from app.services.response_cache import CachedBody, location_response_cache
 from app.repositories.location_repository import BoundingBox
-from app.schemas.location import LocationDetail, LocationsResponse, PinOut
+from app.schemas.location import (
+    ClusterOut,
+    ClustersResponse,
+    LocationDetail,
+    LocationDetailsResponse,
+    LocationsResponse,
+)
 
 router = APIRouter(prefix="/v1/locations", tags=["locations"])
 
@@ -15,18 +39,27 @@ pins_returned_counter = Counter(
 
 detail_view_counter = Counter("wutbh_detail_view_total", "Total number of location detail views")
 
+clusters_returned_counter = Counter(
+    "wutbh_clusters_returned_total", "Total number of location clusters returned"
+)
 
-def get_location_service(session: AsyncSession = Depends(get_db)) -> LocationService:
-    return LocationService(session)
+response_cache_counter = Counter(
+    "wutbh_response_cache_requests_total", "Bbox response cache lookups", ["result"]
+)
 
 
-@router.get("", response_model=LocationsResponse)
-async def get_locations(
-    bbox: str = Query(..., description="Bounding box: west,south,east,north"),
-    limit: int = Query(300, ge=1, le=1000),
-    cursor: str | None = Query(None),
-    service: LocationService = Depends(get_location_service),
-):
+def get_location_service(session: AsyncSession = Depends(get_read_db)) -> LocationService:
+    return LocationService(
+        session, location_index=location_index, version_tracker=dataset_version_tracker
+    )
+
+
+async def get_dataset_version(session: AsyncSession = Depends(get_read_db)) -> int:
+    # Served from memory once the tracker is warm; the session is only used on a cold start.
+    return await dataset_version_tracker.get(session)
+
+
+def parse_bbox(bbox: str) -> BoundingBox:
     try:
         coords = [float(x) for x in bbox.split(",")]
         if len(coords) != 4:
@@ -44,31 +77,212 @@ async def get_locations(
             detail=f"Invalid bbox format. Expected 'west,south,east,north': {str(e)}",
         )
 
-    bounding_box = BoundingBox(west, south, east, north)
-    rows = await service.find_locations_in_area(bounding_box, limit)
+    return BoundingBox(west, south, east, north)
+
+
+def parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = [int(x) for x in ids.split(",") if x.strip()]
+        if not parsed:
+            raise ValueError("at least one id is required")
+        if any(not 0 < location_id <= MAX_ID for location_id in parsed):
+            raise ValueError(f"ids must be integers between 1 and {MAX_ID}")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid ids format. Expected comma-separated integers: {str(e)}",
+        )
+
+    # Preserve request order while dropping repeats.
+    unique = list(dict.fromkeys(parsed))
+    if len(unique) > settings.location_batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many ids: at most {settings.location_batch_max_ids} per request",
+        )
+    return unique
+
+
+PIN_ENCODERS = {
+    "json": (encode_locations_response, "application/json"),
+    "columnar": (encode_columnar_response, "application/json"),
+    "binary": (encode_binary_pins, PINS_MEDIA_TYPE),
+}
+
+
+def negotiate_pin_format(pin_format: str | None, accept: str | None) -> str:
+    if pin_format is not None:
+        return pin_format
+    if accept and PINS_MEDIA_TYPE in accept:
+        return "binary"
+    return "json"
+
+
+def cached_response(
+    entry: CachedBody, request: Request, media_type: str, headers: dict
+) -> Response:
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding in entry.encoded:
+        headers = {**headers, "Content-Encoding": encoding}
+        return Response(entry.encoded[encoding], media_type=media_type, headers=headers)
+    return Response(entry.body, media_type=media_type, headers=headers)
+
+
+def model_response(model: BaseModel, headers: dict) -> Response:
+    # The model is already validated; encode it once instead of re-validating via response_model.
+    with span("serialize"):
+        body = model.model_dump_json()
+    return Response(body, media_type="application/json", headers=headers)
 
-    pins = [
-        PinOut(
-            id=row["id"],
+
+@router.get("", response_model=LocationsResponse)
+async def get_locations(
+    request: Request,
+    bbox: str = Query(..., description="Bounding box: west,south,east,north"),
+    limit: int = Query(300, ge=1, le=1000),
+    cursor: str | None = Query(None),
+    pin_format: Literal["json", "columnar", "binary"] | None = Query(
+        None,
+        alias="format",
+        description=f"Response encoding; defaults to binary for Accept: {PINS_MEDIA_TYPE}",
+    ),
+    version: int = Depends(get_dataset_version),
+    service: LocationService = Depends(get_location_service),
+):
+    bounding_box = parse_bbox(bbox)
+    pin_format = negotiate_pin_format(pin_format, request.headers.get("accept"))
+    encoder, media_type = PIN_ENCODERS[pin_format]
+
+    after_id = 0
+    if cursor is not None:
+        try:
+            after_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
+    etag = weak_etag(version, None if pin_format == "json" else pin_format)
+    headers = {
+        **cache_headers(etag, settings.location_cache_max_age),
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    cache_key = None
+    if settings.response_cache_enabled:
+        # Answer for the grid-aligned box around the viewport so nearby pans share an entry.
+        grid_bbox = snap_bbox(bounding_box, settings.bbox_snap_cells)
+        cache_key = ("locations", pin_format, grid_bbox, limit, after_id)
+        with span("cache"):
+            cached = location_response_cache.get(version, cache_key)
+        if cached is not None:
+            response_cache_counter.labels(result="hit").inc()
+            pins_returned_counter.inc(cached.item_count)
+            return cached_response(cached, request, media_type, headers)
+        response_cache_counter.labels(result="miss").inc()
+        bounding_box = BoundingBox(grid_bbox.west, grid_bbox.south, grid_bbox.east, grid_bbox.north)
+
+    # Fetch one extra row to learn whether another page exists.
+    rows = await service.find_locations_in_area(bounding_box, limit + 1, after_id=after_id)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["id"])
+
+    pins_returned_counter.inc(len(rows))
+    # response_model documents the JSON schema; bodies are encoded straight from the rows.
+    with span("serialize"):
+        body = encoder(rows, next_cursor)
+
+    if cache_key is not None:
+        with span("compress"):
+            entry = await location_response_cache.put_compressed(
+                version, cache_key, body, len(rows)
+            )
+        return cached_response(entry, request, media_type, headers)
+
+    return Response(body, media_type=media_type, headers=headers)
+
+
+@router.get(":batch", response_model=LocationDetailsResponse)
+async def get_location_details_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated location ids"),
+    version: int = Depends(get_dataset_version),
+    service: LocationService = Depends(get_location_service),
+):
+    location_ids = parse_ids(ids)
+
+    etag = weak_etag(version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, settings.location_cache_max_age)
+
+    details = await service.get_locations_by_ids(location_ids)
+
+    found = {detail.id for detail in details}
+    detail_view_counter.inc(len(details))
+
+    with span("validate"):
+        payload = LocationDetailsResponse(
+            locations=details,
+            count=len(details),
+            missing=[location_id for location_id in location_ids if location_id not in found],
+        )
+    return model_response(payload, cache_headers(etag, settings.location_cache_max_age))
+
+
+@router.get("/clusters", response_model=ClustersResponse)
+async def get_location_clusters(
+    request: Request,
+    response: Response,
+    bbox: str = Query(..., description="Bounding box: west,south,east,north"),
+    zoom: int = Query(..., ge=0, le=22, description="Web map zoom level"),
+    limit: int = Query(500, ge=1, le=5000),
+    version: int = Depends(get_dataset_version),
+    service: LocationService = Depends(get_location_service),
+):
+    bounding_box = parse_bbox(bbox)
+
+    etag = weak_etag(version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, settings.location_cache_max_age)
+
+    rows = await service.find_clusters_in_area(bounding_box, zoom, limit)
+
+    clusters = [
+        ClusterOut(
             lat=row["lat"],
             lon=row["lon"],
-            address=row["address"],
-            current_business=row["current_business"],
-            current_category=row["current_category"],
+            count=row["count"],
+            location_id=row["representative_id"] if row["count"] == 1 else None,
+            representative_business=row["representative_business"],
         )
         for row in rows
     ]
 
-    pins_returned_counter.inc(len(pins))
+    clusters_returned_counter.inc(len(clusters))
+    response.headers.update(cache_headers(etag, settings.location_cache_max_age))
 
-    return LocationsResponse(locations=pins, count=len(pins), cursor=None)
+    return ClustersResponse(
+        clusters=clusters,
+        count=len(clusters),
+        total=sum(cluster.count for cluster in clusters),
+        zoom=zoom,
+    )
 
 
 @router.get("/{location_id}", response_model=LocationDetail)
 async def get_location_detail(
     location_id: int,
+    request: Request,
+    version: int = Depends(get_dataset_version),
     service: LocationService = Depends(get_location_service),
 ):
+    etag = weak_etag(version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, settings.location_cache_max_age)
+
     location = await service.get_location_by_id(location_id)
 
     if not location:
@@ -76,4 +290,4 @@ async def get_location_detail(
 
     detail_view_counter.inc()
 
-    return location
+    return model_response(location, cache_headers(etag, settings.location_cache_max_age))
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.db.postgres import get_read_db
+from app.services.tile_service import TileService
+
+router = APIRouter(prefix="/v1/tiles", tags=["tiles"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+tiles_served_counter = Counter("wutbh_tiles_served_total", "Total number of vector tiles served")
+
+
+def get_tile_service(session: AsyncSession = Depends(get_read_db)) -> TileService:
+    return TileService(session)
+
+
+@router.get("/{z}/{x}/{y}.mvt", response_class=Response)
+async def get_tile(
+    z: int = Path(..., ge=0, le=22),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    service: TileService = Depends(get_tile_service),
+):
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=400, detail=f"Tile {z}/{x}/{y} is out of range")
+
+    tile = await service.get_tile(z, x, y)
+
+    tiles_served_counter.inc()
+
+    return Response(
+        content=tile,
+        media_type=MVT_MEDIA_TYPE,
+        headers={"Cache-Control": f"public, max-age={settings.tile_cache_max_age}"},
+    )
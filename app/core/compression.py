@@ -0,0 +1,85 @@
+import asyncio
+import gzip
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional: install with `poetry install -E brotli`
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the framing would eat the savings.
+COMPRESS_MIN_BYTES = 1024
+# Bodies at least this large are compressed in a worker thread instead of on the event loop.
+OFFLOAD_MIN_BYTES = 64 * 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-nostalgia-pins",
+    "application/vnd.mapbox-vector-tile",
+    "text/",
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Encodings this process can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the preferred supported encoding allowed by ``Accept-Encoding``, if any."""
+    if not accept_encoding:
+        return None
+
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    candidates = [
+        (weights.get(encoding, wildcard), -rank, encoding)
+        for rank, encoding in enumerate(supported_encodings())
+    ]
+    weight, _, encoding = max(candidates)
+    return encoding if weight > 0 else None
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _compress_all(body: bytes) -> dict[str, bytes]:
+    return {encoding: compress(body, encoding) for encoding in supported_encodings()}
+
+
+async def compress_async(body: bytes, encoding: str) -> bytes:
+    if len(body) >= OFFLOAD_MIN_BYTES:
+        return await asyncio.to_thread(compress, body, encoding)
+    return compress(body, encoding)
+
+
+async def compress_variants(body: bytes) -> dict[str, bytes]:
+    """Every supported encoding of ``body``, or nothing for bodies too small to bother."""
+    if len(body) < COMPRESS_MIN_BYTES:
+        return {}
+    if len(body) >= OFFLOAD_MIN_BYTES:
+        return await asyncio.to_thread(_compress_all, body)
+    return _compress_all(body)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,12 +8,54 @@ class Settings(BaseSettings):
 
     app_name: str = "Nostalgia API"
     database_url: str
+    database_replica_urls: list[str] = []
+    database_replica_max_lag_seconds: float = 5
+    database_replica_check_seconds: float = 2
     cors_origins: list[str] = ["*"]
     log_level: str = "INFO"
     log_format: str = "pretty"
+    log_queue_size: int = 10_000
+    log_success_sample_rate: float = 1.0
+    log_slow_request_seconds: float = 1.0
 
     recent_months: int = 18
     outdated_tenancy_months: int = 18
 
+    location_bbox_strategy: Literal["spatial_key", "between", "gist"] = "spatial_key"
+
+    location_batch_max_ids: int = 100
+    location_cache_max_age: int = 0
+
+    dataset_version_poll_seconds: float = 5
+
+    response_cache_enabled: bool = True
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_ttl_seconds: float = 300
+    response_cache_compress: bool = True
+    bbox_snap_cells: int = 4
+
+    compression_enabled: bool = True
+    server_timing_enabled: bool = False
+
+    slow_query_threshold_ms: float = 250
+    slow_query_explain_sample_rate: float = 0.0
+    slow_query_log_size: int = 100
+
+    rate_limit_store: Literal["memory", "shared_memory", "postgres"] = "memory"
+    rate_limit_max_keys: int = 100_000
+    rate_limit_shared_memory_path: str = "/dev/shm/nostalgia-rate-limit"
+    rate_limit_sweep_seconds: float = 60
+
+    location_index_enabled: bool = False
+    location_index_cell_size: float = 0.01
+    location_index_refresh_seconds: int = 0
+
+    cluster_cells_per_tile: int = 8
+
+    tile_cache_dir: str | None = None
+    tile_cache_max_entries: int = 2048
+    tile_cache_max_age: int = 300
+    tile_max_features: int = 5000
+
 
 settings = Settings()
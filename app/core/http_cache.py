@@ -0,0 +1,31 @@
+from typing import Optional
+
+from fastapi import Response
+
+
+def weak_etag(version: int, variant: Optional[str] = None) -> str:
+    # Representations of one resource (e.g. JSON vs binary pins) need distinct tags.
+    if variant:
+        return f'W/"v{version}-{variant}"'
+    return f'W/"v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison per RFC 9110: the W/ prefix is ignored on both sides."""
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
+
+
+def cache_headers(etag: str, max_age: int) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}, must-revalidate"}
+
+
+def not_modified(etag: str, max_age: int) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, max_age))
@@ -1,25 +1,83 @@
+import copy
 import logging
+import queue
 import sys
 from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict, Optional
 
+from prometheus_client import Counter
 from pythonjsonlogger import jsonlogger
 
+from app.core.request_context import current_request, get_correlation_id, start_request
+
+dropped_log_records_counter = Counter(
+    "wutbh_log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+
+_log_fields: ContextVar[Dict[str, Any]] = ContextVar("log_fields", default={})
+
 
 class CorrelationIdFilter(logging.Filter):
-    def __init__(self):
-        super().__init__()
-        self.correlation_id: Optional[str] = None
+    """Stamp records with the current request's correlation id and ``log_context`` fields.
+
+    Both live in context variables, so concurrent requests never see each other's
+    values. Attributes already on the record (e.g. from ``extra``) win.
+    """
 
     def filter(self, record: logging.LogRecord) -> bool:
-        record.correlation_id = self.correlation_id or "N/A"
+        if not hasattr(record, "correlation_id"):
+            record.correlation_id = get_correlation_id() or "N/A"
+        for key, value in _log_fields.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
         return True
 
 
 _correlation_filter = CorrelationIdFilter()
 
 
-def configure_logging(log_level: str = "INFO", log_format: str = "json") -> None:
+_exception_formatter = logging.Formatter()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like QueueHandler.prepare, but keep the traceback in exc_text so the listener's
+        # formatter still renders it as its own field instead of inside the message.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_log_records_counter.inc()
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(
+    log_level: str = "INFO", log_format: str = "json", queue_size: int = 0
+) -> None:
+    """Configure the root logger.
+
+    With ``queue_size > 0`` records are handed to a bounded queue and written by a
+    listener thread, so a slow stdout never blocks the event loop; records that
+    do not fit are dropped. Otherwise they are written synchronously.
+    """
+    stop_logging()
+
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
 
@@ -55,31 +113,45 @@ def configure_logging(log_level: str = "INFO", log_format: str = "json") -> None
             )
 
     handler.setFormatter(formatter)
+
+    if queue_size > 0:
+        global _listener
+
+        _listener = QueueListener(queue.Queue(maxsize=queue_size), handler)
+        _listener.start()
+        handler = BoundedQueueHandler(_listener.queue)
+
+    # Filter on the calling side so the correlation id is captured before the record is queued.
     handler.addFilter(_correlation_filter)
     root_logger.addHandler(handler)
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread, if any."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
 def set_correlation_id(correlation_id: Optional[str]) -> None:
-    _correlation_filter.correlation_id = correlation_id
+    """Set the correlation id for the current context, outside of request middleware."""
+    context = current_request()
+    if context is not None:
+        context.correlation_id = correlation_id
+    elif correlation_id is not None:
+        start_request(correlation_id)
 
 
 @contextmanager
 def log_context(**kwargs: Any):
-    logger = logging.getLogger()
-    old_factory = logging.getLogRecordFactory()
-
-    def record_factory(*args: Any, **record_kwargs: Any) -> logging.LogRecord:
-        record = old_factory(*args, **record_kwargs)
-        for key, value in kwargs.items():
-            setattr(record, key, value)
-        return record
-
-    logging.setLogRecordFactory(record_factory)
+    token = _log_fields.set({**_log_fields.get(), **kwargs})
     try:
         yield
     finally:
-        logging.setLogRecordFactory(old_factory)
+        _log_fields.reset(token)
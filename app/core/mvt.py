@@ -0,0 +1,141 @@
+"""Minimal Mapbox Vector Tile (spec v2) encoder for point layers.
+
+Only the subset of the protobuf schema needed to ship location pins is implemented:
+one or more layers of POINT features with string/numeric/bool properties.
+"""
+
+import math
+import struct
+from typing import Any, Iterable, NamedTuple
+
+DEFAULT_EXTENT = 4096
+
+_WIRE_VARINT = 0
+_WIRE_64BIT = 1
+_WIRE_LENGTH_DELIMITED = 2
+
+_GEOM_TYPE_POINT = 1
+_CMD_MOVE_TO = 1
+
+
+class PointFeature(NamedTuple):
+    id: int
+    lon: float
+    lat: float
+    properties: dict[str, Any]
+
+
+class TileBounds(NamedTuple):
+    west: float
+    south: float
+    east: float
+    north: float
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field_number: int, wire_type: int) -> bytes:
+    return _varint((field_number << 3) | wire_type)
+
+
+def _bytes_field(field_number: int, payload: bytes) -> bytes:
+    return _key(field_number, _WIRE_LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _varint_field(field_number: int, value: int) -> bytes:
+    return _key(field_number, _WIRE_VARINT) + _varint(value)
+
+
+def _packed_field(field_number: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(field_number, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _varint_field(7, int(value))
+    if isinstance(value, int):
+        return _varint_field(6, _zigzag(value))
+    if isinstance(value, float):
+        return _key(3, _WIRE_64BIT) + struct.pack("<d", value)
+    return _bytes_field(1, str(value).encode("utf-8"))
+
+
+def tile_bounds(z: int, x: int, y: int) -> TileBounds:
+    n = 2**z
+
+    def lat(tile_y: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return TileBounds(
+        west=x / n * 360.0 - 180.0,
+        south=lat(y + 1),
+        east=(x + 1) / n * 360.0 - 180.0,
+        north=lat(y),
+    )
+
+
+def project(lon: float, lat: float, z: int, x: int, y: int, extent: int) -> tuple[int, int]:
+    n = 2**z
+    lat_rad = math.radians(max(min(lat, 85.0511287798), -85.0511287798))
+    world_x = (lon + 180.0) / 360.0 * n
+    world_y = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n
+    return round((world_x - x) * extent), round((world_y - y) * extent)
+
+
+def encode_point_layer(
+    name: str,
+    features: Iterable[PointFeature],
+    z: int,
+    x: int,
+    y: int,
+    extent: int = DEFAULT_EXTENT,
+) -> bytes:
+    keys: dict[str, int] = {}
+    values: dict[tuple[type, Any], int] = {}
+    encoded_features = []
+
+    for feature in features:
+        tags = []
+        for key, value in feature.properties.items():
+            if value is None:
+                continue
+            key_idx = keys.setdefault(key, len(keys))
+            value_idx = values.setdefault((type(value), value), len(values))
+            tags.extend((key_idx, value_idx))
+
+        px, py = project(feature.lon, feature.lat, z, x, y, extent)
+        geometry = (_CMD_MOVE_TO | (1 << 3), _zigzag(px), _zigzag(py))
+
+        encoded_features.append(
+            _varint_field(1, feature.id)
+            + _packed_field(2, tags)
+            + _varint_field(3, _GEOM_TYPE_POINT)
+            + _packed_field(4, geometry)
+        )
+
+    layer = bytearray()
+    layer += _varint_field(15, 2)
+    layer += _bytes_field(1, name.encode("utf-8"))
+    for encoded in encoded_features:
+        layer += _bytes_field(2, encoded)
+    for key in keys:
+        layer += _bytes_field(3, key.encode("utf-8"))
+    for _, value in values:
+        layer += _bytes_field(4, _encode_value(value))
+    layer += _varint_field(5, extent)
+
+    return _bytes_field(3, bytes(layer))
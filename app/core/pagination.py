@@ -0,0 +1,27 @@
+import base64
+import json
+
+CURSOR_VERSION = 1
+
+# locations.id is a Postgres integer; larger values fail in the driver instead of matching nothing.
+MAX_ID = 2**31 - 1
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"v": CURSOR_VERSION, "after": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        after_id = payload["after"]
+        version = payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("cursor is malformed")
+
+    if version != CURSOR_VERSION or not isinstance(after_id, int) or not 0 <= after_id <= MAX_ID:
+        raise ValueError("cursor is malformed")
+
+    return after_id
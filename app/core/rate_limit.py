@@ -0,0 +1,310 @@
+"""GCRA rate limiting with pluggable bucket stores.
+
+The generic cell rate algorithm keeps a single number per key: the
+theoretical arrival time (TAT) of the next request. A limit of ``capacity``
+requests per ``period`` seconds admits a request when, after adding one
+emission interval (``period / capacity``) to the TAT, it lies no more than
+``period`` ahead of now. That is a token bucket of size ``capacity`` refilled
+continuously, without a separate token count or refill timestamp.
+
+A key whose TAT has passed is indistinguishable from a key never seen, so
+stores can drop it at any time; this is how idle keys are evicted.
+
+Stores:
+
+``memory``
+    Per process, bounded by ``max_keys``. With N workers the effective limit
+    is N times the configured one.
+``shared_memory``
+    A fixed-size hash table in an mmap'd file (e.g. under ``/dev/shm``) guarded
+    by ``flock``, shared by every worker on the host.
+``postgres``
+    An UNLOGGED table updated with one upsert per request, shared by every
+    host. Errors fail open.
+"""
+
+import fcntl
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+tracked_keys_gauge = Gauge(
+    "wutbh_rate_limit_tracked_keys", "Rate limit keys currently tracked", ["store"]
+)
+evicted_keys_counter = Counter(
+    "wutbh_rate_limit_evicted_keys_total",
+    "Rate limit keys dropped, because they went idle or to stay under the key cap",
+    ["store", "reason"],
+)
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0
+
+
+def gcra(
+    tat: Optional[float], now: float, capacity: int, period: float
+) -> tuple[RateLimitDecision, float]:
+    """Apply one request to a key; returns the decision and the TAT to store."""
+    interval = period / capacity
+    new_tat = max(tat if tat is not None else now, now) + interval
+    overshoot = new_tat - now - period
+    if overshoot > 0:
+        return RateLimitDecision(False, overshoot), tat
+    return RateLimitDecision(True), new_tat
+
+
+class RateLimitStore(ABC):
+    name: str
+
+    def __init__(self):
+        tracked_keys_gauge.labels(store=self.name).set_function(self.tracked_keys)
+
+    @abstractmethod
+    async def acquire(self, key: str, capacity: int, period: float) -> RateLimitDecision:
+        pass
+
+    @abstractmethod
+    def tracked_keys(self) -> int:
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    name = "memory"
+
+    def __init__(self, max_keys: int):
+        self._max_keys = max_keys
+        # Least recently used first, for the key cap.
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        # (tat, key) per stored TAT, earliest expiry first. Entries superseded by a later
+        # TAT or dropped by the cap stay until they surface and are skipped.
+        self._expiries: list[tuple[float, str]] = []
+        super().__init__()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def tracked_keys(self) -> int:
+        return len(self._tats)
+
+    def _evict_idle(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            tat, key = heapq.heappop(self._expiries)
+            if self._tats.get(key) == tat:
+                del self._tats[key]
+                evicted_keys_counter.labels(store=self.name, reason="idle").inc()
+
+    def _track_expiry(self, key: str, tat: float) -> None:
+        heapq.heappush(self._expiries, (tat, key))
+        # A busy key adds an entry per request; rebuild from the live TATs before
+        # the stale entries outgrow them.
+        if len(self._expiries) > 2 * self._max_keys + 64:
+            self._expiries = [(tat, key) for key, tat in self._tats.items()]
+            heapq.heapify(self._expiries)
+
+    async def acquire(self, key: str, capacity: int, period: float) -> RateLimitDecision:
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        decision, tat = gcra(self._tats.get(key), now, capacity, period)
+        if tat is None:
+            return decision
+
+        self._tats[key] = tat
+        self._tats.move_to_end(key)
+        self._track_expiry(key, tat)
+        if len(self._tats) > self._max_keys:
+            self._tats.popitem(last=False)
+            evicted_keys_counter.labels(store=self.name, reason="capacity").inc()
+        return decision
+
+    def clear(self) -> None:
+        self._tats.clear()
+        self._expiries.clear()
+
+
+class SharedMemoryRateLimitStore(RateLimitStore):
+    """Open-addressing table of (key hash, TAT) slots in a file shared by all workers.
+
+    A key probes ``PROBE_WINDOW`` consecutive slots. An empty or expired slot is
+    reused; when the window is full of live keys, the one closest to expiry is
+    overwritten. Hash collisions share a bucket, which is acceptable for 64-bit
+    hashes of client keys.
+    """
+
+    name = "shared_memory"
+
+    PROBE_WINDOW = 8
+    _SLOT = struct.Struct("<Qd")
+
+    def __init__(self, path: str, slots: int):
+        self._slots = slots
+        size = slots * self._SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        super().__init__()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") | 1
+
+    def _read(self, slot: int) -> tuple[int, float]:
+        return self._SLOT.unpack_from(self._map, slot * self._SLOT.size)
+
+    def _write(self, slot: int, key_hash: int, tat: float) -> None:
+        self._SLOT.pack_into(self._map, slot * self._SLOT.size, key_hash, tat)
+
+    def tracked_keys(self) -> int:
+        now = time.time()
+        return sum(
+            1 for key_hash, tat in self._SLOT.iter_unpack(self._map) if key_hash and tat > now
+        )
+
+    async def acquire(self, key: str, capacity: int, period: float) -> RateLimitDecision:
+        key_hash = self._hash(key)
+        start = key_hash % self._slots
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            now = time.time()
+            target = None
+            tat = None
+            free = None
+            oldest = None
+            for offset in range(self.PROBE_WINDOW):
+                slot = (start + offset) % self._slots
+                slot_hash, slot_tat = self._read(slot)
+                if slot_hash == key_hash:
+                    target, tat = slot, (slot_tat if slot_tat > now else None)
+                    break
+                if not slot_hash or slot_tat <= now:
+                    if free is None:
+                        free = slot
+                elif oldest is None or slot_tat < oldest[1]:
+                    oldest = (slot, slot_tat)
+
+            decision, new_tat = gcra(tat, now, capacity, period)
+            if new_tat is None:
+                return decision
+
+            if target is None:
+                target = free
+                if target is None:
+                    target = oldest[0]
+                    evicted_keys_counter.labels(store=self.name, reason="capacity").inc()
+            self._write(target, key_hash, new_tat)
+            return decision
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def clear(self) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._map[:] = bytes(len(self._map))
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """Buckets in the ``rate_limit_buckets`` table, timed by the database clock."""
+
+    name = "postgres"
+
+    # Admits by inserting or advancing the TAT; a denied request updates nothing.
+    ACQUIRE_SQL = text(
+        """
+        INSERT INTO rate_limit_buckets AS b (key, tat)
+        VALUES (:key, extract(epoch FROM clock_timestamp()) + :interval)
+        ON CONFLICT (key) DO UPDATE
+        SET tat = GREATEST(b.tat, EXCLUDED.tat - :interval) + :interval
+        WHERE GREATEST(b.tat, EXCLUDED.tat - :interval) - (EXCLUDED.tat - :interval) + :interval
+            <= :period
+        RETURNING tat
+        """
+    )
+    RETRY_AFTER_SQL = text(
+        """
+        SELECT tat - extract(epoch FROM clock_timestamp())
+        FROM rate_limit_buckets
+        WHERE key = :key
+        """
+    )
+    SWEEP_SQL = text(
+        "DELETE FROM rate_limit_buckets WHERE tat <= extract(epoch FROM clock_timestamp())"
+    )
+    COUNT_SQL = text("SELECT count(*) FROM rate_limit_buckets")
+
+    def __init__(self, sweep_seconds: float, session_factory=None):
+        self._sweep_seconds = sweep_seconds
+        self._session_factory = session_factory
+        self._next_sweep = 0.0
+        self._tracked = 0
+        super().__init__()
+
+    def tracked_keys(self) -> int:
+        return self._tracked
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from app.db.postgres import AsyncSessionLocal
+
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    async def _sweep(self, session) -> None:
+        result = await session.execute(self.SWEEP_SQL)
+        evicted_keys_counter.labels(store=self.name, reason="idle").inc(result.rowcount)
+        self._tracked = (await session.execute(self.COUNT_SQL)).scalar_one()
+
+    async def acquire(self, key: str, capacity: int, period: float) -> RateLimitDecision:
+        params = {"key": key, "interval": period / capacity, "period": period}
+        try:
+            async with self._sessions() as session:
+                admitted = (await session.execute(self.ACQUIRE_SQL, params)).first()
+                if admitted is not None:
+                    decision = RateLimitDecision(True)
+                else:
+                    ahead = (await session.execute(self.RETRY_AFTER_SQL, params)).scalar_one()
+                    decision = RateLimitDecision(False, max(ahead + params["interval"] - period, 0))
+
+                if time.monotonic() >= self._next_sweep:
+                    self._next_sweep = time.monotonic() + self._sweep_seconds
+                    await self._sweep(session)
+
+                await session.commit()
+                return decision
+        except Exception:
+            logger.warning("Rate limit store unavailable; allowing request", exc_info=True)
+            return RateLimitDecision(True)
+
+
+def create_rate_limit_store() -> RateLimitStore:
+    if settings.rate_limit_store == "shared_memory":
+        return SharedMemoryRateLimitStore(
+            settings.rate_limit_shared_memory_path, settings.rate_limit_max_keys
+        )
+    if settings.rate_limit_store == "postgres":
+        return PostgresRateLimitStore(settings.rate_limit_sweep_seconds)
+    return MemoryRateLimitStore(settings.rate_limit_max_keys)
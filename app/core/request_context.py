@@ -0,0 +1,71 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional
+
+from prometheus_client import Histogram
+
+span_duration_histogram = Histogram(
+    "wutbh_request_span_seconds",
+    "Time spent per request in each named span",
+    ["span"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+class RequestContext:
+    """Per-request state that follows the request's task (and tasks it spawns)."""
+
+    __slots__ = ("correlation_id", "spans")
+
+    def __init__(self, correlation_id: str):
+        self.correlation_id = correlation_id
+        self.spans: dict[str, float] = {}
+
+    def add_span(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def span_millis(self) -> dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()}
+
+    def observe_spans(self) -> None:
+        for name, seconds in self.spans.items():
+            span_duration_histogram.labels(span=name).observe(seconds)
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def current_request() -> Optional[RequestContext]:
+    return _request_context.get()
+
+
+def start_request(correlation_id: str) -> Token:
+    return _request_context.set(RequestContext(correlation_id))
+
+
+def end_request(token: Token) -> None:
+    _request_context.reset(token)
+
+
+def get_correlation_id() -> Optional[str]:
+    context = _request_context.get()
+    return context.correlation_id if context is not None else None
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the time spent in the block to the current request's ``name`` span.
+
+    Repeated spans with the same name accumulate; outside a request this is a no-op.
+    """
+    context = _request_context.get()
+    if context is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        context.add_span(name, time.perf_counter() - start)
@@ -0,0 +1,222 @@
+"""Encoders for GET /v1/locations pin pages.
+
+Three representations of the same page are offered:
+
+``json``
+    ``LocationsResponse``: one object per pin.
+``columnar``
+    JSON with parallel arrays. Ids and coordinates are delta-encoded, with
+    coordinates as fixed-point integers (degrees * ``COORDINATE_SCALE``).
+    Business and category names are indexes into per-page string tables,
+    where ``-1`` means null.
+``binary`` (``application/x-nostalgia-pins``)
+    The same columns packed as varints::
+
+        magic "NPN\\x01"
+        varint count
+        count x zigzag varint   id deltas
+        count x zigzag varint   fixed-point lat deltas
+        count x zigzag varint   fixed-point lon deltas
+        table                   business names
+        count x varint          business index + 1 (0 = null)
+        table                   category names
+        count x varint          category index + 1 (0 = null)
+        count x string          addresses
+        string                  cursor (empty = no next page)
+
+    A string is a varint byte length followed by UTF-8. A table is a varint
+    entry count followed by that many strings.
+
+Fixed-point coordinates are rounded to 1e-7 degrees, about 1cm.
+"""
+
+from typing import Iterable, Optional, Sequence
+
+import orjson
+
+PINS_MEDIA_TYPE = "application/x-nostalgia-pins"
+COORDINATE_SCALE = 10_000_000
+
+_BINARY_MAGIC = b"NPN\x01"
+
+
+def encode_locations_response(rows: Sequence[dict], cursor: Optional[str]) -> bytes:
+    """Encode pin rows to the ``LocationsResponse`` JSON body in a single pass.
+
+    Rows from the repository SQL and from the in-memory index carry exactly the
+    ``PinOut`` fields, in ``PinOut`` order, with types fixed by the database
+    columns, so they are dumped as-is instead of being rebuilt as models and
+    re-validated through ``response_model``.
+    """
+    if not isinstance(rows, list):
+        rows = list(rows)
+    return orjson.dumps({"locations": rows, "count": len(rows), "cursor": cursor})
+
+
+def _fixed(value: float) -> int:
+    return round(value * COORDINATE_SCALE)
+
+
+def _deltas(values: Iterable[int]) -> list[int]:
+    out = []
+    previous = 0
+    for value in values:
+        out.append(value - previous)
+        previous = value
+    return out
+
+
+def _undeltas(deltas: Iterable[int]) -> list[int]:
+    out = []
+    value = 0
+    for delta in deltas:
+        value += delta
+        out.append(value)
+    return out
+
+
+def _dictionary(values: Iterable[Optional[str]]) -> tuple[list[str], list[int]]:
+    table: dict[str, int] = {}
+    indexes = [-1 if value is None else table.setdefault(value, len(table)) for value in values]
+    return list(table), indexes
+
+
+def _columns(rows: Sequence[dict]) -> dict:
+    business_table, business = _dictionary(row["current_business"] for row in rows)
+    category_table, category = _dictionary(row["current_category"] for row in rows)
+    return {
+        "id": _deltas(row["id"] for row in rows),
+        "lat": _deltas(_fixed(row["lat"]) for row in rows),
+        "lon": _deltas(_fixed(row["lon"]) for row in rows),
+        "address": [row["address"] for row in rows],
+        "business": business,
+        "business_table": business_table,
+        "category": category,
+        "category_table": category_table,
+    }
+
+
+def _rows_from_columns(columns: dict) -> list[dict]:
+    business_table = columns["business_table"]
+    category_table = columns["category_table"]
+    return [
+        {
+            "id": location_id,
+            "lat": lat / COORDINATE_SCALE,
+            "lon": lon / COORDINATE_SCALE,
+            "address": address,
+            "current_business": business_table[business] if business >= 0 else None,
+            "current_category": category_table[category] if category >= 0 else None,
+        }
+        for location_id, lat, lon, address, business, category in zip(
+            _undeltas(columns["id"]),
+            _undeltas(columns["lat"]),
+            _undeltas(columns["lon"]),
+            columns["address"],
+            columns["business"],
+            columns["category"],
+        )
+    ]
+
+
+def encode_columnar_response(rows: Sequence[dict], cursor: Optional[str]) -> bytes:
+    return orjson.dumps(
+        {
+            "format": "columnar",
+            "count": len(rows),
+            "cursor": cursor,
+            "scale": COORDINATE_SCALE,
+            **_columns(rows),
+        }
+    )
+
+
+def decode_columnar_response(payload: dict) -> tuple[list[dict], Optional[str]]:
+    return _rows_from_columns(payload), payload["cursor"]
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_zigzag(out: bytearray, value: int) -> None:
+    _write_varint(out, (value << 1) ^ (value >> 63))
+
+
+def _write_string(out: bytearray, value: str) -> None:
+    encoded = value.encode("utf-8")
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def encode_binary_pins(rows: Sequence[dict], cursor: Optional[str]) -> bytes:
+    columns = _columns(rows)
+    out = bytearray(_BINARY_MAGIC)
+    _write_varint(out, len(rows))
+
+    for name in ("id", "lat", "lon"):
+        for delta in columns[name]:
+            _write_zigzag(out, delta)
+
+    for name in ("business", "category"):
+        table = columns[f"{name}_table"]
+        _write_varint(out, len(table))
+        for value in table:
+            _write_string(out, value)
+        for index in columns[name]:
+            _write_varint(out, index + 1)
+
+    for address in columns["address"]:
+        _write_string(out, address)
+    _write_string(out, cursor or "")
+
+    return bytes(out)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    def varint(self) -> int:
+        value = 0
+        shift = 0
+        while True:
+            byte = self._data[self._pos]
+            self._pos += 1
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    def zigzag(self) -> int:
+        value = self.varint()
+        return (value >> 1) ^ -(value & 1)
+
+    def string(self) -> str:
+        length = self.varint()
+        value = self._data[self._pos : self._pos + length].decode("utf-8")
+        self._pos += length
+        return value
+
+
+def decode_binary_pins(data: bytes) -> tuple[list[dict], Optional[str]]:
+    """Inverse of :func:`encode_binary_pins`; coordinates come back at 1e-7 precision."""
+    if not data.startswith(_BINARY_MAGIC):
+        raise ValueError("Not a nostalgia pins payload")
+
+    reader = _Reader(data[len(_BINARY_MAGIC) :])
+    count = reader.varint()
+    columns: dict = {name: [reader.zigzag() for _ in range(count)] for name in ("id", "lat", "lon")}
+
+    for name in ("business", "category"):
+        columns[f"{name}_table"] = [reader.string() for _ in range(reader.varint())]
+        columns[name] = [reader.varint() - 1 for _ in range(count)]
+
+    columns["address"] = [reader.string() for _ in range(count)]
+    cursor = reader.string() or None
+
+    return _rows_from_columns(columns), cursor
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from prometheus_client import Counter
+
+T = TypeVar("T")
+
+coalesced_calls_counter = Counter(
+    "wutbh_coalesced_calls_total",
+    "Calls that joined an identical in-flight call instead of running their own",
+    ["group"],
+)
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller (the leader) starts the call as a task; callers arriving
+    while it runs await the same task and receive the same result or exception.
+    Results are shared, not copied, so callers must treat them as read-only.
+
+    The task runs on the leader's resources (e.g. its database session), so a
+    cancelled leader still waits for the task to finish before unwinding;
+    followers are shielded from the leader's cancellation.
+    """
+
+    def __init__(self, group: str):
+        self._group = group
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            coalesced_calls_counter.labels(group=self._group).inc()
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                await asyncio.wait([task])
+            raise
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved; callers that are still waiting re-raise it themselves.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,126 @@
+import math
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from app.repositories.location_repository import BoundingBox
+
+# Bits of precision per axis. 24 bits resolves ~2.4m of longitude at the equator and
+# the interleaved 48-bit key fits comfortably in a Postgres BIGINT.
+MORTON_BITS = 24
+_AXIS_CELLS = 1 << MORTON_BITS
+
+
+def _spread_bits(value: int) -> int:
+    value &= 0xFFFFFFFF
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    value = (value | (value << 1)) & 0x5555555555555555
+    return value
+
+
+def _quantize(value: float, minimum: float, span: float) -> int:
+    cell = math.floor((value - minimum) / span * _AXIS_CELLS)
+    return min(max(cell, 0), _AXIS_CELLS - 1)
+
+
+def _interleave(x: int, y: int) -> int:
+    return _spread_bits(x) | (_spread_bits(y) << 1)
+
+
+def morton_key(lat: float, lon: float) -> int:
+    """Z-order (Morton) key for a coordinate: longitude bits on even positions, latitude on odd."""
+    return _interleave(_quantize(lon, -180.0, 360.0), _quantize(lat, -90.0, 180.0))
+
+
+def bbox_key_ranges(bbox: "BoundingBox", max_ranges: int = 16) -> list[tuple[int, int]]:
+    """Cover a bbox with at most ``max_ranges`` inclusive Morton key ranges.
+
+    Picks the finest quadtree level at which the bbox touches no more than
+    ``max_ranges`` cells; each cell at that level is one contiguous key range.
+    The cover is a superset of the bbox, so callers must keep the exact
+    lat/lon predicate.
+    """
+    x0 = _quantize(bbox.west, -180.0, 360.0)
+    x1 = _quantize(bbox.east, -180.0, 360.0)
+    y0 = _quantize(bbox.south, -90.0, 180.0)
+    y1 = _quantize(bbox.north, -90.0, 180.0)
+
+    shift = 0
+    while shift < MORTON_BITS:
+        cells = ((x1 >> shift) - (x0 >> shift) + 1) * ((y1 >> shift) - (y0 >> shift) + 1)
+        if cells <= max_ranges:
+            break
+        shift += 1
+
+    span = 1 << (2 * shift)
+    starts = sorted(
+        _interleave(cx, cy) << (2 * shift)
+        for cx in range(x0 >> shift, (x1 >> shift) + 1)
+        for cy in range(y0 >> shift, (y1 >> shift) + 1)
+    )
+
+    ranges: list[tuple[int, int]] = []
+    for start in starts:
+        if ranges and ranges[-1][1] + 1 == start:
+            ranges[-1] = (ranges[-1][0], start + span - 1)
+        else:
+            ranges.append((start, start + span - 1))
+    return ranges
+
+
+# Deepest grid level used when snapping; 360 / 2**22 is ~9.5cm of longitude.
+MAX_SNAP_LEVEL = 22
+
+
+class GridBbox(NamedTuple):
+    """A bbox aligned to a power-of-two degree grid: cells of ``360 / 2**level`` degrees."""
+
+    level: int
+    min_x: int
+    min_y: int
+    max_x: int
+    max_y: int
+
+    @property
+    def step(self) -> float:
+        return 360.0 / (1 << self.level)
+
+    @property
+    def west(self) -> float:
+        return max(self.min_x * self.step, -180.0)
+
+    @property
+    def south(self) -> float:
+        return max(self.min_y * self.step, -90.0)
+
+    @property
+    def east(self) -> float:
+        return min(self.max_x * self.step, 180.0)
+
+    @property
+    def north(self) -> float:
+        return min(self.max_y * self.step, 90.0)
+
+
+def snap_bbox(bbox: "BoundingBox", cells_per_side: int = 4) -> GridBbox:
+    """Expand a bbox outward to the grid level whose cells fit ``cells_per_side`` times
+    along the bbox's shorter side.
+
+    Near-identical viewports snap to the same grid box, and the overshoot on each
+    edge is under one cell, i.e. under ``1 / cells_per_side`` of the shorter side.
+    """
+    span = min(bbox.east - bbox.west, bbox.north - bbox.south)
+    level = MAX_SNAP_LEVEL
+    if span > 0:
+        level = min(max(math.ceil(math.log2(360.0 * cells_per_side / span)), 0), MAX_SNAP_LEVEL)
+
+    step = 360.0 / (1 << level)
+    return GridBbox(
+        level=level,
+        min_x=math.floor(bbox.west / step),
+        min_y=math.floor(bbox.south / step),
+        max_x=math.ceil(bbox.east / step),
+        max_y=math.ceil(bbox.north / step),
+    )
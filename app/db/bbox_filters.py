@@ -0,0 +1,71 @@
+from typing import Any, NamedTuple
+
+from sqlalchemy import ColumnElement, and_, func, or_
+
+from app.core.spatial import bbox_key_ranges
+from app.repositories.location_repository import BoundingBox
+
+# How bbox lookups reach the locations table:
+#   spatial_key - Z-order key ranges seeking idx_locations_spatial_key (default)
+#   between     - plain lat/lon BETWEEN, leaving the choice of index to the planner
+#   gist        - point(lon, lat) <@ box(...) against the idx_locations_point_gist index
+BBOX_STRATEGIES = ("spatial_key", "between", "gist")
+
+
+class BboxFilter(NamedTuple):
+    join: str
+    where: str
+    params: dict[str, Any]
+
+
+def _check_strategy(strategy: str) -> None:
+    if strategy not in BBOX_STRATEGIES:
+        raise ValueError(
+            f"Unknown bbox strategy '{strategy}', expected one of {', '.join(BBOX_STRATEGIES)}"
+        )
+
+
+def bbox_sql(bbox: BoundingBox, strategy: str, alias: str = "l") -> BboxFilter:
+    """Raw SQL fragments restricting ``alias`` to ``bbox`` using the given strategy."""
+    _check_strategy(strategy)
+    params = {"south": bbox.south, "north": bbox.north, "west": bbox.west, "east": bbox.east}
+
+    if strategy == "gist":
+        # The expression must match the index definition exactly for the planner to use it.
+        where = (
+            f"point({alias}.lon, {alias}.lat) <@ box(point(:west, :south), point(:east, :north))"
+        )
+        return BboxFilter(join="", where=where, params=params)
+
+    where = f"{alias}.lat BETWEEN :south AND :north AND {alias}.lon BETWEEN :west AND :east"
+    if strategy == "between":
+        return BboxFilter(join="", where=where, params=params)
+
+    # The Z-order cover overshoots the bbox, so the exact lat/lon predicate stays.
+    key_ranges = bbox_key_ranges(bbox)
+    join = (
+        "JOIN unnest(CAST(:range_lo AS bigint[]), CAST(:range_hi AS bigint[])) AS r(lo, hi)"
+        f" ON {alias}.spatial_key BETWEEN r.lo AND r.hi"
+    )
+    params["range_lo"] = [lo for lo, _ in key_ranges]
+    params["range_hi"] = [hi for _, hi in key_ranges]
+    return BboxFilter(join=join, where=where, params=params)
+
+
+def bbox_clause(model, bbox: BoundingBox, strategy: str) -> ColumnElement[bool]:
+    """ORM equivalent of :func:`bbox_sql` for ``select(model)`` statements."""
+    _check_strategy(strategy)
+
+    if strategy == "gist":
+        return func.point(model.lon, model.lat).op("<@")(
+            func.box(func.point(bbox.west, bbox.south), func.point(bbox.east, bbox.north))
+        )
+
+    clause = and_(
+        model.lat.between(bbox.south, bbox.north), model.lon.between(bbox.west, bbox.east)
+    )
+    if strategy == "between":
+        return clause
+
+    key_ranges = bbox_key_ranges(bbox)
+    return and_(or_(*(model.spatial_key.between(lo, hi) for lo, hi in key_ranges)), clause)
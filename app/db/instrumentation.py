@@ -0,0 +1,200 @@
+"""Per-query database metrics.
+
+Repository methods label the queries they run with a logical operation
+(``location.find_with_current_tenancy``, ``tenancy.find_by_location``, ...);
+engine events then record latency and row counts per operation, and the
+instrumented pool records how long each operation waited for a connection.
+Queries issued outside a repository method are labelled ``other``.
+Statements over the slow query threshold go to :mod:`app.db.slow_queries`.
+"""
+
+import functools
+import inspect
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.request_context import current_request
+from app.db.slow_queries import SlowQueryLog, in_explain, slow_query_log
+
+query_duration_histogram = Histogram(
+    "wutbh_db_query_seconds",
+    "Database statement execution time",
+    ["engine", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+query_rows_histogram = Histogram(
+    "wutbh_db_query_rows",
+    "Rows returned or affected per database statement",
+    ["engine", "operation"],
+    buckets=(0, 1, 5, 10, 50, 100, 300, 1000, 5000, 20000),
+)
+query_errors_counter = Counter(
+    "wutbh_db_query_errors_total", "Database statements that raised", ["engine", "operation"]
+)
+pool_wait_histogram = Histogram(
+    "wutbh_db_pool_wait_seconds",
+    "Time spent waiting for (or opening) a pooled connection",
+    ["engine", "operation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+pool_connections_gauge = Gauge(
+    "wutbh_db_pool_connections",
+    "Pooled connections by state (checked_out, idle, overflow)",
+    ["engine", "state"],
+)
+
+UNLABELLED = "other"
+
+
+class Operation(NamedTuple):
+    name: str
+    # Repository method and call arguments, bound lazily (only slow queries need them).
+    method: Optional[Callable] = None
+    args: tuple = ()
+    kwargs: dict = {}
+
+    def arguments(self) -> dict[str, Any]:
+        if self.method is None:
+            return {}
+        bound = inspect.signature(self.method).bind(*self.args, **self.kwargs)
+        bound.apply_defaults()
+        return {name: value for name, value in list(bound.arguments.items())[1:]}
+
+
+_operation: ContextVar[Optional[Operation]] = ContextVar("db_operation", default=None)
+
+
+def current_operation() -> str:
+    operation = _operation.get()
+    return operation.name if operation is not None else UNLABELLED
+
+
+def current_operation_arguments() -> dict[str, Any]:
+    operation = _operation.get()
+    return operation.arguments() if operation is not None else {}
+
+
+@contextmanager
+def db_operation(name: str, method: Optional[Callable] = None, *args, **kwargs) -> Iterator[None]:
+    """Label queries run inside the block; an enclosing label takes precedence."""
+    if _operation.get() is not None:
+        yield
+        return
+
+    token = _operation.set(Operation(name, method, args, kwargs))
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+class InstrumentedRepository:
+    """Mixin labelling every public async method as ``<model>.<method>``.
+
+    ``PostgresLocationRepository.find_clusters`` becomes
+    ``location.find_clusters``, for both the Postgres and Supabase repositories.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, method in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(method):
+                setattr(cls, name, _labelled(name, method))
+
+
+def _labelled(name: str, method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        label = f"{_snake_case(self._model.__name__)}.{name}"
+        with db_operation(label, method, self, *args, **kwargs):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times connection checkouts (``pool_logging_name`` is the engine label)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            pool_wait_histogram.labels(
+                engine=self.logging_name or "default", operation=current_operation()
+            ).observe(elapsed)
+            context = current_request()
+            if context is not None:
+                context.add_span("pool", elapsed)
+
+
+def instrument_pool(pool, name: str) -> None:
+    if not isinstance(pool, QueuePool):
+        return
+
+    gauge = pool_connections_gauge
+    gauge.labels(engine=name, state="checked_out").set_function(pool.checkedout)
+    gauge.labels(engine=name, state="idle").set_function(pool.checkedin)
+    # QueuePool.overflow() counts up from -pool_size.
+    gauge.labels(engine=name, state="overflow").set_function(lambda: max(pool.overflow(), 0))
+
+
+def instrument_engine(
+    engine: AsyncEngine | Engine, name: str, slow_queries: SlowQueryLog = slow_query_log
+) -> None:
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    instrument_pool(sync_engine.pool, name)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if in_explain():
+            return
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if in_explain():
+            return
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = current_operation()
+
+        query_duration_histogram.labels(engine=name, operation=operation).observe(elapsed)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            query_rows_histogram.labels(engine=name, operation=operation).observe(cursor.rowcount)
+
+        request = current_request()
+        if request is not None:
+            request.add_span("sql", elapsed)
+
+        if slow_queries.enabled and elapsed >= slow_queries.threshold:
+            entry = slow_queries.record(
+                name, operation, statement, parameters, current_operation_arguments(), elapsed
+            )
+            # EXPLAIN needs the async engine to open its own connection off this one.
+            if isinstance(engine, AsyncEngine) and slow_queries.should_explain(
+                statement, executemany
+            ):
+                slow_queries.schedule_explain(engine, entry, statement, parameters)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        if in_explain():
+            return
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+        query_errors_counter.labels(engine=name, operation=current_operation()).inc()
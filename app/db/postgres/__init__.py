@@ -1,8 +1,20 @@
+from app.db.postgres.postgres_replicas import start_replica_monitor, stop_replica_monitor
 from app.db.postgres.postgres_session import (
     engine,
     AsyncSessionLocal,
+    replicas,
     get_db,
+    get_read_db,
     check_db_connection,
 )
 
-__all__ = ["engine", "AsyncSessionLocal", "get_db", "check_db_connection"]
+__all__ = [
+    "engine",
+    "AsyncSessionLocal",
+    "replicas",
+    "get_db",
+    "get_read_db",
+    "check_db_connection",
+    "start_replica_monitor",
+    "stop_replica_monitor",
+]
@@ -0,0 +1,171 @@
+"""Read replica routing.
+
+Read-only requests (``get_read_db``) are spread round robin over the
+``DATABASE_REPLICA_URLS`` replicas; everything else, including memory
+submissions and the ETL, runs on the primary. A monitor polls each replica's
+replay lag and dataset version every ``DATABASE_REPLICA_CHECK_SECONDS``. A
+replica that is unreachable, more than ``DATABASE_REPLICA_MAX_LAG_SECONDS``
+behind, or on an older dataset version than this process has seen is
+skipped, and reads fall back to the primary when no replica is usable. The
+version check keeps responses cached under a new dataset version from being
+built from a replica's old rows.
+"""
+
+import asyncio
+from typing import Callable, Optional, Sequence
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+read_session_counter = Counter(
+    "wutbh_db_read_sessions_total",
+    "Read-only request sessions by the engine that served them",
+    ["engine"],
+)
+replica_skipped_counter = Counter(
+    "wutbh_db_replica_skipped_total",
+    "Read sessions not routed to a replica, by reason (unavailable, lagging, stale_version)",
+    ["engine", "reason"],
+)
+replica_lag_gauge = Gauge(
+    "wutbh_db_replica_lag_seconds", "Replay lag at the last replica check", ["engine"]
+)
+replica_available_gauge = Gauge(
+    "wutbh_db_replica_available", "1 if the last replica check succeeded", ["engine"]
+)
+
+CHECK_TIMEOUT_SECONDS = 5.0
+
+# Zero when the replica has replayed everything it received (an idle primary
+# writes nothing, so the last replayed transaction's age would grow forever)
+# and when the URL points at a server that is not in recovery.
+REPLICA_STATUS = text(
+    """
+    SELECT
+        CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END AS lag_seconds,
+        (SELECT version FROM dataset_version WHERE id = 1) AS dataset_version
+    """
+)
+
+VersionFloor = Callable[[], Optional[int]]
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine, sessions: async_sessionmaker):
+        self.name = name
+        self.engine = engine
+        self.sessions = sessions
+        # None until the first check; reads stay on the primary until then.
+        self.available: Optional[bool] = None
+        self.lag_seconds: Optional[float] = None
+        self.dataset_version: Optional[int] = None
+
+
+class ReplicaSet:
+    def __init__(self, replicas: Sequence[Replica], max_lag_seconds: float):
+        self.replicas = list(replicas)
+        self.max_lag_seconds = max_lag_seconds
+        self.version_floor: VersionFloor = lambda: None
+        self._next = 0
+
+    def unusable_reason(self, replica: Replica) -> Optional[str]:
+        if not replica.available:
+            return "unavailable"
+        if replica.lag_seconds is None or replica.lag_seconds > self.max_lag_seconds:
+            return "lagging"
+        floor = self.version_floor()
+        if floor is not None and (replica.dataset_version or 0) < floor:
+            return "stale_version"
+        return None
+
+    def choose(self) -> Optional[Replica]:
+        """Next usable replica in round robin order, or None to use the primary."""
+        for offset in range(len(self.replicas)):
+            index = (self._next + offset) % len(self.replicas)
+            replica = self.replicas[index]
+            reason = self.unusable_reason(replica)
+            if reason is None:
+                self._next = index + 1
+                return replica
+            replica_skipped_counter.labels(engine=replica.name, reason=reason).inc()
+        return None
+
+    def mark_failed(self, replica: Replica) -> None:
+        if replica.available:
+            logger.warning(
+                "Read replica failed, routing reads elsewhere", extra={"engine": replica.name}
+            )
+        replica.available = False
+        replica_available_gauge.labels(engine=replica.name).set(0)
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            row = await asyncio.wait_for(self._status(replica), timeout=CHECK_TIMEOUT_SECONDS)
+        except Exception:
+            if replica.available is not False:
+                logger.warning(
+                    "Read replica check failed", extra={"engine": replica.name}, exc_info=True
+                )
+            self.mark_failed(replica)
+            return
+
+        replica.lag_seconds = float(row.lag_seconds)
+        replica.dataset_version = row.dataset_version
+        if not replica.available:
+            logger.info("Read replica available", extra={"engine": replica.name})
+        replica.available = True
+        replica_available_gauge.labels(engine=replica.name).set(1)
+        replica_lag_gauge.labels(engine=replica.name).set(replica.lag_seconds)
+
+    async def _status(self, replica: Replica):
+        async with replica.engine.connect() as conn:
+            return (await conn.execute(REPLICA_STATUS)).one()
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+
+_monitor_task: Optional[asyncio.Task] = None
+
+
+async def _check_periodically(replica_set: ReplicaSet, interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await replica_set.check_all()
+
+
+async def start_replica_monitor(
+    replica_set: ReplicaSet, version_floor: Optional[VersionFloor] = None
+) -> None:
+    global _monitor_task
+
+    if not replica_set.replicas:
+        return
+    if version_floor is not None:
+        replica_set.version_floor = version_floor
+
+    await replica_set.check_all()
+
+    if settings.database_replica_check_seconds > 0:
+        _monitor_task = asyncio.create_task(
+            _check_periodically(replica_set, settings.database_replica_check_seconds)
+        )
+
+
+async def stop_replica_monitor() -> None:
+    global _monitor_task
+
+    if _monitor_task is not None:
+        _monitor_task.cancel()
+        await asyncio.gather(_monitor_task, return_exceptions=True)
+        _monitor_task = None
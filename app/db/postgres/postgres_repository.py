@@ -4,12 +4,13 @@ from sqlalchemy import select, delete, func
 
 from app.repositories.base import BaseRepository
 from app.db.base import Base
+from app.db.instrumentation import InstrumentedRepository
 
 T = TypeVar("T", bound=Base)
 ID = TypeVar("ID")
 
 
-class PostgresRepository(BaseRepository[T, ID], Generic[T, ID]):
+class PostgresRepository(InstrumentedRepository, BaseRepository[T, ID], Generic[T, ID]):
     def __init__(self, session: AsyncSession, model: Type[T]):
         super().__init__(session)
         self._model = model
@@ -1,28 +1,57 @@
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import InstrumentedAsyncAdaptedQueuePool, instrument_engine
+from app.db.postgres.postgres_replicas import Replica, ReplicaSet, read_session_counter
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.log_level == "DEBUG",
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
-    connect_args={
-        "timeout": 30,
-        "command_timeout": 30,
-        "server_settings": {"application_name": "nostalgia_api"},
-    },
-)
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+def _create_engine(url: str, name: str):
+    engine = create_async_engine(
+        url,
+        echo=settings.log_level == "DEBUG",
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_logging_name=name,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,
+        connect_args={
+            "timeout": 30,
+            "command_timeout": 30,
+            "server_settings": {"application_name": "nostalgia_api"},
+        },
+    )
+    instrument_engine(engine, name)
+    return engine
+
+
+def _create_sessionmaker(engine):
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+engine = _create_engine(settings.database_url, "postgres")
+
+AsyncSessionLocal = _create_sessionmaker(engine)
+
+
+def _create_replica(index: int, url: str) -> Replica:
+    replica_engine = _create_engine(url, f"postgres_replica_{index}")
+    return Replica(
+        f"postgres_replica_{index}", replica_engine, _create_sessionmaker(replica_engine)
+    )
+
+
+replicas = ReplicaSet(
+    [_create_replica(index, url) for index, url in enumerate(settings.database_replica_urls)],
+    max_lag_seconds=settings.database_replica_max_lag_seconds,
 )
 
 
@@ -38,6 +67,29 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Session for read-only requests: a usable replica, else the primary.
+
+    Nothing is committed, so handlers that write must depend on ``get_db``.
+    """
+    replica = replicas.choose()
+    if replica is None:
+        read_session_counter.labels(engine="postgres").inc()
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    read_session_counter.labels(engine=replica.name).inc()
+    async with replica.sessions() as session:
+        try:
+            yield session
+        except (OSError, DBAPIError) as exc:
+            # Stop routing to an unreachable replica until the monitor sees it back.
+            if isinstance(exc, OSError) or exc.connection_invalidated:
+                replicas.mark_failed(replica)
+            raise
+
+
 async def check_db_connection() -> bool:
     try:
         async with engine.connect() as conn:
@@ -2,15 +2,20 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import InstrumentedAsyncAdaptedQueuePool, instrument_engine
 
 engine = create_async_engine(
     settings.database_url,
     echo=False,
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_logging_name="default",
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20,
 )
 
+instrument_engine(engine, "default")
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
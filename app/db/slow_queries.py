@@ -0,0 +1,239 @@
+"""Slow query log with sampled plan capture.
+
+Statements slower than ``slow_query_threshold_ms`` are logged with their SQL,
+driver parameters, the repository call that issued them (bounding boxes are
+summarised as their extent, sequences as their length) and their duration,
+and kept in a bounded in-process log. Strings longer than a short code or
+status are reduced to their length, so free text such as memory notes never
+reaches the log. A ``slow_query_explain_sample_rate``
+fraction of slow ``SELECT`` statements is re-run under
+``EXPLAIN (ANALYZE, BUFFERS)`` on a separate connection, inside a transaction
+that is rolled back, and the plan is attached to the entry. At most one
+``EXPLAIN`` runs at a time so a burst of slow queries cannot double the load
+that caused it.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from prometheus_client import Counter
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.request_context import get_correlation_id
+
+logger = get_logger(__name__)
+
+slow_query_counter = Counter(
+    "wutbh_db_slow_queries_total",
+    "Database statements slower than the slow query threshold",
+    ["engine", "operation"],
+)
+slow_query_explain_counter = Counter(
+    "wutbh_db_slow_query_explains_total",
+    "EXPLAIN ANALYZE runs for sampled slow queries, by outcome",
+    ["engine", "outcome"],
+)
+
+MAX_STATEMENT_CHARS = 4000
+# Longer strings are logged as their type and length only.
+MAX_PLAIN_STRING_CHARS = 16
+EXPLAIN_TIMEOUT_MS = 30_000
+
+# Set inside the EXPLAIN task, whose statements are not the application's own.
+_explaining: ContextVar[bool] = ContextVar("explaining_slow_query", default=False)
+
+
+def in_explain() -> bool:
+    return _explaining.get()
+
+
+@dataclass
+class SlowQuery:
+    engine: str
+    operation: str
+    statement: str
+    parameters: Any
+    arguments: dict[str, Any]
+    duration_ms: float
+    correlation_id: Optional[str]
+    recorded_at: float = field(default_factory=time.time)
+    plan: Optional[Any] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "engine": self.engine,
+            "operation": self.operation,
+            "statement": self.statement,
+            "parameters": self.parameters,
+            "arguments": self.arguments,
+            "duration_ms": self.duration_ms,
+            "correlation_id": self.correlation_id,
+            "recorded_at": self.recorded_at,
+            "plan": self.plan,
+        }
+
+
+def summarize_argument(value: Any) -> Any:
+    """Reduce a repository argument to something small enough to log."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) <= MAX_PLAIN_STRING_CHARS:
+            return value
+        return {"type": "str", "length": len(value)}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"type": type(value).__name__, "length": len(value)}
+    if all(hasattr(value, side) for side in ("west", "south", "east", "north")):
+        return {
+            "west": value.west,
+            "south": value.south,
+            "east": value.east,
+            "north": value.north,
+            "width": round(value.east - value.west, 6),
+            "height": round(value.north - value.south, 6),
+        }
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return {"length": len(value)}
+    # repr() of an entity or JSON value could carry user text.
+    return {"type": type(value).__name__}
+
+
+def summarize_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: summarize_argument(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [summarize_argument(value) for value in parameters]
+    return summarize_argument(parameters)
+
+
+def is_explainable(statement: str, executemany: bool) -> bool:
+    return not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, max_entries: int):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self._entries: deque[SlowQuery] = deque(maxlen=max_entries)
+        self._explain_in_flight = False
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def entries(self) -> list[SlowQuery]:
+        return list(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def record(
+        self,
+        engine_name: str,
+        operation: str,
+        statement: str,
+        parameters: Any,
+        arguments: dict[str, Any],
+        elapsed: float,
+    ) -> SlowQuery:
+        entry = SlowQuery(
+            engine=engine_name,
+            operation=operation,
+            statement=statement[:MAX_STATEMENT_CHARS],
+            parameters=summarize_parameters(parameters),
+            arguments={name: summarize_argument(value) for name, value in arguments.items()},
+            duration_ms=round(elapsed * 1000, 3),
+            correlation_id=get_correlation_id(),
+        )
+        self._entries.append(entry)
+        slow_query_counter.labels(engine=engine_name, operation=operation).inc()
+        logger.warning(
+            "Slow query",
+            extra={
+                "engine": entry.engine,
+                "operation": entry.operation,
+                "duration_ms": entry.duration_ms,
+                "statement": entry.statement,
+                "parameters": entry.parameters,
+                "arguments": entry.arguments,
+            },
+        )
+        return entry
+
+    def should_explain(self, statement: str, executemany: bool) -> bool:
+        return (
+            not self._explain_in_flight
+            and random.random() < self.explain_sample_rate
+            and is_explainable(statement, executemany)
+        )
+
+    def schedule_explain(
+        self, engine: AsyncEngine, entry: SlowQuery, statement: str, parameters: Sequence
+    ) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._explain_in_flight = True
+        task = loop.create_task(self._explain(engine, entry, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(
+        self, engine: AsyncEngine, entry: SlowQuery, statement: str, parameters: Sequence
+    ) -> None:
+        _explaining.set(True)
+        try:
+            async with engine.connect() as conn:
+                async with conn.begin() as transaction:
+                    await conn.exec_driver_sql(
+                        f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}"
+                    )
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+                    )
+                    plan = result.scalar_one()
+                    await transaction.rollback()
+        except Exception:
+            slow_query_explain_counter.labels(engine=entry.engine, outcome="error").inc()
+            logger.warning(
+                "Could not explain slow query",
+                extra={"operation": entry.operation},
+                exc_info=True,
+            )
+            return
+        finally:
+            self._explain_in_flight = False
+
+        entry.plan = json.loads(plan) if isinstance(plan, str) else plan
+        slow_query_explain_counter.labels(engine=entry.engine, outcome="captured").inc()
+        logger.warning(
+            "Slow query plan",
+            extra={
+                "engine": entry.engine,
+                "operation": entry.operation,
+                "duration_ms": entry.duration_ms,
+                "plan": entry.plan,
+            },
+        )
+
+    async def wait_for_explains(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_threshold_ms,
+    explain_sample_rate=settings.slow_query_explain_sample_rate,
+    max_entries=settings.slow_query_log_size,
+)
@@ -0,0 +1,28 @@
+from sqlalchemy import select, update
+from sqlalchemy.sql import func
+
+from app.db.supabase.supabase_repository import SupabaseRepository
+from app.repositories.dataset_version_repository import IDatasetVersionRepository
+from app.models.dataset_version import DatasetVersion
+
+
+class SupabaseDatasetVersionRepository(
+    SupabaseRepository[DatasetVersion, int], IDatasetVersionRepository
+):
+    def __init__(self, session):
+        super().__init__(session, DatasetVersion)
+
+    async def get_current(self) -> int:
+        stmt = select(self._model.version).where(self._model.id == 1)
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none() or 0
+
+    async def bump(self) -> int:
+        stmt = (
+            update(self._model)
+            .where(self._model.id == 1)
+            .values(version=self._model.version + 1, updated_at=func.now())
+            .returning(self._model.version)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one()
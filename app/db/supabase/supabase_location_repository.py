@@ -5,11 +5,14 @@ from sqlalchemy.orm import selectinload
 from app.db.supabase.supabase_repository import SupabaseRepository
 from app.repositories.location_repository import ILocationRepository, BoundingBox
 from app.models.location import Location
+from app.core.config import settings
+from app.db.bbox_filters import bbox_clause, bbox_sql
 
 
 class SupabaseLocationRepository(SupabaseRepository[Location, int], ILocationRepository):
-    def __init__(self, session):
+    def __init__(self, session, bbox_strategy: Optional[str] = None):
         super().__init__(session, Location)
+        self._bbox_strategy = bbox_strategy or settings.location_bbox_strategy
 
     async def find_by_coordinates(
         self, lat: float, lon: float, tolerance: float = 0.0001
@@ -21,13 +24,136 @@ class SupabaseLocationRepository(SupabaseRepository[Location, int], ILocationRep
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_detail(self, location_id: int, timeline_limit: int = 3) -> Optional[dict]:
+        # One statement: the lateral subquery takes the top-N tenancies through
+        # idx_tenancies_location_id, so cost stays flat however long the history is.
+        query = text(
+            """
+            SELECT
+                l.id,
+                l.lat,
+                l.lon,
+                l.address,
+                t.business_name,
+                t.category,
+                t.start_date,
+                t.end_date,
+                t.is_current
+            FROM locations l
+            LEFT JOIN LATERAL (
+                SELECT business_name, category, start_date, end_date, is_current, created_at
+                FROM tenancies
+                WHERE location_id = l.id
+                ORDER BY is_current DESC, end_date DESC NULLS FIRST, created_at DESC
+                LIMIT :timeline_limit
+            ) t ON true
+            WHERE l.id = :location_id
+            ORDER BY t.is_current DESC, t.end_date DESC NULLS FIRST, t.created_at DESC
+        """
+        )
+
+        result = await self._session.execute(
+            query, {"location_id": location_id, "timeline_limit": timeline_limit}
+        )
+        rows = result.all()
+        if not rows:
+            return None
+
+        first = rows[0]._mapping
+        return {
+            "id": first["id"],
+            "lat": first["lat"],
+            "lon": first["lon"],
+            "address": first["address"],
+            "timeline": [
+                {
+                    "business_name": row.business_name,
+                    "category": row.category,
+                    "start_date": row.start_date,
+                    "end_date": row.end_date,
+                    "is_current": row.is_current,
+                }
+                for row in rows
+                if row.business_name is not None
+            ],
+        }
+
+    async def find_details_by_ids(
+        self, location_ids: Sequence[int], timeline_limit: int = 3
+    ) -> Sequence[dict]:
+        if not location_ids:
+            return []
+
+        locations_query = text(
+            """
+            SELECT l.id, l.lat, l.lon, l.address
+            FROM locations l
+            WHERE l.id = ANY(:location_ids)
+        """
+        )
+        result = await self._session.execute(locations_query, {"location_ids": list(location_ids)})
+        details = {
+            row.id: {
+                "id": row.id,
+                "lat": row.lat,
+                "lon": row.lon,
+                "address": row.address,
+                "timeline": [],
+            }
+            for row in result
+        }
+        if not details:
+            return []
+
+        timeline_query = text(
+            """
+            SELECT
+                ranked.location_id,
+                ranked.business_name,
+                ranked.category,
+                ranked.start_date,
+                ranked.end_date,
+                ranked.is_current
+            FROM (
+                SELECT
+                    t.location_id,
+                    t.business_name,
+                    t.category,
+                    t.start_date,
+                    t.end_date,
+                    t.is_current,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY t.location_id
+                        ORDER BY t.is_current DESC, t.end_date DESC NULLS FIRST, t.created_at DESC
+                    ) AS rn
+                FROM tenancies t
+                WHERE t.location_id = ANY(:location_ids)
+            ) ranked
+            WHERE ranked.rn <= :timeline_limit
+            ORDER BY ranked.location_id, ranked.rn
+        """
+        )
+        result = await self._session.execute(
+            timeline_query,
+            {"location_ids": list(details), "timeline_limit": timeline_limit},
+        )
+        for row in result:
+            details[row.location_id]["timeline"].append(
+                {
+                    "business_name": row.business_name,
+                    "category": row.category,
+                    "start_date": row.start_date,
+                    "end_date": row.end_date,
+                    "is_current": row.is_current,
+                }
+            )
+
+        return [details[location_id] for location_id in location_ids if location_id in details]
+
     async def find_in_bounding_box(self, bbox: BoundingBox, limit: int = 300) -> Sequence[Location]:
         stmt = (
             select(self._model)
-            .where(
-                (self._model.lat.between(bbox.south, bbox.north))
-                & (self._model.lon.between(bbox.west, bbox.east))
-            )
+            .where(bbox_clause(self._model, bbox, self._bbox_strategy))
             .options(selectinload(self._model.tenancies))
             .limit(limit)
         )
@@ -35,8 +161,34 @@ class SupabaseLocationRepository(SupabaseRepository[Location, int], ILocationRep
         return result.scalars().all()
 
     async def find_with_current_tenancy(
-        self, bbox: BoundingBox, limit: int = 300
+        self, bbox: BoundingBox, limit: int = 300, after_id: int = 0
     ) -> Sequence[dict]:
+        bbox_filter = bbox_sql(bbox, self._bbox_strategy)
+        query = text(
+            f"""
+            SELECT
+                l.id,
+                l.lat,
+                l.lon,
+                l.address,
+                l.current_business,
+                l.current_category
+            FROM locations l
+            {bbox_filter.join}
+            WHERE {bbox_filter.where}
+              AND l.id > :after_id
+            ORDER BY l.id
+            LIMIT :limit
+        """
+        )
+
+        result = await self._session.execute(
+            query, {**bbox_filter.params, "after_id": after_id, "limit": limit}
+        )
+
+        return [dict(row._mapping) for row in result]
+
+    async def find_all_with_current_tenancy(self) -> Sequence[dict]:
         query = text(
             """
             SELECT
@@ -44,26 +196,44 @@ class SupabaseLocationRepository(SupabaseRepository[Location, int], ILocationRep
                 l.lat,
                 l.lon,
                 l.address,
-                v.business_name as current_business,
-                v.category as current_category
+                l.current_business,
+                l.current_category
             FROM locations l
-            LEFT JOIN v_latest_tenancy v ON l.id = v.location_id
-            WHERE l.lat BETWEEN :south AND :north
-              AND l.lon BETWEEN :west AND :east
             ORDER BY l.id
+        """
+        )
+
+        result = await self._session.execute(query)
+
+        return [dict(row._mapping) for row in result]
+
+    async def find_clusters(
+        self, bbox: BoundingBox, cell_size: float, limit: int = 500
+    ) -> Sequence[dict]:
+        bbox_filter = bbox_sql(bbox, self._bbox_strategy)
+        query = text(
+            f"""
+            SELECT
+                floor(l.lon / :cell_size)::bigint AS cell_x,
+                floor(l.lat / :cell_size)::bigint AS cell_y,
+                count(*) AS count,
+                avg(l.lat) AS lat,
+                avg(l.lon) AS lon,
+                min(l.id) AS representative_id,
+                (array_agg(l.current_business ORDER BY l.id)
+                    FILTER (WHERE l.current_business IS NOT NULL))[1] AS representative_business
+            FROM locations l
+            {bbox_filter.join}
+            WHERE {bbox_filter.where}
+            GROUP BY cell_x, cell_y
+            ORDER BY count DESC, representative_id
             LIMIT :limit
         """
         )
 
         result = await self._session.execute(
             query,
-            {
-                "south": bbox.south,
-                "north": bbox.north,
-                "west": bbox.west,
-                "east": bbox.east,
-                "limit": limit,
-            },
+            {**bbox_filter.params, "cell_size": cell_size, "limit": limit},
         )
 
         return [dict(row._mapping) for row in result]
@@ -2,10 +2,13 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import InstrumentedAsyncAdaptedQueuePool, instrument_engine
 
 engine = create_async_engine(
     settings.database_url,
     echo=settings.log_level == "DEBUG",
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_logging_name="supabase",
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20,
@@ -17,6 +20,8 @@ engine = create_async_engine(
     },
 )
 
+instrument_engine(engine, "supabase")
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -1,12 +1,42 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from datetime import date
-from sqlalchemy import select, or_, and_
+from sqlalchemy import select, or_, and_, text
 
 from app.db.supabase.supabase_repository import SupabaseRepository
 from app.repositories.tenancy_repository import ITenancyRepository
 from app.models.tenancy import Tenancy
 
 
+def _latest_tenancy_sql(scoped: bool = False) -> str:
+    """Latest tenancy per location, using the same ordering as the v_latest_tenancy view.
+
+    Locations without tenancies yield NULLs so stale denormalized values get
+    cleared. When ``scoped``, both sides are filtered by ``:location_ids``;
+    filtering only the outer query would still run DISTINCT ON over every
+    tenancy.
+    """
+    location_scope = "WHERE loc.id = ANY(:location_ids)" if scoped else ""
+    tenancy_scope = "WHERE t.location_id = ANY(:location_ids)" if scoped else ""
+    return f"""
+        SELECT loc.id AS location_id, v.business_name, v.category
+        FROM locations loc
+        LEFT JOIN (
+            SELECT DISTINCT ON (t.location_id) t.location_id, t.business_name, t.category
+            FROM tenancies t
+            {tenancy_scope}
+            ORDER BY t.location_id, t.is_current DESC, t.end_date DESC NULLS FIRST,
+                     t.created_at DESC
+        ) v ON v.location_id = loc.id
+        {location_scope}
+    """
+
+
+_MISMATCH_FILTER = """
+    WHERE l.current_business IS DISTINCT FROM latest.business_name
+       OR l.current_category IS DISTINCT FROM latest.category
+"""
+
+
 class SupabaseTenancyRepository(SupabaseRepository[Tenancy, int], ITenancyRepository):
     def __init__(self, session):
         super().__init__(session, Tenancy)
@@ -60,3 +90,56 @@ class SupabaseTenancyRepository(SupabaseRepository[Tenancy, int], ITenancyReposi
         )
         result = await self._session.execute(stmt)
         return result.scalars().all()
+
+    async def refresh_current_tenancy(self, location_ids: Optional[Sequence[int]] = None) -> int:
+        if location_ids is not None and not location_ids:
+            return 0
+
+        query = text(
+            f"""
+            UPDATE locations l
+            SET current_business = latest.business_name,
+                current_category = latest.category
+            FROM ({_latest_tenancy_sql(scoped=location_ids is not None)}) latest
+            WHERE l.id = latest.location_id
+              AND (l.current_business IS DISTINCT FROM latest.business_name
+                   OR l.current_category IS DISTINCT FROM latest.category)
+        """
+        )
+
+        params = {"location_ids": list(location_ids)} if location_ids is not None else {}
+        result = await self._session.execute(query, params)
+        return result.rowcount
+
+    async def count_current_tenancy_mismatches(self) -> int:
+        query = text(
+            f"""
+            SELECT count(*)
+            FROM locations l
+            JOIN ({_latest_tenancy_sql()}) latest ON latest.location_id = l.id
+            {_MISMATCH_FILTER}
+        """
+        )
+
+        result = await self._session.execute(query)
+        return result.scalar_one()
+
+    async def find_current_tenancy_mismatches(self, limit: int = 100) -> Sequence[dict]:
+        query = text(
+            f"""
+            SELECT
+                l.id AS location_id,
+                l.current_business,
+                l.current_category,
+                latest.business_name AS expected_business,
+                latest.category AS expected_category
+            FROM locations l
+            JOIN ({_latest_tenancy_sql()}) latest ON latest.location_id = l.id
+            {_MISMATCH_FILTER}
+            ORDER BY l.id
+            LIMIT :limit
+        """
+        )
+
+        result = await self._session.execute(query, {"limit": limit})
+        return [dict(row._mapping) for row in result]
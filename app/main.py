@@ -4,24 +4,49 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from app.api import locations, memories
+from app.api import locations, memories, tiles
 from app.core.config import settings
-from app.core.logging import configure_logging, get_logger
+from app.core.logging import configure_logging, get_logger, stop_logging
 from app.core.exceptions import http_exception_handler, unhandled_exception_handler
-from app.db.postgres import check_db_connection
+from app.db.postgres import (
+    check_db_connection,
+    replicas,
+    start_replica_monitor,
+    stop_replica_monitor,
+)
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.correlation_id import CorrelationIdMiddleware
 from app.middleware.logging import JSONLoggingMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.services.dataset_version import (
+    dataset_version_tracker,
+    start_dataset_version_tracker,
+    stop_dataset_version_tracker,
+)
+from app.services.location_index import start_location_index, stop_location_index
 
 logger = get_logger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    configure_logging(log_level=settings.log_level, log_format=settings.log_format)
+    configure_logging(
+        log_level=settings.log_level,
+        log_format=settings.log_format,
+        queue_size=settings.log_queue_size,
+    )
     logger.info(f"Starting {settings.app_name}")
+    await start_dataset_version_tracker()
+    # Replicas behind the dataset version this process has seen are skipped.
+    await start_replica_monitor(replicas, version_floor=lambda: dataset_version_tracker.current)
+    await start_location_index()
     yield
+    await stop_location_index()
+    await stop_replica_monitor()
+    await stop_dataset_version_tracker()
     logger.info(f"Shutting down {settings.app_name}")
+    stop_logging()
 
 
 app = FastAPI(
@@ -38,9 +63,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(CorrelationIdMiddleware)
-app.add_middleware(JSONLoggingMiddleware)
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
+# Last added runs first: the correlation id and request context wrap everything below.
 app.add_middleware(RateLimitMiddleware)
+app.add_middleware(JSONLoggingMiddleware)
+if settings.server_timing_enabled:
+    app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
 
 instrumentator = Instrumentator()
 instrumentator.instrument(app).expose(app, endpoint="/metrics")
@@ -50,6 +81,7 @@ app.add_exception_handler(Exception, unhandled_exception_handler)
 
 app.include_router(locations.router)
 app.include_router(memories.router)
+app.include_router(tiles.router)
 
 
 @app.get("/healthz")
@@ -1,22 +1,38 @@
+import re
 import uuid
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.core.logging import set_correlation_id
+from app.core.request_context import end_request, start_request
 
+# Inbound ids are echoed into headers and logs, so only accept short, plain tokens.
+VALID_CORRELATION_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        correlation_id = str(uuid.uuid4())
 
-        request.state.correlation_id = correlation_id
+class CorrelationIdMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        set_correlation_id(correlation_id)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        response = await call_next(request)
+        correlation_id = Headers(scope=scope).get("x-correlation-id", "")
+        if not VALID_CORRELATION_ID.match(correlation_id):
+            correlation_id = str(uuid.uuid4())
 
-        response.headers["X-Correlation-ID"] = correlation_id
+        # request.state is backed by scope["state"].
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
 
-        return response
+        async def send_with_correlation_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Correlation-ID"] = correlation_id
+            await send(message)
+
+        token = start_request(correlation_id)
+        try:
+            await self.app(scope, receive, send_with_correlation_id)
+        finally:
+            end_request(token)
@@ -1,39 +1,68 @@
+import random
 import time
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.request_context import current_request
 
 logger = get_logger(__name__)
 
 
-class JSONLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+class JSONLoggingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        response = await call_next(request)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.log_request(scope, status_code, time.time() - start_time)
 
-        process_time = time.time() - start_time
+    def log_request(self, scope: Scope, status_code: int, process_time: float) -> None:
+        context = current_request()
+        if context is not None:
+            context.observe_spans()
 
-        correlation_id = getattr(request.state, "correlation_id", "N/A")
+        success = status_code < 400 and process_time < settings.log_slow_request_seconds
+        sample_rate = settings.log_success_sample_rate
+        if success and random.random() >= sample_rate:
+            return
+
+        client = scope.get("client")
 
         log_data = {
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status_code": status_code,
             "process_time": round(process_time, 3),
-            "client_ip": request.client.host if request.client else None,
-            "correlation_id": correlation_id,
+            "client_ip": client[0] if client else None,
+            "correlation_id": scope.get("state", {}).get("correlation_id", "N/A"),
         }
+        if context is not None and context.spans:
+            log_data["spans_ms"] = context.span_millis()
+        if success:
+            # Lets log queries weight sampled lines back up to request counts.
+            log_data["sample_rate"] = sample_rate
 
-        if response.status_code >= 400:
-            if response.status_code >= 500:
+        if status_code >= 400:
+            if status_code >= 500:
                 logger.error("Server error", extra=log_data)
             else:
                 logger.warning("Client error", extra=log_data)
         else:
             logger.info("Request completed", extra=log_data)
-
-        return response
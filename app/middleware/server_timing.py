@@ -0,0 +1,62 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.request_context import current_request
+
+# Span name -> devtools label. "orm" is derived: repository time not spent waiting for a
+# connection or in cursor execution, i.e. building rows and models plus driver overhead.
+SPAN_DESCRIPTIONS = {
+    "pool": "DB connection wait",
+    "sql": "Query execution",
+    "orm": "Row materialization and driver",
+    "index": "In-memory index",
+    "cache": "Response cache",
+    "validate": "Pydantic validation",
+    "serialize": "JSON encoding",
+    "compress": "Compression",
+}
+
+
+def server_timing(spans: dict[str, float], total: float) -> str:
+    spans = dict(spans)
+    db = spans.pop("db", None)
+    if db is not None:
+        spans["orm"] = max(db - spans.get("pool", 0.0) - spans.get("sql", 0.0), 0.0)
+
+    metrics = [
+        f'{name};dur={seconds * 1000:.2f};desc="{SPAN_DESCRIPTIONS.get(name, name)}"'
+        for name, seconds in spans.items()
+    ]
+    metrics.append(f'total;dur={total * 1000:.2f};desc="Total"')
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """Send the request's spans as a ``Server-Timing`` header, for browser devtools.
+
+    Must run inside ``CorrelationIdMiddleware``, which owns the request context.
+    Only time spent before the response headers are sent is reported.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                context = current_request()
+                if context is not None:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", server_timing(context.spans, time.perf_counter() - start)
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
@@ -1,11 +1,15 @@
+from app.models.dataset_version import DatasetVersion
 from app.models.kc_food_inspection import KcFoodInspection
 from app.models.location import Location
 from app.models.memory_submission import MemorySubmission
+from app.models.rate_limit_bucket import RateLimitBucket
 from app.models.tenancy import Tenancy
 
 __all__ = [
+    "DatasetVersion",
     "KcFoodInspection",
     "Location",
     "MemorySubmission",
+    "RateLimitBucket",
     "Tenancy",
 ]
@@ -1,12 +1,18 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Index, Integer, SmallInteger, String
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer, SmallInteger, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
+from app.core.spatial import morton_key
 from app.db.base import Base
 
 
+def _default_spatial_key(context) -> int:
+    params = context.get_current_parameters()
+    return morton_key(params["lat"], params["lon"])
+
+
 class Location(Base):
     __tablename__ = "locations"
 
@@ -16,15 +22,28 @@ class Location(Base):
     address: Mapped[str] = mapped_column(String(500), nullable=False)
     unit: Mapped[str | None] = mapped_column(String, nullable=True)
     display_slot: Mapped[int] = mapped_column(SmallInteger, nullable=False, server_default="0")
+    current_business: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    current_category: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Kept in sync by the trg_locations_spatial_key trigger (migration 010) on every
+    # insert and coordinate update; the Python default only fills the column up front.
+    spatial_key: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=_default_spatial_key
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
+    # Collections are unbounded, so nothing loads implicitly; queries opt in with
+    # selectinload() or go through a purpose-built repository method.
     tenancies: Mapped[list["Tenancy"]] = relationship(
-        "Tenancy", back_populates="location", lazy="selectin"
+        "Tenancy", back_populates="location", lazy="raise"
     )
     memory_submissions: Mapped[list["MemorySubmission"]] = relationship(
-        "MemorySubmission", back_populates="location", lazy="selectin"
+        "MemorySubmission", back_populates="location", lazy="raise"
     )
 
-    __table_args__ = (Index("idx_locations_lat_lon", "lat", "lon"),)
+    __table_args__ = (
+        Index("idx_locations_lat_lon", "lat", "lon"),
+        Index("idx_locations_spatial_key", "spatial_key"),
+        Index("idx_locations_point_gist", func.point(lon, lat), postgresql_using="gist"),
+    )
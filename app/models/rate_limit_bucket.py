@@ -0,0 +1,14 @@
+from sqlalchemy import Float, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    # GCRA theoretical arrival time, in epoch seconds of the database clock.
+    tat: Mapped[float] = mapped_column(Float(precision=53), nullable=False)
+
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
@@ -24,6 +24,8 @@ class Tenancy(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
-    location: Mapped["Location"] = relationship("Location", back_populates="tenancies")
+    location: Mapped["Location"] = relationship(
+        "Location", back_populates="tenancies", lazy="raise"
+    )
 
     __table_args__ = (Index("idx_tenancies_location_id", "location_id"),)
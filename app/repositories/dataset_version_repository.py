@@ -0,0 +1,14 @@
+from abc import abstractmethod
+
+from app.repositories.base import IRepository
+from app.models.dataset_version import DatasetVersion
+
+
+class IDatasetVersionRepository(IRepository[DatasetVersion, int]):
+    @abstractmethod
+    async def get_current(self) -> int:
+        pass
+
+    @abstractmethod
+    async def bump(self) -> int:
+        pass
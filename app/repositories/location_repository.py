@@ -20,12 +20,32 @@ class ILocationRepository(IRepository[Location, int]):
     ) -> Optional[Location]:
         pass
 
+    @abstractmethod
+    async def get_detail(self, location_id: int, timeline_limit: int = 3) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    async def find_details_by_ids(
+        self, location_ids: Sequence[int], timeline_limit: int = 3
+    ) -> Sequence[dict]:
+        pass
+
     @abstractmethod
     async def find_in_bounding_box(self, bbox: BoundingBox, limit: int = 300) -> Sequence[Location]:
         pass
 
     @abstractmethod
     async def find_with_current_tenancy(
-        self, bbox: BoundingBox, limit: int = 300
+        self, bbox: BoundingBox, limit: int = 300, after_id: int = 0
+    ) -> Sequence[dict]:
+        pass
+
+    @abstractmethod
+    async def find_all_with_current_tenancy(self) -> Sequence[dict]:
+        pass
+
+    @abstractmethod
+    async def find_clusters(
+        self, bbox: BoundingBox, cell_size: float, limit: int = 500
     ) -> Sequence[dict]:
         pass
@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from abc import abstractmethod
 from datetime import date
 
@@ -24,3 +24,15 @@ class ITenancyRepository(IRepository[Tenancy, int]):
         self, location_id: int, start_date: date, end_date: date
     ) -> Sequence[Tenancy]:
         pass
+
+    @abstractmethod
+    async def refresh_current_tenancy(self, location_ids: Optional[Sequence[int]] = None) -> int:
+        pass
+
+    @abstractmethod
+    async def count_current_tenancy_mismatches(self) -> int:
+        pass
+
+    @abstractmethod
+    async def find_current_tenancy_mismatches(self, limit: int = 100) -> Sequence[dict]:
+        pass
@@ -27,7 +27,28 @@ class LocationDetail(BaseModel):
     timeline: list[TimelineEntry]
 
 
+class LocationDetailsResponse(BaseModel):
+    locations: list[LocationDetail]
+    count: int
+    missing: list[int] = Field(default_factory=list)
+
+
 class LocationsResponse(BaseModel):
     locations: list[PinOut]
     count: int
     cursor: str | None = None
+
+
+class ClusterOut(BaseModel):
+    lat: float
+    lon: float
+    count: int
+    location_id: int | None = None
+    representative_business: str | None = None
+
+
+class ClustersResponse(BaseModel):
+    clusters: list[ClusterOut]
+    count: int
+    total: int
+    zoom: int
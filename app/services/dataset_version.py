@@ -0,0 +1,108 @@
+import asyncio
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.postgres.postgres_dataset_version_repository import PostgresDatasetVersionRepository
+
+logger = get_logger(__name__)
+
+VersionListener = Callable[[int], None]
+
+
+class DatasetVersionTracker:
+    """Process-local view of ``dataset_version.version``.
+
+    Conditional GETs compare against the cached value, so a matching
+    ``If-None-Match`` is answered without a database round trip. The value is
+    advanced by in-process writes and by polling, so writes made by other
+    processes (the ETL, other API workers) show up within one poll interval.
+    """
+
+    def __init__(self, version: Optional[int] = None):
+        self._version = version
+        self._listeners: list[VersionListener] = []
+
+    @property
+    def current(self) -> Optional[int]:
+        return self._version
+
+    def add_listener(self, listener: VersionListener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: VersionListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def observe(self, version: int) -> bool:
+        """Record ``version`` if it is newer; returns True when the version advanced."""
+        if self._version is not None and version <= self._version:
+            return False
+
+        previous, self._version = self._version, version
+        if previous is None:
+            return True
+
+        logger.info(f"Dataset version advanced from {previous} to {version}")
+        for listener in list(self._listeners):
+            try:
+                listener(version)
+            except Exception:
+                logger.exception("Dataset version listener failed")
+        return True
+
+    async def get(self, session: AsyncSession) -> int:
+        if self._version is None:
+            self.observe(await PostgresDatasetVersionRepository(session).get_current())
+        return self._version
+
+    async def refresh(self) -> bool:
+        from app.db.postgres import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as session:
+                version = await PostgresDatasetVersionRepository(session).get_current()
+        except Exception:
+            logger.warning("Failed to poll dataset version", exc_info=True)
+            return False
+
+        self.observe(version)
+        return True
+
+    def reset(self) -> None:
+        self._version = None
+
+
+dataset_version_tracker = DatasetVersionTracker()
+
+_poll_task: Optional[asyncio.Task] = None
+
+
+async def _poll_periodically(tracker: DatasetVersionTracker, interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await tracker.refresh()
+
+
+async def start_dataset_version_tracker(
+    tracker: DatasetVersionTracker = dataset_version_tracker,
+) -> None:
+    global _poll_task
+
+    await tracker.refresh()
+
+    if settings.dataset_version_poll_seconds > 0:
+        _poll_task = asyncio.create_task(
+            _poll_periodically(tracker, settings.dataset_version_poll_seconds)
+        )
+
+
+async def stop_dataset_version_tracker() -> None:
+    global _poll_task
+
+    if _poll_task is not None:
+        _poll_task.cancel()
+        await asyncio.gather(_poll_task, return_exceptions=True)
+        _poll_task = None
@@ -0,0 +1,248 @@
+import asyncio
+import bisect
+import heapq
+import math
+import signal
+from array import array
+from typing import Iterable, Optional, Sequence
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.repositories.location_repository import BoundingBox
+from app.services.dataset_version import dataset_version_tracker
+
+logger = get_logger(__name__)
+
+NO_STRING = -1
+
+
+class _GridSnapshot:
+    """Immutable, array-backed copy of every location, bucketed into a uniform grid.
+
+    Rows are stored in ascending id order, so each cell's position list is also
+    sorted by id and bbox queries can return the same ``ORDER BY l.id`` results
+    as the SQL path without a final sort. ``version`` is the dataset version the
+    rows were read at (None when unknown).
+    """
+
+    def __init__(self, rows: Iterable[dict], cell_size: float, version: Optional[int] = None):
+        self.cell_size = cell_size
+        self.version = version
+        self.ids = array("q")
+        self.lats = array("d")
+        self.lons = array("d")
+        self.address_idx = array("i")
+        self.business_idx = array("i")
+        self.category_idx = array("i")
+        self.strings: list[str] = []
+        self.cells: dict[tuple[int, int], array] = {}
+
+        interned: dict[str, int] = {}
+
+        def intern(value: Optional[str]) -> int:
+            if value is None:
+                return NO_STRING
+            idx = interned.get(value)
+            if idx is None:
+                idx = len(self.strings)
+                interned[value] = idx
+                self.strings.append(value)
+            return idx
+
+        for position, row in enumerate(sorted(rows, key=lambda r: r["id"])):
+            lat = float(row["lat"])
+            lon = float(row["lon"])
+            self.ids.append(row["id"])
+            self.lats.append(lat)
+            self.lons.append(lon)
+            self.address_idx.append(intern(row["address"]))
+            self.business_idx.append(intern(row.get("current_business")))
+            self.category_idx.append(intern(row.get("current_category")))
+
+            key = self.cell_of(lat, lon)
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = array("I")
+            cell.append(position)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def cell_of(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lon / self.cell_size), math.floor(lat / self.cell_size)
+
+    def row(self, position: int) -> dict:
+        business = self.business_idx[position]
+        category = self.category_idx[position]
+        return {
+            "id": self.ids[position],
+            "lat": self.lats[position],
+            "lon": self.lons[position],
+            "address": self.strings[self.address_idx[position]],
+            "current_business": self.strings[business] if business != NO_STRING else None,
+            "current_category": self.strings[category] if category != NO_STRING else None,
+        }
+
+    def query(self, bbox: BoundingBox, limit: int, after_id: int = 0) -> list[dict]:
+        min_cx, min_cy = self.cell_of(bbox.south, bbox.west)
+        max_cx, max_cy = self.cell_of(bbox.north, bbox.east)
+
+        span = (max_cx - min_cx + 1) * (max_cy - min_cy + 1)
+        if span <= len(self.cells):
+            candidates = [
+                cell
+                for cx in range(min_cx, max_cx + 1)
+                for cy in range(min_cy, max_cy + 1)
+                if (cell := self.cells.get((cx, cy))) is not None
+            ]
+        else:
+            candidates = [
+                cell
+                for (cx, cy), cell in self.cells.items()
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy
+            ]
+
+        results: list[dict] = []
+        if limit <= 0:
+            return results
+
+        if after_id > 0:
+            # Positions are in id order, so a keyset cursor maps to a start position.
+            start = bisect.bisect_right(self.ids, after_id)
+            candidates = [
+                memoryview(cell)[bisect.bisect_left(cell, start) :] for cell in candidates
+            ]
+
+        for position in heapq.merge(*candidates):
+            lat = self.lats[position]
+            lon = self.lons[position]
+            if bbox.south <= lat <= bbox.north and bbox.west <= lon <= bbox.east:
+                results.append(self.row(position))
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class LocationGridIndex:
+    """In-process read engine for bbox pin queries.
+
+    The index is cold until ``build`` has been called; ``query`` returns ``None``
+    while cold, or while the snapshot is older than ``min_version``, so callers
+    can fall back to the database.
+    """
+
+    def __init__(self, cell_size: float = 0.01):
+        self._cell_size = cell_size
+        self._snapshot: Optional[_GridSnapshot] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._snapshot.version if self._snapshot is not None else None
+
+    def __len__(self) -> int:
+        return len(self._snapshot) if self._snapshot is not None else 0
+
+    def build(self, rows: Iterable[dict], version: Optional[int] = None) -> None:
+        # Build off to the side and swap in one assignment so concurrent
+        # readers always see a complete snapshot.
+        self._snapshot = _GridSnapshot(rows, self._cell_size, version)
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+    def query(
+        self,
+        bbox: BoundingBox,
+        limit: int = 300,
+        after_id: int = 0,
+        min_version: Optional[int] = None,
+    ) -> Optional[list[dict]]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        if min_version is not None and (snapshot.version is None or snapshot.version < min_version):
+            # A newer dataset version is out and the rebuild has not finished yet.
+            return None
+        return snapshot.query(bbox, limit, after_id)
+
+
+location_index = LocationGridIndex(cell_size=settings.location_index_cell_size)
+
+_refresh_lock = asyncio.Lock()
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def refresh_location_index(index: LocationGridIndex = location_index) -> bool:
+    """Reload every location from Postgres and atomically swap the index snapshot."""
+    from app.db.postgres import AsyncSessionLocal
+    from app.db.postgres.postgres_dataset_version_repository import (
+        PostgresDatasetVersionRepository,
+    )
+    from app.db.postgres.postgres_location_repository import PostgresLocationRepository
+
+    async with _refresh_lock:
+        try:
+            async with AsyncSessionLocal() as session:
+                # Read the version first: the rows are then at least that new.
+                version = await PostgresDatasetVersionRepository(session).get_current()
+                rows: Sequence[dict] = await PostgresLocationRepository(
+                    session
+                ).find_all_with_current_tenancy()
+            await asyncio.to_thread(index.build, rows, version)
+        except Exception:
+            logger.exception("Failed to refresh location index; serving bbox queries from Postgres")
+            return False
+
+    logger.info(f"Location index refreshed with {len(index)} locations at version {version}")
+    return True
+
+
+async def _refresh_periodically(interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await refresh_location_index()
+
+
+def _schedule_refresh(*_args) -> None:
+    task = asyncio.ensure_future(refresh_location_index())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def start_location_index() -> None:
+    if not settings.location_index_enabled:
+        return
+
+    await refresh_location_index()
+
+    if settings.location_index_refresh_seconds > 0:
+        task = asyncio.create_task(_refresh_periodically(settings.location_index_refresh_seconds))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    # Rebuild whenever the tracker sees a newer dataset version (ETL run, API write).
+    dataset_version_tracker.add_listener(_schedule_refresh)
+
+    # `kill -HUP <api pid>` rebuilds the index, e.g. right after the KC transform.
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _schedule_refresh)
+    except (NotImplementedError, AttributeError, RuntimeError):
+        logger.debug("SIGHUP refresh hook unavailable on this platform")
+
+
+async def stop_location_index() -> None:
+    dataset_version_tracker.remove_listener(_schedule_refresh)
+
+    try:
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+    except (NotImplementedError, AttributeError, RuntimeError):
+        pass
+
+    for task in list(_background_tasks):
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
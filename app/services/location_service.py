@@ -2,54 +2,114 @@ from typing import Optional, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.location_repository import ILocationRepository, BoundingBox
-from app.repositories.tenancy_repository import ITenancyRepository
+from app.repositories.dataset_version_repository import IDatasetVersionRepository
+from app.db.postgres.postgres_dataset_version_repository import PostgresDatasetVersionRepository
 from app.db.postgres.postgres_location_repository import PostgresLocationRepository
-from app.db.postgres.postgres_tenancy_repository import PostgresTenancyRepository
 from app.schemas.location import LocationDetail, TimelineEntry
+from app.services.dataset_version import DatasetVersionTracker
+from app.services.location_index import LocationGridIndex
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.request_context import span
+from app.core.single_flight import SingleFlight
 
 logger = get_logger(__name__)
 
+# Process-wide, so identical reads from concurrent requests share one query and connection.
+location_reads = SingleFlight("locations")
+
+
+def _bbox_key(bbox: BoundingBox) -> tuple[float, float, float, float]:
+    return (bbox.west, bbox.south, bbox.east, bbox.north)
+
+
+def _to_detail(detail: dict) -> LocationDetail:
+    return LocationDetail(
+        id=detail["id"],
+        lat=detail["lat"],
+        lon=detail["lon"],
+        address=detail["address"],
+        timeline=[TimelineEntry(**entry) for entry in detail["timeline"]],
+    )
+
 
 class LocationService:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        location_index: Optional[LocationGridIndex] = None,
+        version_tracker: Optional[DatasetVersionTracker] = None,
+        single_flight: SingleFlight = location_reads,
+    ):
         self._session = session
+        self._location_index = location_index
+        self._version_tracker = version_tracker
+        self._reads = single_flight
         self._location_repo: ILocationRepository = PostgresLocationRepository(session)
-        self._tenancy_repo: ITenancyRepository = PostgresTenancyRepository(session)
+        self._version_repo: IDatasetVersionRepository = PostgresDatasetVersionRepository(session)
 
     async def get_location_by_id(self, location_id: int) -> Optional[LocationDetail]:
-        location = await self._location_repo.get_by_id(location_id)
-        if not location:
+        with span("db"):
+            detail = await self._reads.do(
+                ("detail", location_id),
+                lambda: self._location_repo.get_detail(location_id, timeline_limit=3),
+            )
+        if not detail:
             logger.info(f"Location not found: {location_id}")
             return None
 
-        tenancies = await self._tenancy_repo.find_by_location(location_id, limit=3)
+        with span("validate"):
+            return _to_detail(detail)
 
-        timeline = [
-            TimelineEntry(
-                business_name=t.business_name,
-                category=t.category,
-                start_date=t.start_date,
-                end_date=t.end_date,
-                is_current=t.is_current,
+    async def get_locations_by_ids(self, location_ids: Sequence[int]) -> list[LocationDetail]:
+        with span("db"):
+            details = await self._reads.do(
+                ("batch", tuple(location_ids)),
+                lambda: self._location_repo.find_details_by_ids(location_ids, timeline_limit=3),
+            )
+        logger.info(f"Resolved {len(details)} of {len(location_ids)} location details")
+
+        with span("validate"):
+            return [_to_detail(detail) for detail in details]
+
+    async def find_locations_in_area(
+        self, bbox: BoundingBox, limit: int = 300, after_id: int = 0
+    ) -> Sequence[dict]:
+        logger.debug(f"Finding locations in area: {bbox}, limit={limit}, after_id={after_id}")
+        if self._location_index is not None:
+            # Skip a snapshot older than the version the response will be tagged with.
+            min_version = self._version_tracker.current if self._version_tracker else None
+            with span("index"):
+                indexed = self._location_index.query(bbox, limit, after_id, min_version=min_version)
+            if indexed is not None:
+                logger.debug(f"Served {len(indexed)} locations from in-memory index")
+                return indexed
+
+        with span("db"):
+            locations = await self._reads.do(
+                ("area", _bbox_key(bbox), limit, after_id),
+                lambda: self._location_repo.find_with_current_tenancy(
+                    bbox, limit, after_id=after_id
+                ),
             )
-            for t in tenancies
-        ]
-
-        return LocationDetail(
-            id=location.id,
-            lat=location.lat,
-            lon=location.lon,
-            address=location.address,
-            timeline=timeline,
-        )
-
-    async def find_locations_in_area(self, bbox: BoundingBox, limit: int = 300) -> Sequence[dict]:
-        logger.debug(f"Finding locations in area: {bbox}, limit={limit}")
-        locations = await self._location_repo.find_with_current_tenancy(bbox, limit)
         logger.info(f"Found {len(locations)} locations in area")
         return locations
 
+    async def find_clusters_in_area(
+        self, bbox: BoundingBox, zoom: int, limit: int = 500
+    ) -> Sequence[dict]:
+        # One web-mercator tile spans 360 / 2^zoom degrees of longitude; split each
+        # tile into a fixed number of cells so cluster density is stable across zooms.
+        cell_size = 360.0 / (2**zoom * settings.cluster_cells_per_tile)
+        logger.debug(f"Clustering locations in area: {bbox}, zoom={zoom}, cell_size={cell_size}")
+        with span("db"):
+            clusters = await self._reads.do(
+                ("clusters", _bbox_key(bbox), cell_size, limit),
+                lambda: self._location_repo.find_clusters(bbox, cell_size, limit),
+            )
+        logger.info(f"Found {len(clusters)} clusters in area")
+        return clusters
+
     async def create_location(self, lat: float, lon: float, address: str) -> LocationDetail:
         from app.models.location import Location
 
@@ -61,7 +121,11 @@ class LocationService:
         logger.info(f"Creating new location at ({lat}, {lon}): {address}")
         location = Location(lat=lat, lon=lon, address=address)
         created = await self._location_repo.create(location)
+        version = await self._version_repo.bump()
         await self._session.commit()
+        if self._version_tracker is not None:
+            self._version_tracker.observe(version)
         logger.info(f"Successfully created location {created.id}")
 
-        return await self.get_location_by_id(created.id)
+        # Read directly: a coalesced detail read may have started before this commit.
+        return _to_detail(await self._location_repo.get_detail(created.id, timeline_limit=3))
@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+from app.core.compression import compress_variants
+from app.core.config import settings
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    encoded: dict[str, bytes]
+    expires_at: float
+    # Items in the body, so hits can update the same metrics as misses.
+    item_count: int = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in self.encoded.values())
+
+
+class ResponseCache:
+    """LRU cache of serialized response bodies under a byte budget.
+
+    Entries belong to a dataset version: seeing a newer version empties the
+    cache, and lookups or stores for an older version are ignored. The TTL
+    bounds staleness if a version change is missed.
+
+    Compressed variants (br, gzip) are produced once when a body is stored and
+    served from the entry, so hot responses are not recompressed per request.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, compress: bool = True):
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._compress = compress
+        self._entries: OrderedDict[Hashable, CachedBody] = OrderedDict()
+        self._size = 0
+        self._version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def _observe_version(self, version: int) -> bool:
+        if self._version is not None and version < self._version:
+            return False
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+            self._size = 0
+        return True
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def get(self, version: int, key: Hashable) -> Optional[CachedBody]:
+        if not self._observe_version(version):
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    async def put_compressed(
+        self, version: int, key: Hashable, body: bytes, item_count: int = 0
+    ) -> CachedBody:
+        encoded = await compress_variants(body) if self._compress else {}
+        return self.put(version, key, body, encoded, item_count)
+
+    def put(
+        self,
+        version: int,
+        key: Hashable,
+        body: bytes,
+        encoded: Optional[dict[str, bytes]] = None,
+        item_count: int = 0,
+    ) -> CachedBody:
+        entry = CachedBody(body, encoded or {}, time.monotonic() + self._ttl_seconds, item_count)
+
+        if not self._observe_version(version) or entry.size > self._max_bytes:
+            return entry
+
+        self._discard(key)
+        self._entries[key] = entry
+        self._size += entry.size
+        while self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+        self._version = None
+
+
+location_response_cache = ResponseCache(
+    max_bytes=settings.response_cache_max_bytes,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    compress=settings.response_cache_compress,
+)
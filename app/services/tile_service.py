@@ -0,0 +1,165 @@
+import asyncio
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.mvt import DEFAULT_EXTENT, PointFeature, encode_point_layer, tile_bounds
+from app.db.postgres.postgres_location_repository import PostgresLocationRepository
+from app.repositories.location_repository import BoundingBox, ILocationRepository
+from app.services.dataset_version import DatasetVersionTracker, dataset_version_tracker
+
+logger = get_logger(__name__)
+
+TILE_LAYER_NAME = "locations"
+# Pull in points just outside the tile so symbols straddling an edge render on both sides.
+TILE_BUFFER_RATIO = 64 / DEFAULT_EXTENT
+
+
+class TileCache:
+    """Two-level cache of encoded tiles keyed by (data version, z, x, y).
+
+    Tiles are immutable for a given data version, so entries never need
+    invalidating individually: when a newer version is seen, older entries are
+    dropped from memory and their on-disk directories are pruned.
+    """
+
+    def __init__(self, max_entries: int = 2048, directory: Optional[str] = None):
+        self._max_entries = max_entries
+        self._directory = Path(directory) if directory else None
+        self._entries: OrderedDict[tuple[int, int, int, int], bytes] = OrderedDict()
+        self._version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, version: int, z: int, x: int, y: int) -> Path:
+        return self._directory / str(version) / str(z) / str(x) / f"{y}.mvt"
+
+    async def _observe_version(self, version: int) -> None:
+        if self._version is not None and version <= self._version:
+            return
+        self._version = version
+        self._entries.clear()
+        if self._directory is not None:
+            await asyncio.to_thread(self._prune_disk, version)
+
+    def _prune_disk(self, keep_version: int) -> None:
+        if not self._directory.exists():
+            return
+        for child in self._directory.iterdir():
+            if child.is_dir() and child.name != str(keep_version):
+                shutil.rmtree(child, ignore_errors=True)
+
+    def _read_disk(self, path: Path) -> Optional[bytes]:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, path: Path, tile: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(tile)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key: tuple[int, int, int, int], tile: bytes) -> None:
+        self._entries[key] = tile
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, version: int, z: int, x: int, y: int) -> Optional[bytes]:
+        await self._observe_version(version)
+        key = (version, z, x, y)
+
+        tile = self._entries.get(key)
+        if tile is not None:
+            self._entries.move_to_end(key)
+            return tile
+
+        if self._directory is None:
+            return None
+
+        tile = await asyncio.to_thread(self._read_disk, self._path(version, z, x, y))
+        if tile is not None:
+            self._remember(key, tile)
+        return tile
+
+    async def set(self, version: int, z: int, x: int, y: int, tile: bytes) -> None:
+        await self._observe_version(version)
+        if version != self._version:
+            return
+
+        self._remember((version, z, x, y), tile)
+
+        if self._directory is not None:
+            try:
+                await asyncio.to_thread(self._write_disk, self._path(version, z, x, y), tile)
+            except OSError:
+                logger.warning(f"Failed to write tile {z}/{x}/{y} to disk cache", exc_info=True)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._version = None
+
+
+tile_cache = TileCache(
+    max_entries=settings.tile_cache_max_entries, directory=settings.tile_cache_dir
+)
+
+
+class TileService:
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: TileCache = tile_cache,
+        version_tracker: DatasetVersionTracker = dataset_version_tracker,
+    ):
+        self._session = session
+        self._cache = cache
+        self._version_tracker = version_tracker
+        self._location_repo: ILocationRepository = PostgresLocationRepository(session)
+
+    async def get_tile(self, z: int, x: int, y: int) -> bytes:
+        version = await self._version_tracker.get(self._session)
+
+        tile = await self._cache.get(version, z, x, y)
+        if tile is not None:
+            logger.debug(f"Tile cache hit: v{version} {z}/{x}/{y}")
+            return tile
+
+        bounds = tile_bounds(z, x, y)
+        buffer_lon = (bounds.east - bounds.west) * TILE_BUFFER_RATIO
+        buffer_lat = (bounds.north - bounds.south) * TILE_BUFFER_RATIO
+        bbox = BoundingBox(
+            west=bounds.west - buffer_lon,
+            south=bounds.south - buffer_lat,
+            east=bounds.east + buffer_lon,
+            north=bounds.north + buffer_lat,
+        )
+
+        rows = await self._location_repo.find_with_current_tenancy(bbox, settings.tile_max_features)
+        features = [
+            PointFeature(
+                id=row["id"],
+                lon=row["lon"],
+                lat=row["lat"],
+                properties={
+                    "address": row["address"],
+                    "current_business": row["current_business"],
+                    "current_category": row["current_category"],
+                },
+            )
+            for row in rows
+        ]
+        tile = encode_point_layer(TILE_LAYER_NAME, features, z, x, y)
+        logger.info(f"Encoded tile v{version} {z}/{x}/{y} with {len(features)} features")
+
+        await self._cache.set(version, z, x, y, tile)
+        return tile
@@ -0,0 +1,47 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import AsyncSessionLocal
+from app.db.postgres.postgres_dataset_version_repository import PostgresDatasetVersionRepository
+from app.db.postgres.postgres_tenancy_repository import PostgresTenancyRepository
+
+
+async def check_current_tenancy(fix: bool = False, limit: int = 20) -> int:
+    """
+    Compares locations.current_business/current_category against the latest
+    tenancy per location (v_latest_tenancy) and optionally repairs drift.
+    Returns the total number of mismatched locations found (before any fix);
+    only the first ``limit`` are printed.
+    """
+    async with AsyncSessionLocal() as session:
+        repo = PostgresTenancyRepository(session)
+        mismatched = await repo.count_current_tenancy_mismatches()
+
+        if not mismatched:
+            print("OK: locations.current_* matches the latest tenancy for every location")
+            return 0
+
+        print(f"Found {mismatched} mismatched locations (showing up to {limit}):")
+        for row in await repo.find_current_tenancy_mismatches(limit=limit):
+            print(
+                f"  location {row['location_id']}: "
+                f"{row['current_business']!r}/{row['current_category']!r} "
+                f"-> expected {row['expected_business']!r}/{row['expected_category']!r}"
+            )
+
+        if fix:
+            fixed = await repo.refresh_current_tenancy()
+            await PostgresDatasetVersionRepository(session).bump()
+            await session.commit()
+            print(f"Repaired {fixed} locations")
+
+        return mismatched
+
+
+if __name__ == "__main__":
+    fix = "--fix" in sys.argv[1:]
+    mismatched = asyncio.run(check_current_tenancy(fix=fix))
+    sys.exit(1 if mismatched and not fix else 0)
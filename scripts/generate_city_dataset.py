@@ -0,0 +1,623 @@
+"""
+Generates a synthetic city-scale dataset for load and scaling tests.
+
+The bundled sample CSVs hold a handful of rows; this produces millions of
+locations shaped like a real city:
+
+- Locations cluster into neighbourhoods of very different density (a dense
+  downtown, sparse outskirts) plus a thin uniform background.
+- A fraction of buildings hold several co-located units sharing one
+  coordinate and address, told apart by ``unit`` and ``display_slot``.
+- Every location has a tenancy history from the building's opening until
+  today: occupancies of exponentially distributed length (faster churn in
+  some neighbourhoods), vacancies in between, chains recurring across the city.
+- Memory submissions recall past tenancies, more often at locations with
+  long histories.
+- Optionally, the first locations get exact history lengths
+  (``history_lengths`` x ``history_probes``) for per-location benchmarks.
+
+Output is either a CSV in the King County food inspection format, fed
+through the usual ETL:
+
+    python -m scripts.generate_city_dataset kc-csv data/synthetic_inspections.csv
+    python -m scripts.load_kc_food_inspections data/synthetic_inspections.csv
+    python -m scripts.transform_kc_to_tenancies
+
+or a direct bulk load (COPY) of locations, tenancies and memory submissions:
+
+    python -m scripts.generate_city_dataset database --locations 2000000 [--truncate]
+
+Memory submissions only exist in the database output; the inspection format
+has nowhere to put them.
+"""
+
+import argparse
+import asyncio
+import bisect
+import csv
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.spatial import morton_key
+
+SOURCE_TYPE_SYNTHETIC = "synthetic"
+DATASET_SYNTHETIC_CITY = "synthetic_city"
+
+KC_COLUMNS = [
+    "Name",
+    "Address",
+    "City",
+    "State",
+    "Zip Code",
+    "Latitude",
+    "Longitude",
+    "Inspection Date",
+    "Inspection Type",
+    "Inspection Result",
+]
+
+# fmt: off
+STREET_NAMES = [
+    "PINE", "PIKE", "UNION", "MADISON", "SPRING", "SENECA", "UNIVERSITY", "MARION", "COLUMBIA",
+    "CHERRY", "JAMES", "YESLER", "JACKSON", "DEARBORN", "MERCER", "REPUBLICAN", "HARRISON",
+    "THOMAS", "JOHN", "DENNY", "BELL", "BLANCHARD", "LENORA", "VIRGINIA", "STEWART", "OLIVE",
+    "EASTLAKE", "WESTLAKE", "DEXTER", "FREMONT", "LEARY", "MARKET", "BALLARD", "ALASKAN",
+    "GREENWOOD", "PHINNEY", "AURORA", "ROOSEVELT", "BROOKLYN", "RAINIER", "BEACON", "CALIFORNIA",
+]
+STREET_TYPES = ["ST", "AVE", "WAY", "PL", "BLVD"]
+STREET_DIRECTIONS = ["", "", "", " N", " NE", " NW", " S", " SW", " E", " W"]
+
+NAME_PREFIXES = [
+    "GOLDEN", "BLUE", "CORNER", "HARBOR", "SUNSET", "EMERALD", "NORTHWEST", "LUCKY", "OLD TOWN",
+    "RAINY DAY", "CASCADE", "EVERGREEN", "PACIFIC", "SOUND", "LITTLE", "BIG", "RED DOOR",
+    "SILVER", "ORCHARD", "MOUNTAIN", "LAKESIDE", "URBAN", "HAPPY", "ROYAL", "JADE", "SAIGON",
+    "BANGKOK", "TOKYO", "NAPOLI", "OAXACA", "SEOUL", "MUMBAI", "ADDIS", "KYIV", "LIMA",
+]
+OWNER_NAMES = [
+    "MARIA", "JOE", "NGUYEN", "KIM", "PATEL", "OLSEN", "GARCIA", "TANAKA", "MOHAMED", "ROSSI",
+    "CHEN", "MULLER", "OKAFOR", "SILVA", "JENSEN", "MORI", "HASSAN", "DUBOIS", "COHEN", "LEE",
+]
+# fmt: on
+BUSINESS_KINDS = {
+    "Restaurant": ["KITCHEN", "GRILL", "BISTRO", "TERIYAKI", "PHO", "THAI", "TAQUERIA", "DINER"],
+    "Coffee Shop": ["COFFEE", "ESPRESSO", "CAFE", "ROASTERS"],
+    "Bakery": ["BAKERY", "BAKEHOUSE", "DONUTS", "PATISSERIE"],
+    "Bar": ["TAVERN", "PUB", "TAPROOM", "LOUNGE"],
+    "Grocery": ["MARKET", "GROCERY", "MINI MART", "DELI"],
+    "Pizza": ["PIZZA", "PIZZERIA", "SLICE"],
+}
+CATEGORY_WEIGHTS = {
+    "Restaurant": 45,
+    "Coffee Shop": 15,
+    "Bakery": 6,
+    "Bar": 10,
+    "Grocery": 14,
+    "Pizza": 10,
+}
+CHAINS = {
+    "STARBUCKS": "Coffee Shop",
+    "SUBWAY": "Restaurant",
+    "TACO TIME": "Restaurant",
+    "PAGLIACCI PIZZA": "Pizza",
+    "TERIYAKI MADNESS": "Restaurant",
+    "7-ELEVEN": "Grocery",
+    "TOP POT DOUGHNUTS": "Bakery",
+    "DICK'S DRIVE-IN": "Restaurant",
+}
+MEMORY_NOTES = [
+    "My parents had their first date here.",
+    "Best booths by the window, the owner knew everyone's order.",
+    "We came here every Friday after school.",
+    "The sign is still painted on the brick out back.",
+    "They had a jukebox and a cat that slept on the counter.",
+    "Closed after the owner retired; the whole block came to the last night.",
+]
+MEMORY_STATUSES = {"approved": 6, "pending": 3, "rejected": 1}
+
+
+@dataclass
+class CityConfig:
+    locations: int = 100_000
+    seed: int = 42
+    center_lat: float = 47.6062
+    center_lon: float = -122.3321
+    # Fraction of locations outside any neighbourhood.
+    background_fraction: float = 0.05
+    # Fraction of buildings with several co-located units, and the most units per building.
+    multi_unit_fraction: float = 0.08
+    max_units: int = 8
+    first_year: int = 1975
+    mean_tenancy_years: float = 4.0
+    mean_vacancy_days: float = 120.0
+    # Mean days between inspections of an open business (kc-csv output).
+    mean_inspection_interval_days: float = 180.0
+    memory_fraction: float = 0.03
+    # The first ``history_probes`` locations get exactly history_lengths[0] tenancies, the
+    # next history_lengths[1], and so on; benchmarks time per-location queries on them.
+    history_lengths: list[int] = field(default_factory=list)
+    history_probes: int = 0
+
+
+class Neighbourhood(NamedTuple):
+    lat: float
+    lon: float
+    spread: float
+    churn: float
+    zip_code: str
+    streets: list[str]
+
+
+class SyntheticLocation(NamedTuple):
+    id: int
+    lat: float
+    lon: float
+    address: str
+    unit: Optional[str]
+    display_slot: int
+    zip_code: str
+    churn: float
+
+
+class SyntheticTenancy(NamedTuple):
+    location_id: int
+    business_name: str
+    category: str
+    start_date: date
+    end_date: date
+
+
+class SyntheticMemory(NamedTuple):
+    location_id: int
+    business_name: str
+    start_year: int
+    end_year: int
+    note: str
+    status: str
+
+
+class Chunk(NamedTuple):
+    locations: list[SyntheticLocation]
+    tenancies: list[SyntheticTenancy]
+    memories: list[SyntheticMemory]
+
+
+def _weighted(options: dict[str, int]) -> tuple[list[str], list[int]]:
+    names = list(options)
+    return names, list(itertools.accumulate(options[name] for name in names))
+
+
+CATEGORY_CHOICES = _weighted(CATEGORY_WEIGHTS)
+STATUS_CHOICES = _weighted(MEMORY_STATUSES)
+
+
+class CityGenerator:
+    def __init__(self, config: CityConfig, today: Optional[date] = None):
+        self.config = config
+        self.today = today or date.today()
+        self.rng = random.Random(config.seed)
+        self.neighbourhoods = self._neighbourhoods()
+        # Lognormal weights: a few neighbourhoods hold a large share of the city.
+        weights = [self.rng.lognormvariate(0, 1.0) for _ in self.neighbourhoods]
+        self._cumulative_weights = list(itertools.accumulate(weights))
+
+    def _neighbourhoods(self) -> list[Neighbourhood]:
+        rng = self.rng
+        count = max(self.config.locations // 2000, 8)
+        neighbourhoods = []
+        for index in range(count):
+            # Denser towards the centre; outlying neighbourhoods are larger and sparser.
+            distance = abs(rng.gauss(0, 0.08))
+            angle = rng.uniform(0, 2 * math.pi)
+            streets = [
+                f"{rng.choice(STREET_NAMES)} {rng.choice(STREET_TYPES)}"
+                f"{rng.choice(STREET_DIRECTIONS)}"
+                for _ in range(8)
+            ]
+            neighbourhoods.append(
+                Neighbourhood(
+                    lat=self.config.center_lat + distance * math.sin(angle),
+                    lon=self.config.center_lon + distance * 1.4 * math.cos(angle),
+                    spread=0.002 + distance * 0.05 + rng.uniform(0, 0.004),
+                    churn=rng.lognormvariate(0, 0.35),
+                    zip_code=f"981{index % 100:02d}",
+                    streets=streets,
+                )
+            )
+        return neighbourhoods
+
+    def _place(self) -> tuple[float, float, Neighbourhood]:
+        rng = self.rng
+        if rng.random() < self.config.background_fraction:
+            neighbourhood = rng.choice(self.neighbourhoods)
+            lat = self.config.center_lat + rng.uniform(-0.3, 0.3)
+            lon = self.config.center_lon + rng.uniform(-0.4, 0.4)
+            return lat, lon, neighbourhood
+
+        index = bisect.bisect(self._cumulative_weights, rng.random() * self._cumulative_weights[-1])
+        neighbourhood = self.neighbourhoods[min(index, len(self.neighbourhoods) - 1)]
+        lat = rng.gauss(neighbourhood.lat, neighbourhood.spread)
+        lon = rng.gauss(neighbourhood.lon, neighbourhood.spread * 1.4)
+        return lat, lon, neighbourhood
+
+    def buildings(self) -> Iterator[list[SyntheticLocation]]:
+        """Co-located locations per building, until ``config.locations`` are generated."""
+        rng = self.rng
+        next_id = 1
+        while next_id <= self.config.locations:
+            lat, lon, neighbourhood = self._place()
+            lat, lon = round(lat, 6), round(lon, 6)
+            address = f"{rng.randint(100, 9999)} {rng.choice(neighbourhood.streets)}"
+
+            units = 1
+            if rng.random() < self.config.multi_unit_fraction:
+                units = rng.randint(2, self.config.max_units)
+            units = min(units, self.config.locations - next_id + 1)
+
+            building = []
+            for slot in range(units):
+                unit = None
+                if units > 1:
+                    unit = f"STE {100 * (slot // 4 + 1) + slot % 4 + 1}"
+                building.append(
+                    SyntheticLocation(
+                        id=next_id,
+                        lat=lat,
+                        lon=lon,
+                        address=address,
+                        unit=unit,
+                        display_slot=slot,
+                        zip_code=neighbourhood.zip_code,
+                        churn=neighbourhood.churn,
+                    )
+                )
+                next_id += 1
+            yield building
+
+    def _business(self, taken: set[str]) -> tuple[str, str]:
+        rng = self.rng
+        for _ in range(20):
+            if rng.random() < 0.12:
+                name, category = rng.choice(list(CHAINS.items()))
+            else:
+                category = CATEGORY_CHOICES[0][
+                    bisect.bisect(CATEGORY_CHOICES[1], rng.random() * CATEGORY_CHOICES[1][-1])
+                ]
+                kind = rng.choice(BUSINESS_KINDS[category])
+                if rng.random() < 0.3:
+                    name = f"{rng.choice(OWNER_NAMES)}'S {kind}"
+                else:
+                    name = f"{rng.choice(NAME_PREFIXES)} {kind}"
+            if name not in taken:
+                return name, category
+        # (location_id, business_name) is unique; fall back to a numbered name.
+        return f"{name} {len(taken) + 1}", category
+
+    def forced_history_length(self, location_id: int) -> Optional[int]:
+        if self.config.history_probes <= 0:
+            return None
+        index = (location_id - 1) // self.config.history_probes
+        if index < len(self.config.history_lengths):
+            return self.config.history_lengths[index]
+        return None
+
+    def tenancies(self, location: SyntheticLocation) -> list[SyntheticTenancy]:
+        """Occupancies from the building's opening until today, with vacancies between."""
+        length = self.forced_history_length(location.id)
+        if length is not None:
+            return self._fixed_history(location, length)
+
+        rng = self.rng
+        epoch = date(self.config.first_year, 1, 1)
+        span = (self.today - epoch).days
+        cursor = epoch + timedelta(days=int(span * rng.random() ** 1.5))
+        mean_days = self.config.mean_tenancy_years * 365 / location.churn
+
+        history = []
+        taken: set[str] = set()
+        while cursor < self.today:
+            end = cursor + timedelta(days=max(int(rng.expovariate(1 / mean_days)), 90))
+            name, category = self._business(taken)
+            taken.add(name)
+            if end >= self.today:
+                # Still open: last seen at a recent inspection.
+                end = max(self.today - timedelta(days=rng.randint(0, 150)), cursor)
+                history.append(SyntheticTenancy(location.id, name, category, cursor, end))
+                break
+            history.append(SyntheticTenancy(location.id, name, category, cursor, end))
+            cursor = end + timedelta(days=int(rng.expovariate(1 / self.config.mean_vacancy_days)))
+        return history
+
+    def _fixed_history(self, location: SyntheticLocation, length: int) -> list[SyntheticTenancy]:
+        """Exactly ``length`` back-to-back occupancies splitting first_year..today evenly."""
+        epoch = date(self.config.first_year, 1, 1)
+        span = (self.today - epoch).days
+        if length > span:
+            raise ValueError(f"history length {length} exceeds the {span} days since first_year")
+
+        history = []
+        taken: set[str] = set()
+        for index in range(length):
+            start = epoch + timedelta(days=span * index // length)
+            end = epoch + timedelta(days=max(span * (index + 1) // length - 1, 0))
+            name, category = self._business(taken)
+            taken.add(name)
+            history.append(SyntheticTenancy(location.id, name, category, start, max(end, start)))
+        return history
+
+    def memories(self, history: list[SyntheticTenancy]) -> list[SyntheticMemory]:
+        rng = self.rng
+        past = history[:-1] or history
+        if not past or rng.random() >= self.config.memory_fraction * min(len(history), 10) / 2:
+            return []
+
+        memories = []
+        for _ in range(rng.randint(1, 4)):
+            tenancy = rng.choice(past)
+            status = STATUS_CHOICES[0][
+                bisect.bisect(STATUS_CHOICES[1], rng.random() * STATUS_CHOICES[1][-1])
+            ]
+            memories.append(
+                SyntheticMemory(
+                    location_id=tenancy.location_id,
+                    business_name=tenancy.business_name,
+                    # Remembered years are approximate.
+                    start_year=tenancy.start_date.year + rng.choice([-1, 0, 0, 0, 1]),
+                    end_year=tenancy.end_date.year + rng.choice([-1, 0, 0, 0, 1]),
+                    note=rng.choice(MEMORY_NOTES),
+                    status=status,
+                )
+            )
+        return memories
+
+    def chunks(self, size: int = 20_000) -> Iterator[Chunk]:
+        chunk = Chunk([], [], [])
+        for building in self.buildings():
+            for location in building:
+                history = self.tenancies(location)
+                chunk.locations.append(location)
+                chunk.tenancies.extend(history)
+                chunk.memories.extend(self.memories(history))
+            if len(chunk.locations) >= size:
+                yield chunk
+                chunk = Chunk([], [], [])
+        if chunk.locations:
+            yield chunk
+
+    def inspection_dates(self, tenancy: SyntheticTenancy) -> list[date]:
+        """Inspections from opening to last seen, so the ETL recovers both ends."""
+        dates = [tenancy.start_date]
+        cursor = tenancy.start_date
+        interval = 1 / self.config.mean_inspection_interval_days
+        while True:
+            cursor += timedelta(days=max(int(self.rng.expovariate(interval)), 14))
+            if cursor >= tenancy.end_date:
+                break
+            dates.append(cursor)
+        if tenancy.end_date != tenancy.start_date:
+            dates.append(tenancy.end_date)
+        return dates
+
+
+# --- Output ---
+
+
+def write_kc_csv(config: CityConfig, csv_path: str) -> None:
+    generator = CityGenerator(config)
+    start = time.perf_counter()
+    rows = 0
+    locations = 0
+
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(KC_COLUMNS)
+        for chunk in generator.chunks():
+            by_id = {location.id: location for location in chunk.locations}
+            for tenancy in chunk.tenancies:
+                location = by_id[tenancy.location_id]
+                address = (
+                    f"{location.address} {location.unit}" if location.unit else location.address
+                )
+                for inspection_date in generator.inspection_dates(tenancy):
+                    writer.writerow(
+                        [
+                            tenancy.business_name,
+                            address,
+                            "SEATTLE",
+                            "WA",
+                            location.zip_code,
+                            f"{location.lat:.6f}",
+                            f"{location.lon:.6f}",
+                            inspection_date.strftime("%m/%d/%Y"),
+                            "Routine Inspection/Field Review",
+                            "Satisfactory",
+                        ]
+                    )
+                    rows += 1
+            locations += len(chunk.locations)
+            print(f"{locations} locations, {rows} inspection rows")
+
+    print(f"\nWrote {rows} inspection rows to {csv_path} in {time.perf_counter() - start:.1f}s")
+
+
+async def load_database(config: CityConfig, truncate: bool = False, engine=None) -> None:
+    """COPY the city into ``engine`` (default: the ETL engine on ``DATABASE_URL``)."""
+    from dateutil.relativedelta import relativedelta
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.core.config import settings
+    from app.db.postgres.postgres_dataset_version_repository import (
+        PostgresDatasetVersionRepository,
+    )
+    from app.db.postgres.postgres_tenancy_repository import PostgresTenancyRepository
+
+    if engine is None:
+        from app.db.session import engine
+
+    generator = CityGenerator(config)
+    current_cutoff = generator.today - relativedelta(months=settings.recent_months)
+    start = time.perf_counter()
+    counts = {"locations": 0, "tenancies": 0, "memory_submissions": 0}
+
+    async with engine.connect() as conn:
+        existing = await conn.scalar(text("SELECT count(*) FROM locations"))
+        if existing and not truncate:
+            raise SystemExit(f"locations already holds {existing} rows; pass --truncate to replace")
+        if truncate:
+            await conn.execute(text("TRUNCATE locations, tenancies, memory_submissions CASCADE"))
+
+        driver = (await conn.get_raw_connection()).driver_connection
+        tenancy_ids = itertools.count(1)
+        memory_ids = itertools.count(1)
+        for chunk in generator.chunks():
+            await driver.copy_records_to_table(
+                "locations",
+                columns=["id", "lat", "lon", "address", "unit", "display_slot", "spatial_key"],
+                records=[
+                    (loc.id, loc.lat, loc.lon, loc.address, loc.unit, loc.display_slot)
+                    + (morton_key(loc.lat, loc.lon),)
+                    for loc in chunk.locations
+                ],
+            )
+            await driver.copy_records_to_table(
+                "tenancies",
+                columns=[
+                    "id",
+                    "location_id",
+                    "business_name",
+                    "category",
+                    "start_date",
+                    "end_date",
+                    "is_current",
+                    "sources",
+                ],
+                records=[
+                    (
+                        next(tenancy_ids),
+                        t.location_id,
+                        t.business_name,
+                        t.category,
+                        t.start_date,
+                        t.end_date,
+                        t.end_date >= current_cutoff,
+                        json.dumps(
+                            [
+                                {
+                                    "type": SOURCE_TYPE_SYNTHETIC,
+                                    "dataset": DATASET_SYNTHETIC_CITY,
+                                    "first_seen": t.start_date.isoformat(),
+                                    "last_seen": t.end_date.isoformat(),
+                                }
+                            ]
+                        ),
+                    )
+                    for t in chunk.tenancies
+                ],
+            )
+            await driver.copy_records_to_table(
+                "memory_submissions",
+                columns=[
+                    "id",
+                    "location_id",
+                    "business_name",
+                    "start_year",
+                    "end_year",
+                    "note",
+                    "source",
+                    "status",
+                ],
+                records=[
+                    (next(memory_ids), m.location_id, m.business_name, m.start_year, m.end_year)
+                    + (m.note, "anon", m.status)
+                    for m in chunk.memories
+                ],
+            )
+            counts["locations"] += len(chunk.locations)
+            counts["tenancies"] += len(chunk.tenancies)
+            counts["memory_submissions"] += len(chunk.memories)
+            print(
+                f"{counts['locations']} locations, {counts['tenancies']} tenancies, "
+                f"{counts['memory_submissions']} memory submissions"
+            )
+
+        for table in counts:
+            await conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                )
+            )
+        await conn.commit()
+
+    async with AsyncSession(engine) as session:
+        refreshed = await PostgresTenancyRepository(session).refresh_current_tenancy()
+        await PostgresDatasetVersionRepository(session).bump()
+        await session.commit()
+    print(f"Refreshed current tenancy on {refreshed} locations")
+
+    # Same as `make db-cluster-locations`: restore page locality after a large load.
+    async with engine.connect() as conn:
+        await conn.execute(text("CLUSTER locations USING idx_locations_spatial_key"))
+        await conn.execute(text("ANALYZE locations, tenancies, memory_submissions"))
+        await conn.commit()
+
+    print(f"\nLoad complete in {time.perf_counter() - start:.1f}s")
+
+
+def main() -> None:
+    defaults = CityConfig()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output", choices=["kc-csv", "database"], help="What to produce")
+    parser.add_argument("csv_path", nargs="?", help="CSV file to write (kc-csv)")
+    parser.add_argument("--locations", type=int, default=defaults.locations)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--multi-unit-fraction",
+        type=float,
+        default=defaults.multi_unit_fraction,
+        help="Fraction of buildings with co-located units",
+    )
+    parser.add_argument("--max-units", type=int, default=defaults.max_units)
+    parser.add_argument("--first-year", type=int, default=defaults.first_year)
+    parser.add_argument(
+        "--mean-tenancy-years",
+        type=float,
+        default=defaults.mean_tenancy_years,
+        help="Mean occupancy length; lower means more churn and longer histories",
+    )
+    parser.add_argument("--memory-fraction", type=float, default=defaults.memory_fraction)
+    parser.add_argument(
+        "--truncate", action="store_true", help="Replace existing locations (database)"
+    )
+    args = parser.parse_args()
+
+    config = CityConfig(
+        locations=args.locations,
+        seed=args.seed,
+        multi_unit_fraction=args.multi_unit_fraction,
+        max_units=args.max_units,
+        first_year=args.first_year,
+        mean_tenancy_years=args.mean_tenancy_years,
+        memory_fraction=args.memory_fraction,
+    )
+
+    if args.output == "kc-csv":
+        if not args.csv_path:
+            parser.error("kc-csv needs a csv_path")
+        write_kc_csv(config, args.csv_path)
+    else:
+        asyncio.run(load_database(config, truncate=args.truncate))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sqlalchemy import select
 from app.db.session import AsyncSessionLocal
 from app.models.location import Location
+from app.db.postgres.postgres_dataset_version_repository import PostgresDatasetVersionRepository
 
 
 async def seed_locations(csv_path: str):
@@ -36,6 +37,7 @@ async def seed_locations(csv_path: str):
 
             if locations_to_add:
                 session.add_all(locations_to_add)
+                await PostgresDatasetVersionRepository(session).bump()
                 await session.commit()
                 print(f"Successfully seeded {len(locations_to_add)} locations")
             else:
@@ -25,9 +25,12 @@ from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.engine import Row
 
 from app.db.session import AsyncSessionLocal, AsyncSession
+from app.db.postgres.postgres_dataset_version_repository import PostgresDatasetVersionRepository
+from app.db.postgres.postgres_tenancy_repository import PostgresTenancyRepository
 from app.models.location import Location
 from app.models.tenancy import Tenancy
 from app.core.config import settings
+from app.core.spatial import morton_key
 
 # --- Setup & Constants ---
 
@@ -65,6 +68,7 @@ class TransformStats:
         self.locations_created = 0
         self.tenancies_upserted = 0
         self.consistency_fixes = 0
+        self.current_tenancy_refreshes = 0
         self.skipped_rows = 0
 
 
@@ -136,7 +140,9 @@ async def get_or_create_location(
         return cached_id
 
     # Not in cache, create it
-    location = Location(lat=lat, lon=lon, address=norm_address, unit=unit)
+    location = Location(
+        lat=lat, lon=lon, address=norm_address, unit=unit, spatial_key=morton_key(lat, lon)
+    )
     session.add(location)
     await session.flush()  # Flush to get the new location.id
 
@@ -292,6 +298,11 @@ async def upsert_tenancies(session: AsyncSession, candidates: List[Dict], stats:
     result = await session.execute(stmt)
     stats.tenancies_upserted += result.rowcount
 
+    location_ids = sorted({candidate["location_id"] for candidate in candidates})
+    stats.current_tenancy_refreshes += await PostgresTenancyRepository(
+        session
+    ).refresh_current_tenancy(location_ids)
+
 
 async def enforce_consistency(session: AsyncSession, stats: TransformStats):
     """
@@ -300,6 +311,8 @@ async def enforce_consistency(session: AsyncSession, stats: TransformStats):
        at locations with multiple "current" tenancies.
     2. Setting `is_current = false` for any tenancies that haven't
        been seen in `OUTDATED_TENANCY_MONTHS`.
+    3. Refreshing `locations.current_business`/`current_category` for every
+       location touched by (1) or (2).
     """
     fixes = 0
 
@@ -327,11 +340,15 @@ async def enforce_consistency(session: AsyncSession, stats: TransformStats):
     )
 
     update_multi_current_stmt = (
-        update(Tenancy).where(Tenancy.id.in_(subquery)).values(is_current=False)
+        update(Tenancy)
+        .where(Tenancy.id.in_(subquery))
+        .values(is_current=False)
+        .returning(Tenancy.location_id)
     )
 
     result = await session.execute(update_multi_current_stmt)
-    fixes += result.rowcount
+    multi_current_location_ids = result.scalars().all()
+    fixes += len(multi_current_location_ids)
 
     # 2. Fix outdated tenancies
     outdated_cutoff = datetime.now().date() - relativedelta(months=settings.outdated_tenancy_months)
@@ -341,13 +358,20 @@ async def enforce_consistency(session: AsyncSession, stats: TransformStats):
         .where(Tenancy.is_current == True)
         .where(Tenancy.end_date < outdated_cutoff)
         .values(is_current=False)
+        .returning(Tenancy.location_id)
     )
 
     result = await session.execute(update_outdated_stmt)
-    fixes += result.rowcount
+    outdated_location_ids = result.scalars().all()
+    fixes += len(outdated_location_ids)
 
     stats.consistency_fixes = fixes
 
+    # 3. Keep the denormalized locations.current_* columns in step with the fixes above
+    stats.current_tenancy_refreshes += await PostgresTenancyRepository(
+        session
+    ).refresh_current_tenancy(sorted({*multi_current_location_ids, *outdated_location_ids}))
+
 
 # --- Reporting & Main Execution ---
 
@@ -367,6 +391,7 @@ async def generate_qa_report(session: AsyncSession, stats: TransformStats):
     logger.info(f"  New locations created: {stats.locations_created}")
     logger.info(f"  Tenancies upserted: {stats.tenancies_upserted}")
     logger.info(f"  Consistency fixes applied: {stats.consistency_fixes}")
+    logger.info(f"  Current tenancy refreshes: {stats.current_tenancy_refreshes}")
 
     # Top 10 Locations
     stmt_top_loc = (
@@ -464,6 +489,10 @@ async def transform_kc_to_tenancies(batch_size: int = 4000):
         await session.commit()
         logger.info("Consistency enforcement complete")
 
+        version = await PostgresDatasetVersionRepository(session).bump()
+        await session.commit()
+        logger.info(f"Dataset version bumped to {version}")
+
         await generate_qa_report(session, stats)
 
         logger.info("\n" + "=" * 80)
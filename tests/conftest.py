@@ -15,6 +15,7 @@ from app.models.memory_submission import MemorySubmission
 from app.repositories.location_repository import ILocationRepository
 from app.repositories.tenancy_repository import ITenancyRepository
 from app.repositories.memory_repository import IMemoryRepository
+from app.repositories.dataset_version_repository import IDatasetVersionRepository
 
 
 @pytest.fixture
@@ -82,8 +83,12 @@ def mock_location_repository():
     mock_repo.exists = AsyncMock()
     mock_repo.count = AsyncMock()
     mock_repo.find_by_coordinates = AsyncMock()
+    mock_repo.get_detail = AsyncMock()
+    mock_repo.find_details_by_ids = AsyncMock()
     mock_repo.find_in_bounding_box = AsyncMock()
     mock_repo.find_with_current_tenancy = AsyncMock()
+    mock_repo.find_all_with_current_tenancy = AsyncMock()
+    mock_repo.find_clusters = AsyncMock()
     return mock_repo
 
 
@@ -101,6 +106,9 @@ def mock_tenancy_repository():
     mock_repo.find_current_by_location = AsyncMock()
     mock_repo.find_by_business_name = AsyncMock()
     mock_repo.find_by_date_range = AsyncMock()
+    mock_repo.refresh_current_tenancy = AsyncMock()
+    mock_repo.count_current_tenancy_mismatches = AsyncMock()
+    mock_repo.find_current_tenancy_mismatches = AsyncMock()
     return mock_repo
 
 
@@ -120,6 +128,14 @@ def mock_memory_repository():
     return mock_repo
 
 
+@pytest.fixture
+def mock_dataset_version_repository():
+    mock_repo = AsyncMock(spec=IDatasetVersionRepository)
+    mock_repo.get_current = AsyncMock(return_value=1)
+    mock_repo.bump = AsyncMock(return_value=2)
+    return mock_repo
+
+
 @pytest.fixture(autouse=True)
 def reset_rate_limiter():
     from app.main import app
@@ -140,11 +156,22 @@ def reset_rate_limiter():
                 current = getattr(current, "app", None)
 
 
+@pytest.fixture(autouse=True)
+def reset_response_cache():
+    from app.services.response_cache import location_response_cache
+
+    location_response_cache.clear()
+    yield
+    location_response_cache.clear()
+
+
 @pytest.fixture
 async def async_client():
     from app.main import app
+    from app.api.locations import get_dataset_version
 
     app.dependency_overrides.clear()
+    app.dependency_overrides[get_dataset_version] = lambda: 1
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         yield client
@@ -2,7 +2,9 @@ from unittest.mock import AsyncMock
 import pytest
 
 from app.main import app
-from app.api.locations import get_location_service
+from app.api.locations import get_location_service, pins_returned_counter
+from app.core.pagination import encode_cursor
+from app.core.serialization import PINS_MEDIA_TYPE, decode_binary_pins
 from app.services.location_service import LocationService
 from app.schemas.location import LocationDetail, TimelineEntry
 
@@ -79,7 +81,145 @@ class TestLocationEndpoints:
             assert response.status_code == 200
             mock_location_service.find_locations_in_area.assert_called_once()
             call_args = mock_location_service.find_locations_in_area.call_args
-            assert call_args[0][1] == 100
+            assert call_args[0][1] == 101
+            assert call_args[1]["after_id"] == 0
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_returns_cursor_when_more_rows_exist(
+        self, async_client, mock_location_service
+    ):
+        mock_location_service.find_locations_in_area.return_value = [
+            {
+                "id": location_id,
+                "lat": 37.7749,
+                "lon": -122.4194,
+                "address": f"{location_id} Market St",
+                "current_business": None,
+                "current_category": None,
+            }
+            for location_id in (3, 5, 8)
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations?bbox=-122.5,37.7,-122.4,37.8&limit=2")
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["count"] == 2
+            assert [pin["id"] for pin in data["locations"]] == [3, 5]
+            assert data["cursor"] is not None
+
+            await async_client.get(
+                f"/v1/locations?bbox=-122.5,37.7,-122.4,37.8&limit=2&cursor={data['cursor']}"
+            )
+            call_args = mock_location_service.find_locations_in_area.call_args
+            assert call_args[1]["after_id"] == 5
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_last_page_has_no_cursor(self, async_client, mock_location_service):
+        mock_location_service.find_locations_in_area.return_value = [
+            {
+                "id": 3,
+                "lat": 37.7749,
+                "lon": -122.4194,
+                "address": "3 Market St",
+                "current_business": None,
+                "current_category": None,
+            }
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations?bbox=-122.5,37.7,-122.4,37.8&limit=2")
+
+            assert response.status_code == 200
+            assert response.json()["cursor"] is None
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_invalid_cursor(self, async_client, mock_location_service):
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations?bbox=-122.5,37.7,-122.4,37.8&cursor=not-a-cursor"
+            )
+
+            assert response.status_code == 400
+            mock_location_service.find_locations_in_area.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_rejects_oversized_cursor(
+        self, async_client, mock_location_service
+    ):
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                f"/v1/locations?bbox=-122.5,37.7,-122.4,37.8&cursor={encode_cursor(2**40)}"
+            )
+
+            assert response.status_code == 400
+            mock_location_service.find_locations_in_area.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_location_clusters_success(self, async_client, mock_location_service):
+        mock_location_service.find_clusters_in_area.return_value = [
+            {
+                "cell_x": 1,
+                "cell_y": 1,
+                "count": 40,
+                "lat": 37.75,
+                "lon": -122.45,
+                "representative_id": 2,
+                "representative_business": "Joe's Coffee",
+            },
+            {
+                "cell_x": 2,
+                "cell_y": 1,
+                "count": 1,
+                "lat": 37.76,
+                "lon": -122.41,
+                "representative_id": 9,
+                "representative_business": None,
+            },
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations/clusters?bbox=-122.5,37.7,-122.4,37.8&zoom=12"
+            )
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["count"] == 2
+            assert data["total"] == 41
+            assert data["zoom"] == 12
+            assert data["clusters"][0]["location_id"] is None
+            assert data["clusters"][0]["representative_business"] == "Joe's Coffee"
+            assert data["clusters"][1]["location_id"] == 9
+            call_args = mock_location_service.find_clusters_in_area.call_args
+            assert call_args[0][1] == 12
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_location_clusters_requires_zoom(self, async_client, mock_location_service):
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations/clusters?bbox=-122.5,37.7,-122.4,37.8")
+
+            assert response.status_code == 422
+            mock_location_service.find_clusters_in_area.assert_not_called()
         finally:
             app.dependency_overrides.clear()
 
@@ -150,3 +290,303 @@ class TestLocationEndpoints:
             assert len(data["timeline"]) == 0
         finally:
             app.dependency_overrides.clear()
+
+    async def test_get_location_details_batch(self, async_client, mock_location_service):
+        mock_location_service.get_locations_by_ids.return_value = [
+            LocationDetail(id=2, lat=37.7, lon=-122.4, address="2 Main St", timeline=[]),
+            LocationDetail(id=1, lat=37.8, lon=-122.5, address="1 Main St", timeline=[]),
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations:batch?ids=2,1,2,99")
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["count"] == 2
+            assert [detail["id"] for detail in data["locations"]] == [2, 1]
+            assert data["missing"] == [99]
+            mock_location_service.get_locations_by_ids.assert_called_once_with([2, 1, 99])
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_location_details_batch_rejects_bad_ids(
+        self, async_client, mock_location_service
+    ):
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations:batch?ids=1,abc")
+
+            assert response.status_code == 400
+            mock_location_service.get_locations_by_ids.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_location_details_batch_rejects_ids_beyond_the_id_column(
+        self, async_client, mock_location_service
+    ):
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations:batch?ids=1,99999999999")
+
+            assert response.status_code == 400
+            assert response.json()["error"].startswith("Invalid ids format")
+            mock_location_service.get_locations_by_ids.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_location_details_batch_enforces_max_ids(
+        self, async_client, mock_location_service, monkeypatch
+    ):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "location_batch_max_ids", 2)
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations:batch?ids=1,2,3")
+
+            assert response.status_code == 400
+            mock_location_service.get_locations_by_ids.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_sets_etag_and_cache_control(
+        self, async_client, mock_location_service
+    ):
+        mock_location_service.find_locations_in_area.return_value = []
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations?bbox=-122.5,37.7,-122.4,37.8")
+
+            assert response.status_code == 200
+            assert response.headers["etag"] == 'W/"v1"'
+            assert "must-revalidate" in response.headers["cache-control"]
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_not_modified_skips_service(
+        self, async_client, mock_location_service
+    ):
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations?bbox=-122.5,37.7,-122.4,37.8",
+                headers={"If-None-Match": 'W/"v1"'},
+            )
+
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == 'W/"v1"'
+            mock_location_service.find_locations_in_area.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_location_detail_stale_etag_returns_body(
+        self, async_client, mock_location_service
+    ):
+        mock_location_service.get_location_by_id.return_value = LocationDetail(
+            id=1, lat=37.7749, lon=-122.4194, address="123 Market St", timeline=[]
+        )
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations/1", headers={"If-None-Match": 'W/"v0"'}
+            )
+
+            assert response.status_code == 200
+            assert response.headers["etag"] == 'W/"v1"'
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_location_detail_not_modified_skips_service(
+        self, async_client, mock_location_service
+    ):
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get("/v1/locations/1", headers={"If-None-Match": "*"})
+
+            assert response.status_code == 304
+            mock_location_service.get_location_by_id.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_serves_nearby_viewports_from_cache(
+        self, async_client, mock_location_service
+    ):
+        mock_location_service.find_locations_in_area.return_value = [
+            {
+                "id": 1,
+                "lat": 37.7749,
+                "lon": -122.4194,
+                "address": "123 Market St",
+                "current_business": "Joe's Coffee",
+                "current_category": "cafe",
+            }
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            pins_before = pins_returned_counter._value.get()
+            first = await async_client.get("/v1/locations?bbox=-122.5,37.7,-122.4,37.8")
+            second = await async_client.get("/v1/locations?bbox=-122.49999,37.70001,-122.4,37.8")
+
+            assert first.status_code == second.status_code == 200
+            assert first.content == second.content
+            # The cache hit counts its pins like the miss did.
+            assert pins_returned_counter._value.get() == pins_before + 2
+            assert second.headers["etag"] == 'W/"v1"'
+            mock_location_service.find_locations_in_area.assert_called_once()
+
+            bbox = mock_location_service.find_locations_in_area.call_args[0][0]
+            assert bbox.west <= -122.5 and bbox.east >= -122.4
+            assert bbox.south <= 37.7 and bbox.north >= 37.8
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_cached_body_is_gzipped_when_accepted(
+        self, async_client, mock_location_service
+    ):
+        mock_location_service.find_locations_in_area.return_value = [
+            {
+                "id": location_id,
+                "lat": 37.75,
+                "lon": -122.45,
+                "address": f"{location_id} Market St",
+                "current_business": "Joe's Coffee",
+                "current_category": "cafe",
+            }
+            for location_id in range(1, 51)
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations?bbox=-122.5,37.7,-122.4,37.8",
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.json()["count"] == 50
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_columnar_format(self, async_client, mock_location_service):
+        mock_location_service.find_locations_in_area.return_value = [
+            {
+                "id": 1,
+                "lat": 37.7749,
+                "lon": -122.4194,
+                "address": "123 Market St",
+                "current_business": "Joe's Coffee",
+                "current_category": "cafe",
+            }
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations?bbox=-122.5,37.7,-122.4,37.8&format=columnar"
+            )
+
+            assert response.status_code == 200
+            assert response.headers["etag"] == 'W/"v1-columnar"'
+            data = response.json()
+            assert data["format"] == "columnar"
+            assert data["id"] == [1]
+            assert data["business_table"] == ["Joe's Coffee"]
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_binary_via_accept_header(
+        self, async_client, mock_location_service
+    ):
+        rows = [
+            {
+                "id": 1,
+                "lat": 37.7749,
+                "lon": -122.4194,
+                "address": "123 Market St",
+                "current_business": "Joe's Coffee",
+                "current_category": "cafe",
+            }
+        ]
+        mock_location_service.find_locations_in_area.return_value = rows
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations?bbox=-122.5,37.7,-122.4,37.8",
+                headers={"Accept": PINS_MEDIA_TYPE},
+            )
+            json_response = await async_client.get("/v1/locations?bbox=-122.5,37.7,-122.4,37.8")
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == PINS_MEDIA_TYPE
+            assert response.headers["etag"] == 'W/"v1-binary"'
+            assert "Accept" in response.headers["vary"]
+            decoded, cursor = decode_binary_pins(response.content)
+            assert decoded == rows
+            assert cursor is None
+            assert json_response.json()["locations"] == rows
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_locations_unknown_format(self, async_client):
+        response = await async_client.get("/v1/locations?bbox=-122.5,37.7,-122.4,37.8&format=xml")
+
+        assert response.status_code == 422
+
+    async def test_get_locations_uncached_body_is_compressed_by_middleware(
+        self, async_client, mock_location_service, monkeypatch
+    ):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "response_cache_enabled", False)
+        mock_location_service.find_locations_in_area.return_value = [
+            {
+                "id": location_id,
+                "lat": 37.75,
+                "lon": -122.45,
+                "address": f"{location_id} Market St",
+                "current_business": "Joe's Coffee",
+                "current_category": "cafe",
+            }
+            for location_id in range(1, 51)
+        ]
+
+        app.dependency_overrides[get_location_service] = lambda: mock_location_service
+
+        try:
+            response = await async_client.get(
+                "/v1/locations?bbox=-122.5,37.7,-122.4,37.8",
+                headers={"Accept-Encoding": "gzip"},
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["vary"] == "Accept, Accept-Encoding"
+            assert response.json()["count"] == 50
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_small_responses_are_not_compressed(self, async_client):
+        response = await async_client.get("/healthz", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
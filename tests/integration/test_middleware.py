@@ -0,0 +1,158 @@
+import logging
+
+import pytest
+
+from app.core.request_context import current_request, span
+from app.main import app
+from app.middleware.correlation_id import CorrelationIdMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware, server_timing
+
+
+def _rate_limiter() -> RateLimitMiddleware:
+    current = app.middleware_stack
+    while current is not None and not isinstance(current, RateLimitMiddleware):
+        current = getattr(current, "app", None)
+    return current
+
+
+class TestMiddleware:
+    async def test_sets_correlation_id_header(self, async_client):
+        response = await async_client.get("/healthz")
+
+        assert response.status_code == 200
+        assert len(response.headers["x-correlation-id"]) == 36
+
+    async def test_honors_inbound_correlation_id(self, async_client):
+        response = await async_client.get("/healthz", headers={"X-Correlation-ID": "lb-42.a"})
+
+        assert response.headers["x-correlation-id"] == "lb-42.a"
+
+    async def test_replaces_malformed_inbound_correlation_id(self, async_client):
+        response = await async_client.get(
+            "/healthz", headers={"X-Correlation-ID": "bad id " + "x" * 200}
+        )
+
+        assert len(response.headers["x-correlation-id"]) == 36
+
+    async def test_logs_request_spans(self, async_client, caplog):
+        from unittest.mock import AsyncMock
+
+        from app.api.locations import get_location_service
+        from app.services.location_service import LocationService
+
+        service = AsyncMock(spec=LocationService)
+        service.find_locations_in_area.return_value = []
+        app.dependency_overrides[get_location_service] = lambda: service
+
+        with caplog.at_level(logging.INFO, logger="app.middleware.logging"):
+            await async_client.get("/v1/locations?bbox=-122.5,37.7,-122.4,37.8")
+
+        record = next(r for r in caplog.records if r.getMessage() == "Request completed")
+        assert {"cache", "serialize"} <= set(record.spans_ms)
+
+    async def test_correlation_id_reaches_error_body(self, async_client):
+        response = await async_client.get("/v1/locations?bbox=invalid")
+
+        assert response.json()["correlation_id"] == response.headers["x-correlation-id"]
+
+    async def test_logs_completed_request(self, async_client, caplog):
+        with caplog.at_level(logging.INFO, logger="app.middleware.logging"):
+            response = await async_client.get("/healthz")
+
+        record = next(r for r in caplog.records if r.getMessage() == "Request completed")
+        assert record.status_code == 200
+        assert record.path == "/healthz"
+        assert record.correlation_id == response.headers["x-correlation-id"]
+
+    async def test_rate_limited_requests_get_429(self, async_client, monkeypatch):
+        await async_client.get("/healthz")
+        limiter = _rate_limiter()
+        monkeypatch.setitem(limiter.limits, "GET", (2, 300))
+
+        statuses = [(await async_client.get("/v1/tiles/2/4/0.mvt")).status_code for _ in range(3)]
+        response = await async_client.get("/v1/tiles/2/4/0.mvt")
+
+        assert statuses == [400, 400, 429]
+        assert response.status_code == 429
+        # 2 requests per 300s: the next one is admitted 150s after the burst.
+        assert response.headers["retry-after"] == "150"
+        assert response.json()["error"]["error"] == "Rate limit exceeded"
+        assert response.json()["correlation_id"] == response.headers["x-correlation-id"]
+
+    async def test_health_checks_are_not_rate_limited(self, async_client, monkeypatch):
+        await async_client.get("/healthz")
+        monkeypatch.setitem(_rate_limiter().limits, "GET", (1, 300))
+
+        statuses = [(await async_client.get("/healthz")).status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 200]
+
+    async def test_samples_successful_requests(self, async_client, caplog, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "log_success_sample_rate", 0.0)
+
+        with caplog.at_level(logging.INFO, logger="app.middleware.logging"):
+            await async_client.get("/healthz")
+            await async_client.get("/v1/locations?bbox=invalid")
+
+        messages = [r.getMessage() for r in caplog.records if r.name == "app.middleware.logging"]
+        assert messages == ["Client error"]
+
+    async def test_slow_requests_are_always_logged(self, async_client, caplog, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "log_success_sample_rate", 0.0)
+        monkeypatch.setattr(settings, "log_slow_request_seconds", 0.0)
+
+        with caplog.at_level(logging.INFO, logger="app.middleware.logging"):
+            await async_client.get("/healthz")
+
+        record = next(r for r in caplog.records if r.getMessage() == "Request completed")
+        assert not hasattr(record, "sample_rate")
+
+
+class TestServerTiming:
+    @pytest.fixture
+    async def timed_client(self):
+        from fastapi import FastAPI
+        from httpx import ASGITransport, AsyncClient
+
+        timed_app = FastAPI()
+
+        @timed_app.get("/work")
+        async def work():
+            context = current_request()
+            context.add_span("pool", 0.001)
+            context.add_span("sql", 0.004)
+            context.add_span("db", 0.007)
+            with span("serialize"):
+                pass
+            return {"ok": True}
+
+        timed_app.add_middleware(ServerTimingMiddleware)
+        timed_app.add_middleware(CorrelationIdMiddleware)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=timed_app), base_url="http://test"
+        ) as client:
+            yield client
+
+    async def test_reports_spans(self, timed_client):
+        response = await timed_client.get("/work")
+
+        metrics = {
+            entry.split(";")[0]: entry for entry in response.headers["server-timing"].split(", ")
+        }
+        assert set(metrics) == {"pool", "sql", "orm", "serialize", "total"}
+        assert metrics["sql"] == 'sql;dur=4.00;desc="Query execution"'
+        assert metrics["orm"].startswith("orm;dur=2.00;")
+
+    def test_header_format(self):
+        assert server_timing({"cache": 0.0005}, 0.002) == (
+            'cache;dur=0.50;desc="Response cache", total;dur=2.00;desc="Total"'
+        )
+
+    def test_disabled_by_default(self):
+        assert not any(m.cls is ServerTimingMiddleware for m in app.user_middleware)
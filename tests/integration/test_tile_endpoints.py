@@ -0,0 +1,39 @@
+from unittest.mock import AsyncMock
+import pytest
+
+from app.main import app
+from app.api.tiles import get_tile_service
+from app.services.tile_service import TileService
+
+
+class TestTileEndpoints:
+    @pytest.fixture
+    def mock_tile_service(self):
+        return AsyncMock(spec=TileService)
+
+    async def test_get_tile_success(self, async_client, mock_tile_service):
+        mock_tile_service.get_tile.return_value = b"\x1a\x00"
+
+        app.dependency_overrides[get_tile_service] = lambda: mock_tile_service
+
+        try:
+            response = await async_client.get("/v1/tiles/12/656/1430.mvt")
+
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+            assert "max-age=" in response.headers["cache-control"]
+            assert response.content == b"\x1a\x00"
+            mock_tile_service.get_tile.assert_called_once_with(12, 656, 1430)
+        finally:
+            app.dependency_overrides.clear()
+
+    async def test_get_tile_out_of_range(self, async_client, mock_tile_service):
+        app.dependency_overrides[get_tile_service] = lambda: mock_tile_service
+
+        try:
+            response = await async_client.get("/v1/tiles/2/4/0.mvt")
+
+            assert response.status_code == 400
+            mock_tile_service.get_tile.assert_not_called()
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,98 @@
+import asyncio
+import gzip
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.compression import (
+    COMPRESS_MIN_BYTES,
+    OFFLOAD_MIN_BYTES,
+    compress,
+    compress_async,
+    compress_variants,
+    is_compressible,
+    negotiate_encoding,
+)
+
+
+@pytest.fixture
+def with_brotli():
+    fake = MagicMock()
+    fake.compress.side_effect = lambda body, quality: b"br:" + body
+    with patch("app.core.compression.brotli", fake):
+        yield fake
+
+
+@pytest.fixture
+def without_brotli():
+    with patch("app.core.compression.brotli", None):
+        yield
+
+
+class TestNegotiateEncoding:
+    def test_no_header(self):
+        assert negotiate_encoding(None) is None
+        assert negotiate_encoding("") is None
+
+    def test_prefers_brotli_when_available(self, with_brotli):
+        assert negotiate_encoding("gzip, deflate, br") == "br"
+
+    def test_falls_back_to_gzip_without_brotli(self, without_brotli):
+        assert negotiate_encoding("gzip, deflate, br") == "gzip"
+
+    def test_respects_q_values(self, with_brotli):
+        assert negotiate_encoding("br;q=0.5, gzip;q=0.9") == "gzip"
+
+    def test_q_zero_refuses_encoding(self, without_brotli):
+        assert negotiate_encoding("gzip;q=0, identity") is None
+
+    def test_wildcard(self, with_brotli):
+        assert negotiate_encoding("*") == "br"
+        assert negotiate_encoding("*, br;q=0") == "gzip"
+
+    def test_unsupported_only(self, without_brotli):
+        assert negotiate_encoding("deflate, identity") is None
+
+
+class TestCompress:
+    def test_gzip_round_trip(self):
+        body = b'{"locations": []}' * 100
+
+        assert gzip.decompress(compress(body, "gzip")) == body
+
+    def test_unknown_encoding(self):
+        with pytest.raises(ValueError):
+            compress(b"body", "deflate")
+
+    def test_is_compressible(self):
+        assert is_compressible("application/json")
+        assert is_compressible("application/x-nostalgia-pins")
+        assert not is_compressible("image/png")
+        assert not is_compressible(None)
+
+    async def test_variants_skip_small_bodies(self, with_brotli):
+        assert await compress_variants(b"x" * (COMPRESS_MIN_BYTES - 1)) == {}
+
+    async def test_variants_cover_supported_encodings(self, with_brotli):
+        body = b"x" * COMPRESS_MIN_BYTES
+
+        variants = await compress_variants(body)
+
+        assert set(variants) == {"br", "gzip"}
+        assert variants["br"] == b"br:" + body
+
+    async def test_large_bodies_are_compressed_off_the_event_loop(self):
+        body = b"x" * OFFLOAD_MIN_BYTES
+
+        with patch("app.core.compression.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            compressed = await compress_async(body, "gzip")
+            await compress_variants(body)
+
+        assert gzip.decompress(compressed) == body
+        assert to_thread.call_count == 2
+
+    async def test_small_bodies_are_compressed_inline(self):
+        with patch("app.core.compression.asyncio.to_thread") as to_thread:
+            await compress_async(b"x" * COMPRESS_MIN_BYTES, "gzip")
+
+        to_thread.assert_not_called()
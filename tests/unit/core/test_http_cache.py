@@ -0,0 +1,28 @@
+from app.core.http_cache import cache_headers, etag_matches, not_modified, weak_etag
+
+
+class TestHttpCache:
+    def test_weak_etag_embeds_version(self):
+        assert weak_etag(42) == 'W/"v42"'
+
+    def test_etag_matches_exact_and_weak_forms(self):
+        etag = weak_etag(3)
+
+        assert etag_matches('W/"v3"', etag)
+        assert etag_matches('"v3"', etag)
+        assert etag_matches('"v1", W/"v3"', etag)
+
+    def test_etag_does_not_match_other_versions(self):
+        assert not etag_matches('W/"v2"', weak_etag(3))
+        assert not etag_matches(None, weak_etag(3))
+        assert not etag_matches("", weak_etag(3))
+
+    def test_wildcard_matches_any_etag(self):
+        assert etag_matches("*", weak_etag(3))
+
+    def test_not_modified_carries_cache_headers(self):
+        response = not_modified(weak_etag(3), 30)
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == 'W/"v3"'
+        assert response.headers["cache-control"] == cache_headers('W/"v3"', 30)["Cache-Control"]
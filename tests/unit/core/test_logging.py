@@ -0,0 +1,88 @@
+import io
+import json
+import logging
+import queue
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from app.core.logging import (
+    BoundedQueueHandler,
+    configure_logging,
+    dropped_log_records_counter,
+    get_logger,
+    set_correlation_id,
+    stop_logging,
+)
+from app.core.request_context import end_request, start_request
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _record(msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+class TestBoundedQueueHandler:
+    def test_drops_and_counts_when_full(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+        before = dropped_log_records_counter._value.get()
+
+        handler.handle(_record("first"))
+        handler.handle(_record("second"))
+
+        assert handler.queue.qsize() == 1
+        assert dropped_log_records_counter._value.get() == before + 1
+
+    def test_prepare_merges_args_and_keeps_traceback(self):
+        handler = BoundedQueueHandler(queue.Queue())
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = logging.LogRecord(
+                "test", logging.ERROR, __file__, 1, "failed %s", ("job",), sys.exc_info()
+            )
+
+        prepared = handler.prepare(record)
+
+        assert prepared.msg == "failed job"
+        assert prepared.args is None
+        assert prepared.exc_info is None
+        assert "RuntimeError: boom" in prepared.exc_text
+
+
+class TestConfigureLogging:
+    def test_queued_records_reach_stdout_with_correlation_id(self, restore_root_logger):
+        stdout = io.StringIO()
+        with patch("app.core.logging.sys.stdout", stdout):
+            configure_logging(log_level="INFO", log_format="json", queue_size=100)
+            token = start_request("abc-123")
+            try:
+                get_logger("test").info("hello", extra={"path": "/healthz"})
+                set_correlation_id("changed-before-write")
+                stop_logging()
+            finally:
+                end_request(token)
+
+        line = json.loads(stdout.getvalue().splitlines()[-1])
+        assert line["message"] == "hello"
+        assert line["correlation_id"] == "abc-123"
+        assert line["path"] == "/healthz"
+
+    def test_queue_size_zero_writes_synchronously(self, restore_root_logger):
+        stdout = io.StringIO()
+        with patch("app.core.logging.sys.stdout", stdout):
+            configure_logging(log_level="INFO", log_format="json", queue_size=0)
+            get_logger("test").info("hello")
+
+        assert "hello" in stdout.getvalue()
+        assert not isinstance(logging.getLogger().handlers[0], BoundedQueueHandler)
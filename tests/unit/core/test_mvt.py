@@ -0,0 +1,90 @@
+import pytest
+
+from app.core.mvt import PointFeature, encode_point_layer, project, tile_bounds
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_message(data: bytes) -> list[tuple[int, object]]:
+    fields = []
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field_number, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos : pos + 8], pos + 8
+        else:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos : pos + length], pos + length
+        fields.append((field_number, value))
+    return fields
+
+
+def _read_packed(data: bytes) -> list[int]:
+    values = []
+    pos = 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+class TestMvt:
+    def test_tile_bounds_for_world_tile(self):
+        bounds = tile_bounds(0, 0, 0)
+
+        assert bounds.west == -180.0
+        assert bounds.east == 180.0
+        assert bounds.north == pytest.approx(85.0511, abs=1e-4)
+        assert bounds.south == pytest.approx(-85.0511, abs=1e-4)
+
+    def test_project_tile_center(self):
+        bounds = tile_bounds(12, 656, 1430)
+        center_lon = (bounds.west + bounds.east) / 2
+
+        px, _ = project(center_lon, bounds.north, 12, 656, 1430, 4096)
+
+        assert px == 2048
+
+    def test_encode_point_layer_structure(self):
+        features = [
+            PointFeature(
+                1, -122.3321, 47.6062, {"address": "123 MAIN ST", "current_business": None}
+            ),
+            PointFeature(2, -122.3400, 47.6100, {"address": "456 PIKE ST", "unit": 3}),
+        ]
+
+        tile = encode_point_layer("locations", features, 12, 656, 1430)
+
+        ((field_number, layer_bytes),) = _read_message(tile)
+        assert field_number == 3
+        layer = _read_message(layer_bytes)
+        fields = {}
+        for number, value in layer:
+            fields.setdefault(number, []).append(value)
+
+        assert fields[15] == [2]
+        assert fields[1] == [b"locations"]
+        assert fields[3] == [b"address", b"unit"]
+        assert fields[5] == [4096]
+        assert len(fields[2]) == 2
+        assert len(fields[4]) == 3
+
+        feature = dict(_read_message(fields[2][0]))
+        assert feature[1] == 1
+        assert feature[3] == 1
+        assert _read_packed(feature[2]) == [0, 0]
+        geometry = _read_packed(feature[4])
+        assert geometry[0] == 9
+        assert len(geometry) == 3
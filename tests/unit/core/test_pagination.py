@@ -0,0 +1,29 @@
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+class TestPagination:
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(12345)
+
+        assert decode_cursor(cursor) == 12345
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(2**40)
+
+        assert "=" not in cursor
+        assert "+" not in cursor
+        assert "/" not in cursor
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ["not-a-cursor", "", "eyJ2IjoxfQ", "eyJ2IjoyLCJhZnRlciI6MX0", "eyJ2IjoxLCJhZnRlciI6LTF9"],
+    )
+    def test_decode_rejects_malformed_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_decode_rejects_ids_beyond_the_id_column(self):
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(2**40))
@@ -0,0 +1,203 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.rate_limit import (
+    MemoryRateLimitStore,
+    PostgresRateLimitStore,
+    SharedMemoryRateLimitStore,
+    gcra,
+)
+
+
+class TestGcra:
+    def test_admits_a_burst_of_capacity(self):
+        tat = None
+        decisions = []
+        for _ in range(4):
+            decision, new_tat = gcra(tat, 100.0, 3, 30.0)
+            decisions.append(decision.allowed)
+            tat = new_tat if decision.allowed else tat
+
+        assert decisions == [True, True, True, False]
+
+    def test_denial_reports_retry_after_and_keeps_tat(self):
+        decision, tat = gcra(130.0, 100.0, 3, 30.0)
+
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(10.0)
+        assert tat == 130.0
+
+    def test_refills_continuously(self):
+        decision, tat = gcra(130.0, 110.0, 3, 30.0)
+
+        assert decision.allowed
+        assert tat == 140.0
+
+    def test_expired_tat_behaves_like_new_key(self):
+        assert gcra(50.0, 100.0, 3, 30.0) == gcra(None, 100.0, 3, 30.0)
+
+
+class TestMemoryRateLimitStore:
+    async def test_limits_per_key(self):
+        store = MemoryRateLimitStore(max_keys=100)
+
+        first = [(await store.acquire("a", 2, 60)).allowed for _ in range(3)]
+        other = await store.acquire("b", 2, 60)
+
+        assert first == [True, True, False]
+        assert other.allowed
+
+    async def test_evicts_idle_keys(self):
+        store = MemoryRateLimitStore(max_keys=100)
+
+        with patch("app.core.rate_limit.time.monotonic", return_value=0.0):
+            await store.acquire("idle", 10, 60)
+        with patch("app.core.rate_limit.time.monotonic", return_value=61.0):
+            await store.acquire("active", 10, 60)
+
+        assert len(store) == 1
+        assert store.tracked_keys() == 1
+
+    async def test_evicts_idle_keys_behind_a_live_one(self):
+        store = MemoryRateLimitStore(max_keys=100)
+
+        with patch("app.core.rate_limit.time.monotonic", return_value=0.0):
+            await store.acquire("hourly", 10, 3600)
+            await store.acquire("idle", 10, 60)
+        with patch("app.core.rate_limit.time.monotonic", return_value=61.0):
+            await store.acquire("active", 10, 60)
+
+        assert len(store) == 2
+
+    async def test_busy_key_does_not_grow_the_expiry_heap(self):
+        store = MemoryRateLimitStore(max_keys=1)
+
+        for _ in range(1000):
+            await store.acquire("busy", 10**6, 60)
+
+        assert len(store._expiries) < 100
+
+    async def test_caps_tracked_keys(self):
+        store = MemoryRateLimitStore(max_keys=2)
+
+        for key in ("a", "b", "c"):
+            await store.acquire(key, 1, 60)
+
+        assert len(store) == 2
+        assert (await store.acquire("b", 1, 60)).allowed is False
+        # The least recently used key was dropped and starts over.
+        assert (await store.acquire("a", 1, 60)).allowed is True
+
+    async def test_denied_new_key_is_not_tracked(self):
+        store = MemoryRateLimitStore(max_keys=10)
+
+        await store.acquire("a", 1, 60)
+        await store.acquire("a", 1, 60)
+
+        assert len(store) == 1
+
+    async def test_clear(self):
+        store = MemoryRateLimitStore(max_keys=10)
+        await store.acquire("a", 1, 60)
+
+        store.clear()
+
+        assert (await store.acquire("a", 1, 60)).allowed
+
+
+class TestSharedMemoryRateLimitStore:
+    async def test_buckets_are_shared_through_the_file(self, tmp_path):
+        path = str(tmp_path / "buckets")
+        worker_a = SharedMemoryRateLimitStore(path, slots=64)
+        worker_b = SharedMemoryRateLimitStore(path, slots=64)
+
+        decisions = [
+            (await worker_a.acquire("ip|GET", 3, 60)).allowed,
+            (await worker_b.acquire("ip|GET", 3, 60)).allowed,
+            (await worker_a.acquire("ip|GET", 3, 60)).allowed,
+            (await worker_b.acquire("ip|GET", 3, 60)).allowed,
+        ]
+
+        assert decisions == [True, True, True, False]
+        assert worker_b.tracked_keys() == 1
+        worker_a.close()
+        worker_b.close()
+
+    async def test_table_size_caps_tracked_keys(self, tmp_path):
+        store = SharedMemoryRateLimitStore(str(tmp_path / "buckets"), slots=8)
+
+        for i in range(50):
+            assert (await store.acquire(f"key-{i}", 10, 60)).allowed
+
+        assert store.tracked_keys() == 8
+        store.close()
+
+    async def test_expired_slots_are_reused(self, tmp_path):
+        store = SharedMemoryRateLimitStore(str(tmp_path / "buckets"), slots=8)
+
+        with patch("app.core.rate_limit.time.time", return_value=1000.0):
+            for i in range(8):
+                await store.acquire(f"key-{i}", 10, 60)
+        with patch("app.core.rate_limit.time.time", return_value=2000.0):
+            assert store.tracked_keys() == 0
+            await store.acquire("fresh", 10, 60)
+            assert store.tracked_keys() == 1
+
+        store.close()
+
+    async def test_clear(self, tmp_path):
+        store = SharedMemoryRateLimitStore(str(tmp_path / "buckets"), slots=8)
+        await store.acquire("a", 1, 60)
+
+        store.clear()
+
+        assert (await store.acquire("a", 1, 60)).allowed
+        store.close()
+
+
+class TestPostgresRateLimitStore:
+    @pytest.fixture
+    def session(self):
+        session = MagicMock()
+        session.execute = AsyncMock()
+        session.commit = AsyncMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        return session
+
+    async def test_admits_when_upsert_returns_row(self, session):
+        store = PostgresRateLimitStore(sweep_seconds=3600, session_factory=lambda: session)
+        upsert = MagicMock()
+        upsert.first.return_value = (123.0,)
+        count = MagicMock()
+        count.scalar_one.return_value = 7
+        session.execute.side_effect = [upsert, MagicMock(rowcount=2), count]
+
+        decision = await store.acquire("ip|GET", 100, 300)
+
+        assert decision.allowed
+        assert store.tracked_keys() == 7
+        params = session.execute.call_args_list[0][0][1]
+        assert params == {"key": "ip|GET", "interval": 3.0, "period": 300}
+        session.commit.assert_awaited_once()
+
+    async def test_denies_with_retry_after(self, session):
+        store = PostgresRateLimitStore(sweep_seconds=3600, session_factory=lambda: session)
+        store._next_sweep = float("inf")
+        upsert = MagicMock()
+        upsert.first.return_value = None
+        ahead = MagicMock()
+        ahead.scalar_one.return_value = 299.0
+        session.execute.side_effect = [upsert, ahead]
+
+        decision = await store.acquire("ip|GET", 100, 300)
+
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(2.0)
+
+    async def test_fails_open(self, session):
+        store = PostgresRateLimitStore(sweep_seconds=3600, session_factory=lambda: session)
+        session.execute.side_effect = ConnectionError("down")
+
+        assert (await store.acquire("ip|GET", 1, 60)).allowed
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from unittest.mock import patch
+
+from app.core.logging import CorrelationIdFilter, log_context
+from app.core.request_context import (
+    current_request,
+    end_request,
+    get_correlation_id,
+    span,
+    start_request,
+)
+
+
+def _record() -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+
+
+class TestRequestContext:
+    def test_no_context_outside_requests(self):
+        assert current_request() is None
+        assert get_correlation_id() is None
+
+    def test_start_and_end(self):
+        token = start_request("abc")
+        assert get_correlation_id() == "abc"
+
+        end_request(token)
+
+        assert current_request() is None
+
+    def test_spans_accumulate_by_name(self):
+        token = start_request("abc")
+        try:
+            with patch("app.core.request_context.time.perf_counter", side_effect=[1.0, 1.5]):
+                with span("db"):
+                    pass
+            with patch("app.core.request_context.time.perf_counter", side_effect=[2.0, 2.25]):
+                with span("db"):
+                    pass
+
+            assert current_request().spans == {"db": 0.75}
+            assert current_request().span_millis() == {"db": 750.0}
+        finally:
+            end_request(token)
+
+    def test_span_outside_request_is_noop(self):
+        with span("db"):
+            pass
+
+        assert current_request() is None
+
+    async def test_concurrent_requests_keep_their_own_correlation_id(self):
+        correlation_filter = CorrelationIdFilter()
+
+        async def handle(correlation_id: str, delay: float) -> str:
+            token = start_request(correlation_id)
+            try:
+                await asyncio.sleep(delay)
+                record = _record()
+                correlation_filter.filter(record)
+                return record.correlation_id
+            finally:
+                end_request(token)
+
+        results = await asyncio.gather(handle("first", 0.02), handle("second", 0.0))
+
+        assert results == ["first", "second"]
+
+
+class TestCorrelationIdFilter:
+    def test_defaults_to_na(self):
+        record = _record()
+
+        CorrelationIdFilter().filter(record)
+
+        assert record.correlation_id == "N/A"
+
+    def test_explicit_extra_wins(self):
+        token = start_request("from-context")
+        try:
+            record = _record()
+            record.correlation_id = "from-extra"
+
+            CorrelationIdFilter().filter(record)
+
+            assert record.correlation_id == "from-extra"
+        finally:
+            end_request(token)
+
+
+class TestLogContext:
+    def test_adds_fields_without_swapping_record_factory(self):
+        factory = logging.getLogRecordFactory()
+
+        with log_context(job="etl", batch=3):
+            assert logging.getLogRecordFactory() is factory
+            record = _record()
+            CorrelationIdFilter().filter(record)
+
+        assert (record.job, record.batch) == ("etl", 3)
+        after = _record()
+        CorrelationIdFilter().filter(after)
+        assert not hasattr(after, "job")
+
+    def test_nested_contexts_merge(self):
+        with log_context(job="etl"):
+            with log_context(batch=3):
+                record = _record()
+                CorrelationIdFilter().filter(record)
+
+        assert (record.job, record.batch) == ("etl", 3)
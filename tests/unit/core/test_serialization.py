@@ -0,0 +1,143 @@
+import json
+
+import pytest
+
+from app.core.serialization import (
+    decode_binary_pins,
+    decode_columnar_response,
+    encode_binary_pins,
+    encode_columnar_response,
+    encode_locations_response,
+)
+from app.schemas.location import LocationsResponse, PinOut
+from app.services.location_index import LocationGridIndex
+from app.repositories.location_repository import BoundingBox
+
+
+def _rows():
+    return [
+        {
+            "id": 1,
+            "lat": 47.6062095,
+            "lon": -122.3320708,
+            "address": "123 MAIN ST",
+            "current_business": "Café Ñandú",
+            "current_category": "cafe",
+        },
+        {
+            "id": 2,
+            "lat": 47.61,
+            "lon": -122.33,
+            "address": "456 PINE ST",
+            "current_business": None,
+            "current_category": None,
+        },
+    ]
+
+
+def _model_json(rows, cursor):
+    response = LocationsResponse(
+        locations=[PinOut(**row) for row in rows], count=len(rows), cursor=cursor
+    )
+    return json.loads(response.model_dump_json())
+
+
+class TestEncodeLocationsResponse:
+    def test_matches_response_model_output(self):
+        rows = _rows()
+
+        body = encode_locations_response(rows, "eyJ2IjoxLCJhZnRlciI6Mn0")
+
+        assert json.loads(body) == _model_json(rows, "eyJ2IjoxLCJhZnRlciI6Mn0")
+
+    def test_matches_response_model_output_for_index_rows(self):
+        index = LocationGridIndex(cell_size=0.01)
+        index.build(_rows())
+        rows = index.query(BoundingBox(-123.0, 47.0, -122.0, 48.0))
+
+        assert json.loads(encode_locations_response(rows, None)) == _model_json(rows, None)
+
+    def test_empty_page(self):
+        assert json.loads(encode_locations_response([], None)) == {
+            "locations": [],
+            "count": 0,
+            "cursor": None,
+        }
+
+
+def _assert_rows_close(decoded, rows):
+    assert len(decoded) == len(rows)
+    for got, expected in zip(decoded, rows):
+        assert got["lat"] == pytest.approx(expected["lat"], abs=1e-7)
+        assert got["lon"] == pytest.approx(expected["lon"], abs=1e-7)
+        assert {k: v for k, v in got.items() if k not in ("lat", "lon")} == {
+            k: v for k, v in expected.items() if k not in ("lat", "lon")
+        }
+
+
+def _many_rows():
+    return [
+        {
+            "id": 1000 + i * 3,
+            "lat": 47.6 + i * 0.00012345,
+            "lon": -122.33 - i * 0.0000987,
+            "address": f"{i} PINE ST",
+            "current_business": None if i % 4 == 0 else f"Shop {i % 3}",
+            "current_category": None if i % 5 == 0 else ["cafe", "bar"][i % 2],
+        }
+        for i in range(200)
+    ]
+
+
+class TestColumnarResponse:
+    def test_round_trip(self):
+        rows = _rows()
+
+        payload = json.loads(encode_columnar_response(rows, "next"))
+        decoded, cursor = decode_columnar_response(payload)
+
+        _assert_rows_close(decoded, rows)
+        assert cursor == "next"
+
+    def test_dictionary_encodes_repeated_names(self):
+        payload = json.loads(encode_columnar_response(_many_rows(), None))
+
+        assert sorted(payload["business_table"]) == ["Shop 0", "Shop 1", "Shop 2"]
+        assert sorted(payload["category_table"]) == ["bar", "cafe"]
+        assert payload["business"][0] == -1
+        assert payload["count"] == 200
+
+    def test_ids_and_coordinates_are_delta_encoded(self):
+        payload = json.loads(encode_columnar_response(_many_rows(), None))
+
+        assert payload["id"][0] == 1000
+        assert set(payload["id"][1:]) == {3}
+        assert all(isinstance(delta, int) for delta in payload["lat"])
+
+
+class TestBinaryPins:
+    def test_round_trip(self):
+        rows = _many_rows()
+
+        decoded, cursor = decode_binary_pins(encode_binary_pins(rows, "eyJ2IjoxfQ"))
+
+        _assert_rows_close(decoded, rows)
+        assert cursor == "eyJ2IjoxfQ"
+
+    def test_round_trip_unicode_and_nulls(self):
+        decoded, cursor = decode_binary_pins(encode_binary_pins(_rows(), None))
+
+        _assert_rows_close(decoded, _rows())
+        assert cursor is None
+
+    def test_empty_page(self):
+        assert decode_binary_pins(encode_binary_pins([], None)) == ([], None)
+
+    def test_smaller_than_json(self):
+        rows = _many_rows()
+
+        assert len(encode_binary_pins(rows, None)) < len(encode_locations_response(rows, None)) / 2
+
+    def test_rejects_foreign_payload(self):
+        with pytest.raises(ValueError):
+            decode_binary_pins(b'{"locations": []}')
@@ -0,0 +1,106 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.spatial import MORTON_BITS, bbox_key_ranges, morton_key, snap_bbox
+from app.models.location import _default_spatial_key
+from app.repositories.location_repository import BoundingBox
+
+
+class TestMortonKey:
+    def test_key_bounds(self):
+        assert morton_key(-90.0, -180.0) == 0
+        assert morton_key(90.0, 180.0) == (1 << (2 * MORTON_BITS)) - 1
+
+    def test_longitude_uses_even_bits_and_latitude_odd_bits(self):
+        assert morton_key(-90.0, 0.0) == 1 << (2 * MORTON_BITS - 2)
+        assert morton_key(0.0, -180.0) == 1 << (2 * MORTON_BITS - 1)
+
+    def test_nearby_points_share_key_prefix(self):
+        a = morton_key(47.60620, -122.33210)
+        b = morton_key(47.60621, -122.33211)
+        far = morton_key(45.5152, -122.6784)
+
+        assert (a ^ b).bit_length() < (a ^ far).bit_length()
+
+    def test_model_default_uses_insert_parameters(self):
+        context = MagicMock()
+        context.get_current_parameters.return_value = {"lat": 47.6062, "lon": -122.3321}
+
+        assert _default_spatial_key(context) == morton_key(47.6062, -122.3321)
+
+
+class TestBboxKeyRanges:
+    @pytest.mark.parametrize(
+        "bbox",
+        [
+            BoundingBox(-122.36, 47.59, -122.30, 47.63),
+            BoundingBox(-122.5, 47.1, -121.1, 47.8),
+            BoundingBox(-0.01, -0.01, 0.01, 0.01),
+            BoundingBox(-122.33215, 47.60615, -122.33205, 47.60625),
+        ],
+    )
+    def test_ranges_cover_every_point_in_bbox(self, bbox):
+        ranges = bbox_key_ranges(bbox)
+        rng = random.Random(42)
+
+        for _ in range(2000):
+            lat = rng.uniform(bbox.south, bbox.north)
+            lon = rng.uniform(bbox.west, bbox.east)
+            key = morton_key(lat, lon)
+            assert any(lo <= key <= hi for lo, hi in ranges)
+
+    def test_ranges_are_sorted_disjoint_and_bounded(self):
+        ranges = bbox_key_ranges(BoundingBox(-122.5, 47.1, -121.1, 47.8), max_ranges=16)
+
+        assert 1 <= len(ranges) <= 16
+        for (_, prev_hi), (next_lo, _) in zip(ranges, ranges[1:]):
+            assert prev_hi + 1 < next_lo
+
+    def test_whole_world_is_a_single_range(self):
+        ranges = bbox_key_ranges(BoundingBox(-180.0, -90.0, 180.0, 90.0))
+
+        assert ranges == [(0, (1 << (2 * MORTON_BITS)) - 1)]
+
+    def test_small_bbox_cover_is_tight(self):
+        ranges = bbox_key_ranges(BoundingBox(-122.3322, 47.6061, -122.3320, 47.6063))
+
+        covered = sum(hi - lo + 1 for lo, hi in ranges)
+        assert covered < 1 << 16
+
+
+class TestSnapBbox:
+    def test_snapped_box_contains_original(self):
+        bbox = BoundingBox(-122.3491, 47.6012, -122.3012, 47.6288)
+
+        grid = snap_bbox(bbox)
+
+        assert grid.west <= bbox.west and grid.east >= bbox.east
+        assert grid.south <= bbox.south and grid.north >= bbox.north
+
+    def test_overshoot_is_under_one_cell_per_edge(self):
+        bbox = BoundingBox(-122.3491, 47.6012, -122.3012, 47.6288)
+
+        grid = snap_bbox(bbox, cells_per_side=4)
+
+        shorter = min(bbox.east - bbox.west, bbox.north - bbox.south)
+        assert grid.step <= shorter / 4
+        assert bbox.west - grid.west < grid.step
+        assert grid.north - bbox.north < grid.step
+
+    def test_nearby_viewports_share_a_grid_box(self):
+        first = snap_bbox(BoundingBox(-122.34912, 47.60121, -122.30118, 47.62883))
+        second = snap_bbox(BoundingBox(-122.34908, 47.60125, -122.30121, 47.62879))
+
+        assert first == second
+
+    def test_whole_world_is_clamped(self):
+        grid = snap_bbox(BoundingBox(-180.0, -90.0, 180.0, 90.0))
+
+        assert (grid.west, grid.south, grid.east, grid.north) == (-180.0, -90.0, 180.0, 90.0)
+
+    def test_degenerate_bbox_uses_finest_level(self):
+        grid = snap_bbox(BoundingBox(-122.3, 47.6, -122.3, 47.6))
+
+        assert grid.level == 22
@@ -0,0 +1,123 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.request_context import current_request, end_request, start_request
+from app.db.instrumentation import (
+    InstrumentedRepository,
+    current_operation,
+    db_operation,
+    instrument_engine,
+    pool_connections_gauge,
+    query_duration_histogram,
+    query_errors_counter,
+    query_rows_histogram,
+)
+from app.db.supabase.supabase_location_repository import SupabaseLocationRepository
+
+
+def _sample(metric, suffix: str, **labels) -> float:
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name.endswith(suffix) and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, "test")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO items (id) VALUES (1), (2), (3)"))
+    return engine
+
+
+class TestDbOperation:
+    def test_unlabelled_by_default(self):
+        assert current_operation() == "other"
+
+    def test_outer_label_wins(self):
+        with db_operation("location.get_detail"):
+            with db_operation("tenancy.find_by_location"):
+                assert current_operation() == "location.get_detail"
+
+        assert current_operation() == "other"
+
+    async def test_repository_methods_are_labelled(self, mock_async_session):
+        seen = []
+
+        async def execute(*args, **kwargs):
+            seen.append(current_operation())
+            raise RuntimeError("stop")
+
+        mock_async_session.execute.side_effect = execute
+        repository = SupabaseLocationRepository(mock_async_session)
+
+        with pytest.raises(RuntimeError):
+            await repository.find_by_coordinates(47.6, -122.3)
+        with pytest.raises(RuntimeError):
+            await repository.get_by_id(1)
+
+        assert seen == ["location.find_by_coordinates", "location.get_by_id"]
+
+    async def test_model_names_are_snake_cased(self):
+        class MemorySubmission:
+            pass
+
+        class Repository(InstrumentedRepository):
+            def __init__(self):
+                self._model = MemorySubmission
+
+            async def find_pending(self):
+                return current_operation()
+
+        assert await Repository().find_pending() == "memory_submission.find_pending"
+
+
+class TestInstrumentEngine:
+    def test_records_latency_and_rows_per_operation(self, engine):
+        labels = {"engine": "test", "operation": "item.find_all"}
+        before = _sample(query_duration_histogram, "_count", **labels)
+        rows_before = _sample(query_rows_histogram, "_sum", **labels)
+
+        with db_operation("item.find_all"), engine.connect() as conn:
+            conn.execute(text("UPDATE items SET id = id"))
+
+        assert _sample(query_duration_histogram, "_count", **labels) == before + 1
+        assert _sample(query_rows_histogram, "_sum", **labels) == rows_before + 3
+
+    def test_adds_sql_span_to_request(self, engine):
+        token = start_request("abc")
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT id FROM items"))
+
+            assert current_request().spans["sql"] > 0
+        finally:
+            end_request(token)
+
+    def test_counts_errors(self, engine):
+        labels = {"engine": "test", "operation": "item.broken"}
+        before = _sample(query_errors_counter, "_total", **labels)
+
+        with db_operation("item.broken"), engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT missing FROM items"))
+            assert conn.info["query_start"] == []
+
+        assert _sample(query_errors_counter, "_total", **labels) == before + 1
+
+    def test_reports_pool_connections(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=2, max_overflow=1
+        )
+        instrument_engine(engine, "pooled")
+
+        with engine.connect(), engine.connect(), engine.connect():
+            assert _sample(pool_connections_gauge, "", engine="pooled", state="checked_out") == 3
+            assert _sample(pool_connections_gauge, "", engine="pooled", state="overflow") == 1
+
+        assert _sample(pool_connections_gauge, "", engine="pooled", state="checked_out") == 0
+        assert _sample(pool_connections_gauge, "", engine="pooled", state="idle") == 2
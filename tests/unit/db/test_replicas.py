@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db.postgres import postgres_session
+from app.db.postgres.postgres_replicas import Replica, ReplicaSet
+
+
+def _replica(name: str, lag_seconds: float = 0.0, dataset_version: int = 1) -> Replica:
+    replica = Replica(name, engine=MagicMock(), sessions=MagicMock())
+    replica.available = True
+    replica.lag_seconds = lag_seconds
+    replica.dataset_version = dataset_version
+    return replica
+
+
+class TestReplicaSet:
+    def test_round_robin_over_usable_replicas(self):
+        first, second = _replica("first"), _replica("second")
+        replicas = ReplicaSet([first, second], max_lag_seconds=5)
+
+        assert [replicas.choose() for _ in range(3)] == [first, second, first]
+
+    def test_skips_lagging_and_unavailable_replicas(self):
+        lagging, down, healthy = (
+            _replica("lagging", lag_seconds=30),
+            _replica("down"),
+            _replica("ok"),
+        )
+        down.available = False
+        replicas = ReplicaSet([lagging, down, healthy], max_lag_seconds=5)
+
+        assert replicas.unusable_reason(lagging) == "lagging"
+        assert replicas.unusable_reason(down) == "unavailable"
+        assert [replicas.choose() for _ in range(2)] == [healthy, healthy]
+
+    def test_skips_replicas_behind_the_dataset_version(self):
+        replica = _replica("replica", dataset_version=4)
+        replicas = ReplicaSet([replica], max_lag_seconds=5)
+        replicas.version_floor = lambda: 5
+
+        assert replicas.choose() is None
+        assert replicas.unusable_reason(replica) == "stale_version"
+
+        replica.dataset_version = 5
+        assert replicas.choose() is replica
+
+    def test_unchecked_replicas_are_not_used(self):
+        replica = Replica("replica", engine=MagicMock(), sessions=MagicMock())
+
+        assert ReplicaSet([replica], max_lag_seconds=5).choose() is None
+
+    async def test_check_records_lag_and_version(self):
+        replica = Replica("replica", engine=MagicMock(), sessions=MagicMock())
+        replicas = ReplicaSet([replica], max_lag_seconds=5)
+
+        async def status(_):
+            return SimpleNamespace(lag_seconds=1.5, dataset_version=7)
+
+        replicas._status = status
+        await replicas.check_all()
+
+        assert replica.available
+        assert replica.lag_seconds == 1.5
+        assert replica.dataset_version == 7
+
+    async def test_failed_check_marks_replica_unavailable(self):
+        replica = _replica("replica")
+        replicas = ReplicaSet([replica], max_lag_seconds=5)
+
+        async def status(_):
+            raise OSError("connection refused")
+
+        replicas._status = status
+        await replicas.check_all()
+
+        assert not replica.available
+        assert replicas.choose() is None
+
+
+class _Session:
+    def __init__(self, name: str):
+        self.name = name
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class TestGetReadDb:
+    @pytest.fixture
+    def primary(self, monkeypatch):
+        monkeypatch.setattr(postgres_session, "AsyncSessionLocal", lambda: _Session("primary"))
+
+    async def _session(self):
+        dependency = postgres_session.get_read_db()
+        session = await anext(dependency)
+        await dependency.aclose()
+        return session.name
+
+    async def test_uses_a_usable_replica(self, monkeypatch, primary):
+        replica = _replica("replica")
+        replica.sessions = lambda: _Session("replica")
+        monkeypatch.setattr(postgres_session, "replicas", ReplicaSet([replica], max_lag_seconds=5))
+
+        assert await self._session() == "replica"
+
+    async def test_falls_back_to_the_primary(self, monkeypatch, primary):
+        replica = _replica("replica", lag_seconds=60)
+        replica.sessions = lambda: _Session("replica")
+        monkeypatch.setattr(postgres_session, "replicas", ReplicaSet([replica], max_lag_seconds=5))
+
+        assert await self._session() == "primary"
+
+    async def test_connection_errors_take_the_replica_out_of_rotation(self, monkeypatch, primary):
+        replica = _replica("replica")
+        replica.sessions = lambda: _Session("replica")
+        replicas = ReplicaSet([replica], max_lag_seconds=5)
+        monkeypatch.setattr(postgres_session, "replicas", replicas)
+
+        dependency = postgres_session.get_read_db()
+        await anext(dependency)
+        error = OperationalError("SELECT 1", {}, OSError("gone"), connection_invalidated=True)
+        with pytest.raises(OperationalError):
+            await dependency.athrow(error)
+
+        assert not replica.available
+        assert await self._session() == "primary"
@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.instrumentation import db_operation, instrument_engine
+from app.db.slow_queries import (
+    SlowQueryLog,
+    _explaining,
+    is_explainable,
+    summarize_argument,
+    summarize_parameters,
+)
+from app.repositories.location_repository import BoundingBox
+
+
+def _engine(slow_queries: SlowQueryLog):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, "test", slow_queries)
+    return engine
+
+
+class TestSummaries:
+    def test_bounding_box_reports_extent(self):
+        summary = summarize_argument(BoundingBox(-122.4, 47.5, -122.2, 47.7))
+
+        assert summary["width"] == pytest.approx(0.2)
+        assert summary["height"] == pytest.approx(0.2)
+        assert summary["west"] == -122.4
+
+    def test_sequences_report_length(self):
+        assert summarize_argument([1, 2, 3]) == {"length": 3}
+        assert summarize_parameters((47.5, [1, 2])) == [47.5, {"length": 2}]
+
+    def test_free_text_is_reduced_to_its_length(self):
+        note = "We had our first date here in 1998, the booth by the window"
+
+        assert summarize_parameters(("pending", note, b"\x00" * 40, {"note": note})) == [
+            "pending",
+            {"type": "str", "length": len(note)},
+            {"type": "bytes", "length": 40},
+            {"type": "dict"},
+        ]
+
+    def test_only_single_selects_are_explained(self):
+        assert is_explainable("  select 1", executemany=False)
+        assert is_explainable("WITH t AS (SELECT 1) SELECT * FROM t", executemany=False)
+        assert not is_explainable("UPDATE items SET id = id", executemany=False)
+        assert not is_explainable("SELECT 1", executemany=True)
+
+
+class TestSlowQueryLog:
+    def test_records_statements_over_threshold(self):
+        slow_queries = SlowQueryLog(threshold_ms=0.000001, explain_sample_rate=0, max_entries=10)
+        engine = _engine(slow_queries)
+
+        with db_operation("item.find_all"), engine.connect() as conn:
+            conn.execute(text("SELECT :limit"), {"limit": 50})
+
+        [entry] = slow_queries.entries()
+        assert entry.operation == "item.find_all"
+        assert entry.statement == "SELECT ?"
+        assert entry.parameters == [50]
+        assert entry.duration_ms >= 0
+        assert entry.plan is None
+
+    def test_disabled_with_zero_threshold(self):
+        slow_queries = SlowQueryLog(threshold_ms=0, explain_sample_rate=1, max_entries=10)
+        engine = _engine(slow_queries)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert slow_queries.entries() == []
+
+    def test_keeps_most_recent_entries(self):
+        slow_queries = SlowQueryLog(threshold_ms=0.000001, explain_sample_rate=0, max_entries=2)
+        engine = _engine(slow_queries)
+
+        with engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text("SELECT :value"), {"value": value})
+
+        assert [entry.parameters for entry in slow_queries.entries()] == [[1], [2]]
+
+    def test_log_entries_never_hold_long_strings(self):
+        slow_queries = SlowQueryLog(threshold_ms=0.000001, explain_sample_rate=0, max_entries=10)
+        engine = _engine(slow_queries)
+        note = "The owner remembered everyone's order by name"
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :note"), {"note": note})
+
+        [entry] = slow_queries.entries()
+        assert note not in repr(entry.as_dict())
+        assert entry.parameters == [{"type": "str", "length": len(note)}]
+
+    async def test_records_repository_arguments(self):
+        slow_queries = SlowQueryLog(threshold_ms=0.000001, explain_sample_rate=0, max_entries=10)
+        engine = _engine(slow_queries)
+
+        async def find_with_current_tenancy(self, bbox, limit=300, after_id=0):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        bbox = BoundingBox(-122.4, 47.5, -122.2, 47.7)
+        with db_operation("location.find", find_with_current_tenancy, None, bbox, limit=50):
+            await find_with_current_tenancy(None, bbox, limit=50)
+
+        [entry] = slow_queries.entries()
+        assert entry.arguments["limit"] == 50
+        assert entry.arguments["after_id"] == 0
+        assert entry.arguments["bbox"]["height"] == pytest.approx(0.2)
+
+    def test_ignores_statements_issued_by_explain(self):
+        slow_queries = SlowQueryLog(threshold_ms=0.000001, explain_sample_rate=0, max_entries=10)
+        engine = _engine(slow_queries)
+
+        token = _explaining.set(True)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        finally:
+            _explaining.reset(token)
+
+        assert slow_queries.entries() == []
@@ -0,0 +1,115 @@
+import csv
+from collections import defaultdict
+from datetime import date, datetime
+
+import pytest
+
+from scripts.generate_city_dataset import CityConfig, CityGenerator, write_kc_csv
+
+TODAY = date(2025, 11, 1)
+
+
+@pytest.fixture
+def chunks():
+    generator = CityGenerator(CityConfig(locations=3000, multi_unit_fraction=0.2), today=TODAY)
+    return list(generator.chunks(size=1000))
+
+
+def _all(chunks, field):
+    return [row for chunk in chunks for row in getattr(chunk, field)]
+
+
+class TestCityGenerator:
+    def test_generates_exactly_the_requested_locations(self, chunks):
+        locations = _all(chunks, "locations")
+
+        assert [location.id for location in locations] == list(range(1, 3001))
+
+    def test_is_deterministic_for_a_seed(self, chunks):
+        again = CityGenerator(CityConfig(locations=3000, multi_unit_fraction=0.2), today=TODAY)
+
+        assert list(again.chunks(size=1000)) == chunks
+
+    def test_co_located_units_share_a_building(self, chunks):
+        buildings = defaultdict(list)
+        for location in _all(chunks, "locations"):
+            buildings[(location.lat, location.lon, location.address)].append(location)
+
+        multi_unit = [units for units in buildings.values() if len(units) > 1]
+        assert multi_unit
+        for units in multi_unit:
+            assert [unit.display_slot for unit in units] == list(range(len(units)))
+            assert len({unit.unit for unit in units}) == len(units)
+
+    def test_tenancy_histories_are_sequential(self, chunks):
+        histories = defaultdict(list)
+        for tenancy in _all(chunks, "tenancies"):
+            histories[tenancy.location_id].append(tenancy)
+
+        assert len(histories) == 3000
+        assert max(len(history) for history in histories.values()) > 10
+        for history in histories.values():
+            names = [tenancy.business_name for tenancy in history]
+            assert len(set(names)) == len(names)
+            for tenancy in history:
+                assert tenancy.start_date <= tenancy.end_date <= TODAY
+            for earlier, later in zip(history, history[1:]):
+                assert earlier.end_date <= later.start_date
+
+    def test_memories_recall_past_tenancies(self, chunks):
+        names = defaultdict(set)
+        for tenancy in _all(chunks, "tenancies"):
+            names[tenancy.location_id].add(tenancy.business_name)
+
+        memories = _all(chunks, "memories")
+        assert memories
+        for memory in memories:
+            assert memory.business_name in names[memory.location_id]
+            assert memory.start_year <= memory.end_year + 2
+
+    def test_history_probes_get_exact_lengths(self):
+        config = CityConfig(locations=100, history_lengths=[1, 50], history_probes=3)
+        chunks = list(CityGenerator(config, today=TODAY).chunks())
+
+        histories = defaultdict(list)
+        for tenancy in _all(chunks, "tenancies"):
+            histories[tenancy.location_id].append(tenancy)
+
+        assert [len(histories[location_id]) for location_id in range(1, 7)] == [1] * 3 + [50] * 3
+        for history in (histories[4], histories[5], histories[6]):
+            assert len({tenancy.business_name for tenancy in history}) == 50
+            for earlier, later in zip(history, history[1:]):
+                assert earlier.start_date <= earlier.end_date < later.start_date
+
+
+class TestWriteKcCsv:
+    def test_inspections_span_each_tenancy(self, tmp_path):
+        config = CityConfig(locations=50)
+        csv_path = tmp_path / "inspections.csv"
+
+        write_kc_csv(config, str(csv_path))
+
+        with open(csv_path, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+        assert rows
+        first_row = rows[0]
+        assert first_row["City"] == "SEATTLE"
+        assert float(first_row["Latitude"]) == pytest.approx(47.6, abs=1)
+        assert float(first_row["Longitude"]) == pytest.approx(-122.3, abs=1)
+
+        dates = defaultdict(list)
+        for row in rows:
+            key = (row["Name"], row["Address"])
+            dates[key].append(datetime.strptime(row["Inspection Date"], "%m/%d/%Y").date())
+
+        # The ETL takes a tenancy's start and end from its first and last inspection.
+        chunks = list(CityGenerator(config).chunks())
+        locations = {location.id: location for location in _all(chunks, "locations")}
+        for tenancy in _all(chunks, "tenancies"):
+            location = locations[tenancy.location_id]
+            address = f"{location.address} {location.unit}" if location.unit else location.address
+            inspection_dates = dates[(tenancy.business_name, address)]
+            assert inspection_dates[0] == tenancy.start_date
+            assert inspection_dates[-1] == tenancy.end_date
+            assert inspection_dates == sorted(inspection_dates)
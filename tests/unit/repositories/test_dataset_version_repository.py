@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock
+import pytest
+
+from app.db.supabase.supabase_dataset_version_repository import SupabaseDatasetVersionRepository
+
+
+class TestSupabaseDatasetVersionRepository:
+    @pytest.fixture
+    def repository(self, mock_async_session):
+        return SupabaseDatasetVersionRepository(mock_async_session)
+
+    async def test_get_current_returns_version(self, repository, mock_async_session):
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = 12
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.get_current()
+
+        assert result == 12
+
+    async def test_get_current_defaults_to_zero_without_row(self, repository, mock_async_session):
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.get_current()
+
+        assert result == 0
+
+    async def test_bump_returns_new_version(self, repository, mock_async_session):
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = 13
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.bump()
+
+        assert result == 13
+        mock_async_session.execute.assert_called_once()
@@ -1,3 +1,4 @@
+from datetime import date
 from unittest.mock import MagicMock
 import pytest
 
@@ -102,3 +103,219 @@ class TestSupabaseLocationRepository:
 
         call_args = mock_async_session.execute.call_args
         assert call_args[0][1]["limit"] == 100
+
+    async def test_find_with_current_tenancy_binds_spatial_key_ranges(
+        self, repository, mock_async_session
+    ):
+        mock_async_session.execute.return_value = MagicMock()
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await repository.find_with_current_tenancy(bbox, limit=100)
+
+        query, params = mock_async_session.execute.call_args[0]
+        assert "l.spatial_key BETWEEN r.lo AND r.hi" in str(query)
+        assert len(params["range_lo"]) == len(params["range_hi"]) >= 1
+        assert all(lo <= hi for lo, hi in zip(params["range_lo"], params["range_hi"]))
+
+    async def test_find_in_bounding_box_filters_on_spatial_key(
+        self, repository, mock_async_session
+    ):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = []
+        mock_async_session.execute.return_value = mock_result
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await repository.find_in_bounding_box(bbox, limit=300)
+
+        stmt = mock_async_session.execute.call_args[0][0]
+        assert "locations.spatial_key BETWEEN" in str(stmt)
+
+    async def test_find_with_current_tenancy_seeks_past_cursor(
+        self, repository, mock_async_session
+    ):
+        mock_async_session.execute.return_value = MagicMock()
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await repository.find_with_current_tenancy(bbox, limit=100, after_id=42)
+
+        call_args = mock_async_session.execute.call_args
+        assert call_args[0][1]["after_id"] == 42
+        assert "l.id > :after_id" in str(call_args[0][0])
+
+    async def test_find_all_with_current_tenancy_returns_dict_results(
+        self, repository, mock_async_session
+    ):
+        mock_row = MagicMock()
+        mock_row._mapping = {
+            "id": 1,
+            "lat": 37.7749,
+            "lon": -122.4194,
+            "address": "123 Market St",
+            "current_business": "Joe's Coffee",
+            "current_category": "cafe",
+        }
+        mock_result = MagicMock()
+        mock_result.__iter__.return_value = [mock_row]
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.find_all_with_current_tenancy()
+
+        assert result == [mock_row._mapping]
+        mock_async_session.execute.assert_called_once()
+
+    async def test_find_clusters_binds_cell_size_and_limit(self, repository, mock_async_session):
+        mock_row = MagicMock()
+        mock_row._mapping = {
+            "cell_x": -12245,
+            "cell_y": 3777,
+            "count": 12,
+            "lat": 37.775,
+            "lon": -122.419,
+            "representative_id": 1,
+            "representative_business": "Joe's Coffee",
+        }
+        mock_result = MagicMock()
+        mock_result.__iter__.return_value = [mock_row]
+        mock_async_session.execute.return_value = mock_result
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        result = await repository.find_clusters(bbox, cell_size=0.01, limit=50)
+
+        assert result[0]["count"] == 12
+        call_args = mock_async_session.execute.call_args
+        assert call_args[0][1]["cell_size"] == 0.01
+        assert call_args[0][1]["limit"] == 50
+
+    async def test_gist_strategy_uses_point_containment(self, mock_async_session):
+        repository = SupabaseLocationRepository(mock_async_session, bbox_strategy="gist")
+        mock_async_session.execute.return_value = MagicMock()
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await repository.find_with_current_tenancy(bbox, limit=100)
+
+        query, params = mock_async_session.execute.call_args[0]
+        assert "point(l.lon, l.lat) <@ box(point(:west, :south), point(:east, :north))" in str(
+            query
+        )
+        assert "spatial_key" not in str(query)
+        assert "range_lo" not in params
+
+    async def test_gist_strategy_applies_to_orm_queries(self, mock_async_session):
+        repository = SupabaseLocationRepository(mock_async_session, bbox_strategy="gist")
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = []
+        mock_async_session.execute.return_value = mock_result
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await repository.find_in_bounding_box(bbox, limit=300)
+
+        where = str(mock_async_session.execute.call_args[0][0]).split("WHERE", 1)[1]
+        assert "point(locations.lon, locations.lat) <@ box(" in where
+        assert "spatial_key" not in where
+
+    async def test_between_strategy_filters_on_lat_lon_only(self, mock_async_session):
+        repository = SupabaseLocationRepository(mock_async_session, bbox_strategy="between")
+        mock_async_session.execute.return_value = MagicMock()
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await repository.find_clusters(bbox, cell_size=0.01)
+
+        query, params = mock_async_session.execute.call_args[0]
+        assert "l.lat BETWEEN :south AND :north AND l.lon BETWEEN :west AND :east" in str(query)
+        assert "JOIN unnest" not in str(query)
+        assert params["west"] == -122.5
+
+    async def test_unknown_strategy_raises(self, mock_async_session):
+        repository = SupabaseLocationRepository(mock_async_session, bbox_strategy="rtree")
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        with pytest.raises(ValueError, match="Unknown bbox strategy"):
+            await repository.find_with_current_tenancy(bbox)
+
+    async def test_get_detail_folds_timeline_rows(self, repository, mock_async_session):
+        location = {"id": 1, "lat": 37.7749, "lon": -122.4194, "address": "123 Market St"}
+        rows = []
+        for name, is_current in [("Joe's Coffee", True), ("Old Diner", False)]:
+            row = MagicMock(
+                business_name=name,
+                category="cafe",
+                start_date=date(2020, 1, 1),
+                end_date=None,
+                is_current=is_current,
+            )
+            row._mapping = location
+            rows.append(row)
+        mock_result = MagicMock()
+        mock_result.all.return_value = rows
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.get_detail(1, timeline_limit=2)
+
+        assert result["address"] == "123 Market St"
+        assert [entry["business_name"] for entry in result["timeline"]] == [
+            "Joe's Coffee",
+            "Old Diner",
+        ]
+        query, params = mock_async_session.execute.call_args[0]
+        assert "LEFT JOIN LATERAL" in str(query)
+        assert params == {"location_id": 1, "timeline_limit": 2}
+        mock_async_session.execute.assert_called_once()
+
+    async def test_get_detail_without_tenancies_has_empty_timeline(
+        self, repository, mock_async_session
+    ):
+        row = MagicMock(business_name=None)
+        row._mapping = {"id": 1, "lat": 37.7749, "lon": -122.4194, "address": "123 Market St"}
+        mock_result = MagicMock()
+        mock_result.all.return_value = [row]
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.get_detail(1)
+
+        assert result["timeline"] == []
+
+    async def test_get_detail_returns_none_when_not_found(self, repository, mock_async_session):
+        mock_result = MagicMock()
+        mock_result.all.return_value = []
+        mock_async_session.execute.return_value = mock_result
+
+        assert await repository.get_detail(999) is None
+
+    async def test_find_details_by_ids_uses_two_queries_in_request_order(
+        self, repository, mock_async_session
+    ):
+        locations = [
+            MagicMock(id=1, lat=37.7, lon=-122.4, address="1 Main St"),
+            MagicMock(id=2, lat=37.8, lon=-122.5, address="2 Main St"),
+        ]
+        tenancies = [
+            MagicMock(
+                location_id=2,
+                business_name="Joe's Coffee",
+                category="cafe",
+                start_date=None,
+                end_date=None,
+                is_current=True,
+            )
+        ]
+        locations_result = MagicMock()
+        locations_result.__iter__.return_value = locations
+        tenancies_result = MagicMock()
+        tenancies_result.__iter__.return_value = tenancies
+        mock_async_session.execute.side_effect = [locations_result, tenancies_result]
+
+        result = await repository.find_details_by_ids([2, 1, 3])
+
+        assert [detail["id"] for detail in result] == [2, 1]
+        assert result[0]["timeline"][0]["business_name"] == "Joe's Coffee"
+        assert result[1]["timeline"] == []
+        assert mock_async_session.execute.call_count == 2
+        timeline_query, params = mock_async_session.execute.call_args[0]
+        assert "ROW_NUMBER() OVER" in str(timeline_query)
+        assert params == {"location_ids": [1, 2], "timeline_limit": 3}
+
+    async def test_find_details_by_ids_skips_database_for_empty_input(
+        self, repository, mock_async_session
+    ):
+        assert await repository.find_details_by_ids([]) == []
+        mock_async_session.execute.assert_not_called()
@@ -117,3 +117,71 @@ class TestSupabaseTenancyRepository:
         )
 
         assert len(result) == 0
+
+    async def test_refresh_current_tenancy_scopes_to_location_ids(
+        self, repository, mock_async_session
+    ):
+        mock_result = MagicMock()
+        mock_result.rowcount = 2
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.refresh_current_tenancy([3, 1])
+
+        assert result == 2
+        query, params = mock_async_session.execute.call_args[0]
+        # The DISTINCT ON subquery is scoped too, not just the outer locations scan.
+        assert "t.location_id = ANY(:location_ids)" in str(query)
+        assert "loc.id = ANY(:location_ids)" in str(query)
+        assert params == {"location_ids": [3, 1]}
+
+    async def test_refresh_current_tenancy_without_ids_refreshes_all(
+        self, repository, mock_async_session
+    ):
+        mock_result = MagicMock()
+        mock_result.rowcount = 10
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.refresh_current_tenancy()
+
+        assert result == 10
+        query, params = mock_async_session.execute.call_args[0]
+        assert "ANY(:location_ids)" not in str(query)
+        assert params == {}
+
+    async def test_refresh_current_tenancy_empty_ids_is_noop(self, repository, mock_async_session):
+        result = await repository.refresh_current_tenancy([])
+
+        assert result == 0
+        mock_async_session.execute.assert_not_called()
+
+    async def test_count_current_tenancy_mismatches_is_not_limited(
+        self, repository, mock_async_session
+    ):
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = 500
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.count_current_tenancy_mismatches()
+
+        assert result == 500
+        assert "LIMIT" not in str(mock_async_session.execute.call_args[0][0])
+
+    async def test_find_current_tenancy_mismatches_returns_dicts(
+        self, repository, mock_async_session
+    ):
+        mock_row = MagicMock()
+        mock_row._mapping = {
+            "location_id": 1,
+            "current_business": None,
+            "current_category": None,
+            "expected_business": "Joe's Coffee",
+            "expected_category": "cafe",
+        }
+        mock_result = MagicMock()
+        mock_result.__iter__.return_value = [mock_row]
+        mock_async_session.execute.return_value = mock_result
+
+        result = await repository.find_current_tenancy_mismatches(limit=5)
+
+        assert result[0]["expected_business"] == "Joe's Coffee"
+        assert mock_async_session.execute.call_args[0][1] == {"limit": 5}
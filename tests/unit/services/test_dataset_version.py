@@ -0,0 +1,48 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.dataset_version import DatasetVersionTracker
+
+
+class TestDatasetVersionTracker:
+    def test_observe_only_moves_forward(self):
+        tracker = DatasetVersionTracker()
+
+        assert tracker.observe(3)
+        assert not tracker.observe(2)
+        assert not tracker.observe(3)
+        assert tracker.current == 3
+
+    def test_listeners_fire_on_advance_but_not_first_load(self):
+        tracker = DatasetVersionTracker()
+        listener = MagicMock()
+        tracker.add_listener(listener)
+
+        tracker.observe(1)
+        tracker.observe(2)
+        tracker.observe(2)
+
+        listener.assert_called_once_with(2)
+
+    def test_failing_listener_does_not_block_others(self):
+        tracker = DatasetVersionTracker(version=1)
+        second = MagicMock()
+        tracker.add_listener(MagicMock(side_effect=RuntimeError("boom")))
+        tracker.add_listener(second)
+
+        tracker.observe(2)
+
+        second.assert_called_once_with(2)
+
+    async def test_get_loads_from_database_only_when_cold(self, mock_async_session):
+        tracker = DatasetVersionTracker()
+        mock_repo = AsyncMock()
+        mock_repo.get_current.return_value = 5
+
+        with patch(
+            "app.services.dataset_version.PostgresDatasetVersionRepository",
+            return_value=mock_repo,
+        ):
+            assert await tracker.get(mock_async_session) == 5
+            assert await tracker.get(mock_async_session) == 5
+
+        mock_repo.get_current.assert_called_once()
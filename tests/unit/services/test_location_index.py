@@ -0,0 +1,162 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+
+from app.repositories.location_repository import BoundingBox
+from app.services.location_index import LocationGridIndex, refresh_location_index
+
+
+class TestLocationGridIndex:
+    @pytest.fixture
+    def rows(self):
+        return [
+            {
+                "id": 3,
+                "lat": 47.6101,
+                "lon": -122.3421,
+                "address": "1 PIKE ST",
+                "current_business": "PIKE PLACE CHOWDER",
+                "current_category": "restaurant",
+            },
+            {
+                "id": 1,
+                "lat": 47.6062,
+                "lon": -122.3321,
+                "address": "123 MAIN ST",
+                "current_business": "STARBUCKS",
+                "current_category": "cafe",
+            },
+            {
+                "id": 2,
+                "lat": 47.6205,
+                "lon": -122.3493,
+                "address": "400 BROAD ST",
+                "current_business": None,
+                "current_category": None,
+            },
+            {
+                "id": 4,
+                "lat": 45.5152,
+                "lon": -122.6784,
+                "address": "PORTLAND",
+                "current_business": "STARBUCKS",
+                "current_category": "cafe",
+            },
+        ]
+
+    @pytest.fixture
+    def index(self, rows):
+        index = LocationGridIndex(cell_size=0.01)
+        index.build(rows)
+        return index
+
+    def test_query_returns_none_when_cold(self):
+        index = LocationGridIndex()
+
+        bbox = BoundingBox(west=-123.0, south=47.0, east=-122.0, north=48.0)
+
+        assert not index.is_ready
+        assert index.query(bbox, limit=300) is None
+
+    def test_query_returns_rows_inside_bbox_ordered_by_id(self, index):
+        bbox = BoundingBox(west=-122.4, south=47.6, east=-122.3, north=47.7)
+
+        result = index.query(bbox, limit=300)
+
+        assert [row["id"] for row in result] == [1, 2, 3]
+        assert result[0] == {
+            "id": 1,
+            "lat": 47.6062,
+            "lon": -122.3321,
+            "address": "123 MAIN ST",
+            "current_business": "STARBUCKS",
+            "current_category": "cafe",
+        }
+        assert result[1]["current_business"] is None
+
+    def test_query_respects_limit(self, index):
+        bbox = BoundingBox(west=-123.0, south=45.0, east=-122.0, north=48.0)
+
+        result = index.query(bbox, limit=2)
+
+        assert [row["id"] for row in result] == [1, 2]
+
+    def test_query_filters_points_in_partially_covered_cells(self, index):
+        bbox = BoundingBox(west=-122.3322, south=47.6061, east=-122.3320, north=47.6063)
+
+        result = index.query(bbox, limit=300)
+
+        assert [row["id"] for row in result] == [1]
+
+    def test_query_large_bbox_scans_occupied_cells(self, index):
+        bbox = BoundingBox(west=-180.0, south=-90.0, east=180.0, north=90.0)
+
+        result = index.query(bbox, limit=300)
+
+        assert [row["id"] for row in result] == [1, 2, 3, 4]
+
+    def test_query_resumes_after_cursor(self, index):
+        bbox = BoundingBox(west=-123.0, south=45.0, east=-122.0, north=48.0)
+
+        result = index.query(bbox, limit=2, after_id=2)
+
+        assert [row["id"] for row in result] == [3, 4]
+
+    def test_build_interns_repeated_strings(self, index):
+        result = index.query(BoundingBox(-180.0, -90.0, 180.0, 90.0), limit=300)
+
+        assert result[0]["current_business"] is result[3]["current_business"]
+        assert len(index) == 4
+
+    def test_query_skips_snapshot_older_than_min_version(self, rows):
+        index = LocationGridIndex(cell_size=0.01)
+        index.build(rows, version=3)
+        everything = BoundingBox(-180.0, -90.0, 180.0, 90.0)
+
+        assert index.version == 3
+        assert len(index.query(everything, limit=300, min_version=3)) == 4
+        assert index.query(everything, limit=300, min_version=4) is None
+
+    def test_build_replaces_previous_snapshot(self, index):
+        index.build([])
+
+        assert index.is_ready
+        assert index.query(BoundingBox(-180.0, -90.0, 180.0, 90.0), limit=300) == []
+
+    async def test_refresh_location_index_loads_rows(self, rows):
+        index = LocationGridIndex()
+        mock_repo = MagicMock()
+        mock_repo.find_all_with_current_tenancy = AsyncMock(return_value=rows)
+        mock_session_local = MagicMock()
+        mock_session_local.return_value.__aenter__ = AsyncMock()
+        mock_session_local.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        mock_version_repo = MagicMock()
+        mock_version_repo.get_current = AsyncMock(return_value=5)
+
+        with (
+            patch("app.db.postgres.AsyncSessionLocal", mock_session_local),
+            patch(
+                "app.db.postgres.postgres_location_repository.PostgresLocationRepository",
+                return_value=mock_repo,
+            ),
+            patch(
+                "app.db.postgres.postgres_dataset_version_repository"
+                ".PostgresDatasetVersionRepository",
+                return_value=mock_version_repo,
+            ),
+        ):
+            refreshed = await refresh_location_index(index)
+
+        assert refreshed is True
+        assert len(index) == 4
+        assert index.version == 5
+
+    async def test_refresh_location_index_keeps_index_cold_on_failure(self):
+        index = LocationGridIndex()
+        mock_session_local = MagicMock(side_effect=RuntimeError("database unavailable"))
+
+        with patch("app.db.postgres.AsyncSessionLocal", mock_session_local):
+            refreshed = await refresh_location_index(index)
+
+        assert refreshed is False
+        assert not index.is_ready
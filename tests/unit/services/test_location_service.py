@@ -1,6 +1,9 @@
-from unittest.mock import AsyncMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
+from app.services.dataset_version import DatasetVersionTracker
+from app.services.location_index import LocationGridIndex
 from app.services.location_service import LocationService
 from app.repositories.location_repository import BoundingBox
 from app.schemas.location import LocationDetail, TimelineEntry
@@ -8,32 +11,49 @@ from app.schemas.location import LocationDetail, TimelineEntry
 
 class TestLocationService:
     @pytest.fixture
-    def service(self, mock_async_session, mock_location_repository, mock_tenancy_repository):
+    def service(
+        self, mock_async_session, mock_location_repository, mock_dataset_version_repository
+    ):
         with (
             patch(
                 "app.services.location_service.PostgresLocationRepository",
                 return_value=mock_location_repository,
             ),
             patch(
-                "app.services.location_service.PostgresTenancyRepository",
-                return_value=mock_tenancy_repository,
+                "app.services.location_service.PostgresDatasetVersionRepository",
+                return_value=mock_dataset_version_repository,
             ),
         ):
             return LocationService(mock_async_session)
 
+    @pytest.fixture
+    def sample_detail(self):
+        return {
+            "id": 1,
+            "lat": 37.7749,
+            "lon": -122.4194,
+            "address": "123 Market St, San Francisco, CA",
+            "timeline": [],
+        }
+
     async def test_get_location_by_id_returns_detail(
-        self,
-        service,
-        mock_location_repository,
-        mock_tenancy_repository,
-        sample_location,
-        sample_tenancy,
+        self, service, mock_location_repository, sample_detail, sample_tenancy
     ):
-        mock_location_repository.get_by_id.return_value = sample_location
-        mock_tenancy_repository.find_by_location.return_value = [sample_tenancy]
+        sample_detail["timeline"] = [
+            {
+                "business_name": sample_tenancy.business_name,
+                "category": sample_tenancy.category,
+                "start_date": sample_tenancy.start_date,
+                "end_date": sample_tenancy.end_date,
+                "is_current": sample_tenancy.is_current,
+            }
+        ]
+        mock_location_repository.get_detail.return_value = sample_detail
 
         result = await service.get_location_by_id(1)
 
+        mock_location_repository.get_detail.assert_called_once_with(1, timeline_limit=3)
+        mock_location_repository.get_by_id.assert_not_called()
         assert isinstance(result, LocationDetail)
         assert result.id == 1
         assert result.lat == 37.7749
@@ -43,23 +63,78 @@ class TestLocationService:
     async def test_get_location_by_id_returns_none_when_not_found(
         self, service, mock_location_repository
     ):
-        mock_location_repository.get_by_id.return_value = None
+        mock_location_repository.get_detail.return_value = None
 
         result = await service.get_location_by_id(999)
 
         assert result is None
 
     async def test_get_location_by_id_with_empty_timeline(
-        self, service, mock_location_repository, mock_tenancy_repository, sample_location
+        self, service, mock_location_repository, sample_detail
     ):
-        mock_location_repository.get_by_id.return_value = sample_location
-        mock_tenancy_repository.find_by_location.return_value = []
+        mock_location_repository.get_detail.return_value = sample_detail
 
         result = await service.get_location_by_id(1)
 
         assert isinstance(result, LocationDetail)
         assert len(result.timeline) == 0
 
+    async def test_concurrent_identical_detail_reads_share_one_query(
+        self, service, mock_location_repository, sample_detail
+    ):
+        release = asyncio.Event()
+
+        async def get_detail(location_id, timeline_limit):
+            await release.wait()
+            return sample_detail
+
+        mock_location_repository.get_detail.side_effect = get_detail
+
+        readers = [asyncio.create_task(service.get_location_by_id(1)) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*readers)
+
+        assert all(result.id == 1 for result in results)
+        mock_location_repository.get_detail.assert_called_once_with(1, timeline_limit=3)
+
+    async def test_concurrent_identical_area_reads_share_one_query(
+        self, service, mock_location_repository
+    ):
+        release = asyncio.Event()
+
+        async def find_with_current_tenancy(bbox, limit, after_id):
+            await release.wait()
+            return [{"id": 1}]
+
+        mock_location_repository.find_with_current_tenancy.side_effect = find_with_current_tenancy
+
+        readers = [
+            asyncio.create_task(
+                service.find_locations_in_area(BoundingBox(-122.5, 37.7, -122.4, 37.8), 300)
+            )
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*readers)
+
+        assert results == [[{"id": 1}]] * 5
+        mock_location_repository.find_with_current_tenancy.assert_called_once()
+
+    async def test_get_locations_by_ids_builds_details(
+        self, service, mock_location_repository, sample_detail
+    ):
+        mock_location_repository.find_details_by_ids.return_value = [sample_detail]
+
+        result = await service.get_locations_by_ids([1, 2])
+
+        mock_location_repository.find_details_by_ids.assert_called_once_with(
+            [1, 2], timeline_limit=3
+        )
+        assert [detail.id for detail in result] == [1]
+        assert isinstance(result[0], LocationDetail)
+
     async def test_find_locations_in_area_returns_dict_list(
         self, service, mock_location_repository
     ):
@@ -80,7 +155,21 @@ class TestLocationService:
 
         assert len(result) == 1
         assert result[0]["id"] == 1
-        mock_location_repository.find_with_current_tenancy.assert_called_once_with(bbox, 300)
+        mock_location_repository.find_with_current_tenancy.assert_called_once_with(
+            bbox, 300, after_id=0
+        )
+
+    async def test_find_locations_in_area_passes_cursor_position(
+        self, service, mock_location_repository
+    ):
+        mock_location_repository.find_with_current_tenancy.return_value = []
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await service.find_locations_in_area(bbox, limit=100, after_id=42)
+
+        mock_location_repository.find_with_current_tenancy.assert_called_once_with(
+            bbox, 100, after_id=42
+        )
 
     async def test_find_locations_in_area_empty_results(self, service, mock_location_repository):
         mock_location_repository.find_with_current_tenancy.return_value = []
@@ -90,16 +179,97 @@ class TestLocationService:
 
         assert len(result) == 0
 
+    async def test_find_locations_in_area_uses_ready_index(
+        self, mock_async_session, mock_location_repository
+    ):
+        mock_index = MagicMock()
+        mock_index.query.return_value = [{"id": 7}]
+        with patch(
+            "app.services.location_service.PostgresLocationRepository",
+            return_value=mock_location_repository,
+        ):
+            service = LocationService(mock_async_session, location_index=mock_index)
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        result = await service.find_locations_in_area(bbox, limit=300)
+
+        assert result == [{"id": 7}]
+        mock_index.query.assert_called_once_with(bbox, 300, 0, min_version=None)
+        mock_location_repository.find_with_current_tenancy.assert_not_called()
+
+    async def test_find_locations_in_area_falls_back_when_index_cold(
+        self, mock_async_session, mock_location_repository
+    ):
+        mock_index = MagicMock()
+        mock_index.query.return_value = None
+        mock_location_repository.find_with_current_tenancy.return_value = []
+        with patch(
+            "app.services.location_service.PostgresLocationRepository",
+            return_value=mock_location_repository,
+        ):
+            service = LocationService(mock_async_session, location_index=mock_index)
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        result = await service.find_locations_in_area(bbox, limit=300)
+
+        assert result == []
+        mock_location_repository.find_with_current_tenancy.assert_called_once_with(
+            bbox, 300, after_id=0
+        )
+
+    async def test_find_locations_in_area_skips_index_behind_dataset_version(
+        self, mock_async_session, mock_location_repository
+    ):
+        index = LocationGridIndex()
+        index.build(
+            [{"id": 7, "lat": 37.75, "lon": -122.45, "address": "OLD ST"}],
+            version=1,
+        )
+        tracker = DatasetVersionTracker(version=1)
+        mock_location_repository.find_with_current_tenancy.return_value = [{"id": 8}]
+        with patch(
+            "app.services.location_service.PostgresLocationRepository",
+            return_value=mock_location_repository,
+        ):
+            service = LocationService(
+                mock_async_session, location_index=index, version_tracker=tracker
+            )
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+
+        assert [row["id"] for row in await service.find_locations_in_area(bbox)] == [7]
+
+        # The ETL bumped the version; the rebuild has not swapped in yet.
+        tracker.observe(2)
+        assert await service.find_locations_in_area(bbox) == [{"id": 8}]
+
+        index.build([{"id": 8, "lat": 37.75, "lon": -122.45, "address": "NEW ST"}], version=2)
+        assert [row["id"] for row in await service.find_locations_in_area(bbox)] == [8]
+        mock_location_repository.find_with_current_tenancy.assert_called_once()
+
+    async def test_find_clusters_in_area_scales_cell_size_with_zoom(
+        self, service, mock_location_repository
+    ):
+        mock_location_repository.find_clusters.return_value = []
+
+        bbox = BoundingBox(west=-122.5, south=37.7, east=-122.4, north=37.8)
+        await service.find_clusters_in_area(bbox, zoom=10, limit=200)
+        await service.find_clusters_in_area(bbox, zoom=11, limit=200)
+
+        first, second = mock_location_repository.find_clusters.call_args_list
+        assert first[0][0] is bbox
+        assert first[0][1] == pytest.approx(360.0 / (2**10 * 8))
+        assert second[0][1] == pytest.approx(first[0][1] / 2)
+        assert first[0][2] == 200
+
     async def test_create_location_returns_existing_when_duplicate(
         self,
         service,
         mock_location_repository,
-        mock_tenancy_repository,
         sample_location,
+        sample_detail,
     ):
         mock_location_repository.find_by_coordinates.return_value = sample_location
-        mock_location_repository.get_by_id.return_value = sample_location
-        mock_tenancy_repository.find_by_location.return_value = []
+        mock_location_repository.get_detail.return_value = sample_detail
 
         result = await service.create_location(37.7749, -122.4194, "123 Market St")
 
@@ -112,16 +282,45 @@ class TestLocationService:
         service,
         mock_async_session,
         mock_location_repository,
-        mock_tenancy_repository,
+        mock_dataset_version_repository,
         sample_location,
+        sample_detail,
     ):
         mock_location_repository.find_by_coordinates.return_value = None
         mock_location_repository.create.return_value = sample_location
-        mock_location_repository.get_by_id.return_value = sample_location
-        mock_tenancy_repository.find_by_location.return_value = []
+        mock_location_repository.get_detail.return_value = sample_detail
 
         result = await service.create_location(37.7749, -122.4194, "123 Market St")
 
         assert isinstance(result, LocationDetail)
         mock_location_repository.create.assert_called_once()
+        mock_dataset_version_repository.bump.assert_called_once()
         mock_async_session.commit.assert_called_once()
+
+    async def test_create_location_advances_version_tracker(
+        self,
+        mock_async_session,
+        mock_location_repository,
+        mock_dataset_version_repository,
+        sample_location,
+        sample_detail,
+    ):
+        tracker = DatasetVersionTracker(version=1)
+        mock_location_repository.find_by_coordinates.return_value = None
+        mock_location_repository.create.return_value = sample_location
+        mock_location_repository.get_detail.return_value = sample_detail
+        with (
+            patch(
+                "app.services.location_service.PostgresLocationRepository",
+                return_value=mock_location_repository,
+            ),
+            patch(
+                "app.services.location_service.PostgresDatasetVersionRepository",
+                return_value=mock_dataset_version_repository,
+            ),
+        ):
+            service = LocationService(mock_async_session, version_tracker=tracker)
+
+        await service.create_location(37.7749, -122.4194, "123 Market St")
+
+        assert tracker.current == 2
@@ -0,0 +1,96 @@
+import gzip
+from unittest.mock import patch
+
+from app.core.compression import COMPRESS_MIN_BYTES
+from app.services.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    def test_get_returns_none_on_miss(self):
+        cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+
+        assert cache.get(1, "key") is None
+
+    def test_put_then_get_returns_body(self):
+        cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+
+        cache.put(1, "key", b'{"count":0}')
+
+        assert cache.get(1, "key").body == b'{"count":0}'
+
+    async def test_entry_keeps_item_count(self):
+        cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+
+        await cache.put_compressed(1, "key", b'{"count":3}', item_count=3)
+
+        assert cache.get(1, "key").item_count == 3
+
+    async def test_large_bodies_are_stored_compressed(self):
+        cache = ResponseCache(max_bytes=1 << 20, ttl_seconds=60)
+        body = b"x" * (COMPRESS_MIN_BYTES * 4)
+
+        entry = await cache.put_compressed(1, "key", body)
+
+        assert gzip.decompress(entry.encoded["gzip"]) == body
+        assert cache.get(1, "key").encoded is entry.encoded
+        assert cache.size_bytes == len(body) + sum(len(v) for v in entry.encoded.values())
+
+    async def test_small_bodies_are_stored_uncompressed(self):
+        cache = ResponseCache(max_bytes=1 << 20, ttl_seconds=60)
+
+        entry = await cache.put_compressed(1, "key", b'{"count":0}')
+
+        assert entry.encoded == {}
+
+    async def test_compression_can_be_disabled(self):
+        cache = ResponseCache(max_bytes=1 << 20, ttl_seconds=60, compress=False)
+
+        entry = await cache.put_compressed(1, "key", b"x" * (COMPRESS_MIN_BYTES * 4))
+
+        assert entry.encoded == {}
+
+    def test_evicts_least_recently_used_over_byte_budget(self):
+        cache = ResponseCache(max_bytes=20, ttl_seconds=60)
+
+        cache.put(1, "a", b"a" * 8)
+        cache.put(1, "b", b"b" * 8)
+        cache.get(1, "a")
+        cache.put(1, "c", b"c" * 8)
+
+        assert cache.get(1, "a") is not None
+        assert cache.get(1, "b") is None
+        assert cache.size_bytes == 16
+
+    def test_oversized_body_is_not_stored(self):
+        cache = ResponseCache(max_bytes=4, ttl_seconds=60, compress=False)
+
+        entry = cache.put(1, "key", b"too large")
+
+        assert entry.body == b"too large"
+        assert len(cache) == 0
+
+    def test_new_version_drops_old_entries(self):
+        cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+
+        cache.put(1, "key", b"old")
+
+        assert cache.get(2, "key") is None
+        assert len(cache) == 0
+
+    def test_stale_version_is_not_stored(self):
+        cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+
+        cache.put(2, "key", b"new")
+        cache.put(1, "key", b"old")
+
+        assert cache.get(2, "key").body == b"new"
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+
+        with patch("app.services.response_cache.time.monotonic", return_value=100.0):
+            cache.put(1, "key", b"body")
+        with patch("app.services.response_cache.time.monotonic", return_value=161.0):
+            assert cache.get(1, "key") is None
+
+        assert cache.size_bytes == 0
@@ -0,0 +1,108 @@
+from unittest.mock import patch
+import pytest
+
+from app.services.dataset_version import DatasetVersionTracker
+from app.services.tile_service import TileCache, TileService
+
+
+class TestTileCache:
+    async def test_get_returns_none_on_miss(self):
+        cache = TileCache(max_entries=2)
+
+        assert await cache.get(1, 12, 656, 1430) is None
+
+    async def test_set_then_get_returns_tile(self):
+        cache = TileCache(max_entries=2)
+
+        await cache.set(1, 12, 656, 1430, b"tile")
+
+        assert await cache.get(1, 12, 656, 1430) == b"tile"
+
+    async def test_evicts_least_recently_used(self):
+        cache = TileCache(max_entries=2)
+
+        await cache.set(1, 1, 0, 0, b"a")
+        await cache.set(1, 1, 0, 1, b"b")
+        await cache.get(1, 1, 0, 0)
+        await cache.set(1, 1, 1, 0, b"c")
+
+        assert await cache.get(1, 1, 0, 0) == b"a"
+        assert await cache.get(1, 1, 0, 1) is None
+        assert len(cache) == 2
+
+    async def test_new_version_drops_old_entries(self):
+        cache = TileCache(max_entries=10)
+
+        await cache.set(1, 1, 0, 0, b"old")
+        assert await cache.get(2, 1, 0, 0) is None
+        assert len(cache) == 0
+
+    async def test_stale_version_is_not_stored(self):
+        cache = TileCache(max_entries=10)
+
+        await cache.set(2, 1, 0, 0, b"new")
+        await cache.set(1, 1, 0, 0, b"old")
+
+        assert len(cache) == 1
+        assert await cache.get(2, 1, 0, 0) == b"new"
+
+    async def test_disk_cache_survives_memory_eviction(self, tmp_path):
+        cache = TileCache(max_entries=1, directory=str(tmp_path))
+
+        await cache.set(1, 1, 0, 0, b"a")
+        await cache.set(1, 1, 0, 1, b"b")
+
+        assert (tmp_path / "1" / "1" / "0" / "0.mvt").read_bytes() == b"a"
+        assert await cache.get(1, 1, 0, 0) == b"a"
+
+    async def test_disk_cache_prunes_old_versions(self, tmp_path):
+        cache = TileCache(max_entries=10, directory=str(tmp_path))
+
+        await cache.set(1, 1, 0, 0, b"old")
+        await cache.set(2, 1, 0, 0, b"new")
+
+        assert not (tmp_path / "1").exists()
+        assert (tmp_path / "2" / "1" / "0" / "0.mvt").exists()
+
+
+class TestTileService:
+    @pytest.fixture
+    def service(self, mock_async_session, mock_location_repository):
+        with patch(
+            "app.services.tile_service.PostgresLocationRepository",
+            return_value=mock_location_repository,
+        ):
+            return TileService(
+                mock_async_session,
+                cache=TileCache(max_entries=10),
+                version_tracker=DatasetVersionTracker(version=7),
+            )
+
+    async def test_get_tile_encodes_and_caches(self, service, mock_location_repository):
+        mock_location_repository.find_with_current_tenancy.return_value = [
+            {
+                "id": 1,
+                "lat": 47.6062,
+                "lon": -122.3321,
+                "address": "123 MAIN ST",
+                "current_business": "STARBUCKS",
+                "current_category": None,
+            }
+        ]
+
+        first = await service.get_tile(12, 656, 1430)
+        second = await service.get_tile(12, 656, 1430)
+
+        assert first == second
+        assert b"STARBUCKS" in first
+        mock_location_repository.find_with_current_tenancy.assert_called_once()
+
+    async def test_get_tile_queries_buffered_tile_bounds(self, service, mock_location_repository):
+        mock_location_repository.find_with_current_tenancy.return_value = []
+
+        await service.get_tile(0, 0, 0)
+
+        bbox, limit = mock_location_repository.find_with_current_tenancy.call_args[0]
+        assert bbox.west < -180.0
+        assert bbox.east > 180.0
+        assert limit == 5000